@@ -0,0 +1,142 @@
+import io
+import os
+from typing import Dict, Any
+
+import fitz
+from docx import Document
+from docx.shared import Inches as DocxInches
+from pptx import Presentation
+from pptx.util import Inches
+from PIL import Image
+
+# Corpus sizes used by the benchmark runner. Every document of a size has the
+# same number of pages (slides for PPTX) and the same content per page.
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"pages": 5, "spans": 20, "images": 1, "tables": 1, "links": 2},
+    "medium": {"pages": 50, "spans": 40, "images": 2, "tables": 1, "links": 5},
+    "large": {"pages": 200, "spans": 60, "images": 3, "tables": 2, "links": 10},
+}
+
+
+def _png(seed: int, size: int = 64) -> bytes:
+    """A small PNG whose colour depends on seed (distinct images stay distinct)."""
+    colour = ((seed * 67) % 256, (seed * 131) % 256, (seed * 197) % 256)
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), colour).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def generate_pdf(path: str, pages: int, spans: int, images: int, tables: int, links: int):
+    """
+    Write a PDF where each page has one heading, `spans` body lines, `images`
+    distinct images, `tables` ruled 3x3 tables and `links` URI links.
+    """
+    pdf = fitz.open()
+    for page_num in range(pages):
+        page = pdf.new_page()
+        page.insert_text((72, 60), f"Heading {page_num + 1}", fontsize=18)
+
+        y = 90
+        for i in range(spans):
+            page.insert_text((72, y), f"Body line {i} on page {page_num + 1}", fontsize=8)
+            y += 9
+
+        for i in range(links):
+            rect = fitz.Rect(72, 60 - 14, 200, 60)
+            page.insert_link({"kind": fitz.LINK_URI, "from": rect,
+                              "uri": f"https://example.com/{page_num}/{i}"})
+
+        for i in range(images):
+            x = 360 + (i % 3) * 70
+            page.insert_image(fitz.Rect(x, 60, x + 60, 120), stream=_png(page_num * 10 + i))
+
+        for t in range(tables):
+            top = 120 + t * 80
+            for r in range(4):
+                page.draw_line((360, top + r * 20), (540, top + r * 20))
+            for c in range(4):
+                page.draw_line((360 + c * 60, top), (360 + c * 60, top + 60))
+            for r in range(3):
+                for c in range(3):
+                    page.insert_text((364 + c * 60, top + 14 + r * 20), f"r{r}c{c}", fontsize=8)
+
+    pdf.save(path)
+    pdf.close()
+
+
+def generate_docx(path: str, pages: int, spans: int, images: int, tables: int, links: int):
+    """
+    Write a DOCX with `pages` sections, each a heading followed by `spans`
+    paragraphs, `images` pictures, `tables` 3x3 tables and a page break.
+    Links are plain URL text (python-docx has no hyperlink API).
+    """
+    doc = Document()
+    for page_num in range(pages):
+        doc.add_heading(f"Heading {page_num + 1}", level=1)
+        for i in range(spans):
+            doc.add_paragraph(f"Body line {i} on page {page_num + 1}")
+        for i in range(links):
+            doc.add_paragraph(f"https://example.com/{page_num}/{i}")
+        for i in range(images):
+            doc.add_picture(io.BytesIO(_png(page_num * 10 + i)), width=DocxInches(0.5))
+        for _ in range(tables):
+            table = doc.add_table(rows=3, cols=3)
+            for r in range(3):
+                for c in range(3):
+                    table.cell(r, c).text = f"r{r}c{c}"
+        if page_num < pages - 1:
+            doc.add_page_break()
+    doc.save(path)
+
+
+def generate_pptx(path: str, pages: int, spans: int, images: int, tables: int, links: int):
+    """
+    Write a PPTX with `pages` slides, each with a title, a text box of
+    `spans` runs, `links` hyperlinked runs, `images` pictures and `tables` tables.
+    """
+    prs = Presentation()
+    for page_num in range(pages):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {page_num + 1}"
+
+        frame = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(4), Inches(4)).text_frame
+        for i in range(spans):
+            paragraph = frame.paragraphs[0] if i == 0 else frame.add_paragraph()
+            paragraph.add_run().text = f"Body line {i} on slide {page_num + 1}"
+        for i in range(links):
+            run = frame.add_paragraph().add_run()
+            run.text = f"link {i}"
+            run.hyperlink.address = f"https://example.com/{page_num}/{i}"
+
+        for i in range(images):
+            slide.shapes.add_picture(io.BytesIO(_png(page_num * 10 + i)),
+                                     Inches(5 + i), Inches(1.5), Inches(0.8), Inches(0.8))
+        for t in range(tables):
+            table = slide.shapes.add_table(3, 3, Inches(5), Inches(3 + t * 1.5),
+                                           Inches(3), Inches(1)).table
+            for r in range(3):
+                for c in range(3):
+                    table.cell(r, c).text = f"r{r}c{c}"
+    prs.save(path)
+
+
+GENERATORS = {".pdf": generate_pdf, ".docx": generate_docx, ".pptx": generate_pptx}
+
+
+def generate_corpus(out_dir: str, size: str = "small") -> Dict[str, Any]:
+    """
+    Generate one document per format for the given size into out_dir.
+    Returns {ext: path} plus the spec under "spec". Generation is
+    deterministic, so the same size always yields the same content.
+    """
+    if size not in SIZES:
+        raise ValueError(f"Unknown corpus size: {size}")
+    spec = SIZES[size]
+    os.makedirs(out_dir, exist_ok=True)
+
+    corpus: Dict[str, Any] = {"spec": dict(spec)}
+    for ext, generate in GENERATORS.items():
+        path = os.path.join(out_dir, f"{size}{ext}")
+        generate(path, **spec)
+        corpus[ext] = path
+    return corpus
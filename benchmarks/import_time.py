@@ -0,0 +1,77 @@
+"""
+Start-up cost of the CLI: time to import a module in a fresh interpreter.
+
+    python -m benchmarks.import_time --budget-ms 150
+
+Exits with code 1 when the fastest of `--repeat` imports is over budget, and
+lists any format backend (fitz, pdfplumber, docx, pptx, PIL) that the import
+pulled in; those should only load when a file of their format is processed.
+"""
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, Any
+
+BACKEND_MODULES = ("fitz", "pymupdf", "pdfplumber", "docx", "pptx", "PIL", "numpy")
+
+_PROBE = """
+import sys, time, json, tracemalloc
+if {trace}:
+    tracemalloc.start()
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+peak = tracemalloc.get_traced_memory()[1] if {trace} else 0
+backends = sorted(m for m in {backends!r} if m in sys.modules)
+print(json.dumps({{"seconds": seconds, "peak_bytes": peak, "backends": backends}}))
+"""
+
+
+def _probe(module: str, trace: bool) -> Dict[str, Any]:
+    code = _PROBE.format(module=module, trace=trace, backends=BACKEND_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_import(module: str = "main", repeat: int = 5) -> Dict[str, Any]:
+    """
+    Fastest import time over `repeat` fresh interpreters, plus the peak
+    traced memory of one more import and the backends it loaded.
+    """
+    seconds = min(_probe(module, trace=False)["seconds"] for _ in range(repeat))
+    traced = _probe(module, trace=True)
+    return {"seconds": seconds, "peak_bytes": traced["peak_bytes"],
+            "backends": traced["backends"]}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI import time against a budget.")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Fresh interpreters to time (the fastest is kept)")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Maximum allowed import time in milliseconds")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = measure_import(args.module, args.repeat)
+    elapsed_ms = result["seconds"] * 1000
+    print(f"import {args.module}: {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms), "
+          f"peak {result['peak_bytes'] / 1024:.1f} KiB")
+
+    failed = False
+    if result["backends"]:
+        print(f"Format backends loaded at import: {', '.join(result['backends'])}")
+        failed = True
+    if elapsed_ms > args.budget_ms:
+        print("Import time is over budget.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
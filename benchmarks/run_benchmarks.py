@@ -0,0 +1,210 @@
+"""
+Benchmarks for the extractors and storage backends over a generated corpus.
+
+    python -m benchmarks.run_benchmarks --size medium --output benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --size medium --compare benchmarks/baseline.json
+
+Each benchmark is timed `--repeat` times (the fastest run is kept, which is
+the least noisy estimate) and then run once more under tracemalloc for its
+peak Python allocation. Results are written as JSON; with --compare, any
+benchmark slower or hungrier than the baseline beyond the tolerance is
+reported and the exit code is 1.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import tracemalloc
+from typing import Callable, Dict, Any, List
+
+from benchmarks.corpus import SIZES, generate_corpus
+from benchmarks.import_time import measure_import
+from src.loaders.pdf_loader import PDFLoader
+from src.loaders.docx_loader import DOCXPackageLoader
+from src.loaders.ppt_loader import PPTLoader
+from src.extractors.data_extractor import PDFDataExtractor, DOCXDataExtractor, PPTDataExtractor
+from src.storage.file_storage import FileStorage
+from src.storage.sql_storage import SQLStorage
+
+EXTRACTORS = {
+    ".pdf": (PDFLoader, PDFDataExtractor),
+    ".docx": (DOCXPackageLoader, DOCXDataExtractor),
+    ".pptx": (PPTLoader, PPTDataExtractor),
+}
+
+
+def measure(fn: Callable[[], Any], repeat: int = 3,
+            setup: Callable[[], Any] = None) -> Dict[str, Any]:
+    """
+    Best wall time over `repeat` runs, plus peak traced memory of one extra
+    run. setup() runs untimed before every run; progress prints are muted.
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+def _clear_output():
+    """Start every run from an empty ./output so image writes are not skipped."""
+    shutil.rmtree("output", ignore_errors=True)
+
+
+def _extract(ext: str, path: str) -> Dict[str, Any]:
+    loader_cls, extractor_cls = EXTRACTORS[ext]
+    doc = loader_cls(path).load_file()
+    return extractor_cls(doc, path).extract_all()
+
+
+def _row_count(data: Dict[str, Any]) -> int:
+    text_data = data["text"]
+    return (len(text_data["text"])
+            + sum(len(h) for h in text_data["metadata"]["headings"].values())
+            + len(text_data["metadata"]["font_styles"])
+            + len(data["links"]) + len(data["images"]) + len(data["tables"]))
+
+
+def run_benchmarks(size: str = "small", repeat: int = 3, work_dir: str = None) -> Dict[str, Any]:
+    """
+    Generate the corpus and benchmark CLI start-up, every extractor and
+    every storage backend. Extractors and storages write into work_dir
+    (a temp dir by default).
+    """
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="extraction-bench-")
+    old_cwd = os.getcwd()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    result = measure_import("main", repeat)
+    result.update(unit="imports/s", throughput=1 / result["seconds"])
+    results["import.main"] = result
+
+    try:
+        corpus = generate_corpus(os.path.join(work_dir, "corpus"), size)
+        pages = corpus["spec"]["pages"]
+        os.chdir(work_dir)   # extractors and FileStorage write under ./output
+
+        for ext in EXTRACTORS:
+            path = corpus[ext]
+            result = measure(lambda: _extract(ext, path), repeat, setup=_clear_output)
+            result.update(unit="pages/s", throughput=pages / result["seconds"])
+            results[f"extract{ext}"] = result
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                data = _extract(ext, path)
+            rows = _row_count(data)
+            base_name = os.path.splitext(os.path.basename(path))[0]
+
+            file_storage = FileStorage()
+            result = measure(lambda: file_storage.save(data, base_name), repeat)
+            result.update(unit="rows/s", throughput=rows / result["seconds"])
+            results[f"file_storage{ext}"] = result
+
+            db_path = os.path.join(work_dir, f"bench{ext}.db")
+            with SQLStorage(db_path=db_path) as sql_storage:
+                result = measure(lambda: sql_storage.save(data, base_name), repeat)
+            result.update(unit="rows/s", throughput=rows / result["seconds"])
+            results[f"sql_storage{ext}"] = result
+    finally:
+        os.chdir(old_cwd)
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "size": size,
+            "spec": SIZES[size],
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], time_tolerance: float = 0.25,
+            memory_tolerance: float = 0.25) -> List[str]:
+    """
+    Return one message per regression: a benchmark whose time or peak memory
+    exceeds the baseline by more than the given fraction.
+    """
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        now = current.get("results", {}).get(name)
+        if now is None:
+            continue
+        if now["seconds"] > base["seconds"] * (1 + time_tolerance):
+            regressions.append(f"{name}: {now['seconds']:.4f}s vs baseline {base['seconds']:.4f}s")
+        if now["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append(f"{name}: peak {now['peak_bytes']} bytes vs baseline "
+                               f"{base['peak_bytes']} bytes")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extractors and storage backends.")
+    parser.add_argument("--size", choices=list(SIZES), default="small",
+                        help="Generated corpus size")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed runs per benchmark (the fastest is kept)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to check for regressions")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction of the baseline time")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25,
+                        help="Allowed growth as a fraction of the baseline peak memory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    current = run_benchmarks(args.size, args.repeat)
+
+    for name, result in current["results"].items():
+        print(f"{name:<20} {result['seconds'] * 1000:10.2f} ms  "
+              f"{result['throughput']:12.1f} {result['unit']:<8} "
+              f"peak {result['peak_bytes'] / 1024:10.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("size") != args.size:
+            print(f"Baseline was recorded for size '{baseline.get('meta', {}).get('size')}', "
+                  f"not '{args.size}'")
+            return 1
+        regressions = compare(current, baseline, args.time_tolerance, args.memory_tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,67 +1,181 @@
 import os
 import sys
-from src.loaders.pdf_loader import PDFLoader
-from src.loaders.docx_loader import DOCXLoader
-from src.loaders.ppt_loader import PPTLoader
-
-from src.extractors.data_extractor import (
-    PDFDataExtractor,
-    DOCXDataExtractor,
-    PPTDataExtractor
-)
-
-from src.storage.file_storage import FileStorage
-from src.storage.sql_storage import SQLStorage
-
-def run_extraction(file_path: str):
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-
-    if ext == ".pdf":
-        loader = PDFLoader(file_path)
-        doc_obj = loader.load_file()
-        extractor = PDFDataExtractor(doc_obj, file_path)
-    elif ext == ".docx":
-        loader = DOCXLoader(file_path)
-        doc_obj = loader.load_file()
-        extractor = DOCXDataExtractor(doc_obj, file_path)
-    elif ext == ".pptx":
-        loader = PPTLoader(file_path)
-        doc_obj = loader.load_file()
-        extractor = PPTDataExtractor(doc_obj, file_path)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
-
-    text_data = extractor.extract_text()
-    links_data = extractor.extract_links()
-    images_data = extractor.extract_images()
-    tables_data = extractor.extract_tables()
-
-    final_data = {
-        "text": text_data,
-        "links": links_data,
-        "images": images_data,
-        "tables": tables_data
-    }
-
-    base_name = os.path.splitext(os.path.basename(file_path))[0]
-
-    # File-based storage
-    file_storage = FileStorage()
-    file_storage.save(final_data, base_name)
-
-    # SQL-based storage
-    sql_storage = SQLStorage(db_path="extracted_data.db")
-    sql_storage.save(final_data, base_name)
-
-    print(f"Extraction complete for: {file_path}")
+import argparse
+from functools import partial
+from typing import Any, Dict
+from src.extractors.data_extractor import EXTRACTION_PROFILES, EXTRACTOR_VERSION
+from src.extraction.extraction_runner import cache_variant, run_extraction
+
+from src.storage.pipeline import DEFAULT_SINKS, parse_sinks
+from src.batch.batch_runner import BatchRunner, collect_inputs, iter_documents
+from src.loaders.archive_loader import is_archive
+from src.cache.extraction_cache import ExtractionCache
+from src.metrics.metrics import MetricsReporter
+
+def run_options(args) -> Dict[str, Any]:
+    """
+    run_extraction keyword options from the command line, shared by the
+    single-file run, the batch workers and the daemon's pool.
+    """
+    return dict(page_workers=args.page_workers, stream=args.stream,
+                font_style_mode=args.font_styles, keep_image_encoding=args.keep_image_encoding,
+                table_detection=args.table_detection, all_tables=args.all_tables,
+                incremental=args.incremental, columnar_dir=args.columnar_dir,
+                columnar_format=args.columnar_format, sinks=args.sinks, profile=args.profile)
+
+def _sinks_arg(value: str):
+    try:
+        return parse_sinks(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract text, links, images and tables from documents.")
+    parser.add_argument("inputs", nargs="*",
+                        help="Files, directories, glob patterns or @manifest files")
+    parser.add_argument("--manifest", help="Text file listing one input per line")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes for batch mode (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum documents submitted to the pool at once")
+    parser.add_argument("--page-workers", type=int, default=1,
+                        help="Worker processes per PDF for page-parallel extraction")
+    parser.add_argument("--stream", action="store_true",
+                        help="Store page by page as pages are extracted (bounded memory)")
+    parser.add_argument("--profile", choices=list(EXTRACTION_PROFILES), default="full",
+                        help="What to extract: everything (full), plain text only at the "
+                             "highest throughput (text), or full with text in reading order (layout)")
+    parser.add_argument("--font-styles", choices=["spans", "runs"], default="spans",
+                        help="Store one font-style row per span, or run-length aggregated ranges")
+    parser.add_argument("--keep-image-encoding", action="store_true",
+                        help="Store slide pictures in their original format (skip PNG re-encode)")
+    parser.add_argument("--table-detection", choices=["auto", "all", "fitz"], default="auto",
+                        help="PDF pages sent to table extraction: ruled pages only (auto), "
+                             "every page (all), or PyMuPDF's table finder (fitz)")
+    parser.add_argument("--all-tables", action="store_true",
+                        help="Extract every table on a PDF page, not only the first")
+    parser.add_argument("--cache-dir", default=".extraction_cache",
+                        help="Folder for the content-hash extraction cache")
+    parser.add_argument("--cache-max-mb", type=int, default=512,
+                        help="Evict least-recently-used cache entries beyond this size")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-extract and do not record results in the cache")
+    parser.add_argument("--invalidate", action="store_true",
+                        help="Drop cached results for the given inputs before running")
+    parser.add_argument("--sinks", type=_sinks_arg, default=DEFAULT_SINKS,
+                        help="Comma-separated storages written in parallel: file, sql, columnar "
+                             "(default: file,sql; e.g. --sinks sql skips the text dumps)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-extract only pages/slides whose content changed since the last "
+                             "incremental run and update their SQL rows in place")
+    parser.add_argument("--columnar-dir", default=None,
+                        help="Also append rows to partitioned columnar files in this folder")
+    parser.add_argument("--columnar-format", choices=["auto", "parquet", "columns"], default="auto",
+                        help="Parquet (needs pyarrow), dependency-free gzip columns, or "
+                             "Parquet when pyarrow is installed (auto)")
+    parser.add_argument("--metrics", choices=list(MetricsReporter.FORMATS), default=None,
+                        help="Report per-document stage timings and counters (JSON lines "
+                             "or Prometheus text)")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Append metrics to this file instead of printing them")
+    parser.add_argument("--profile-dir", default=None,
+                        help="Write a per-document profile into this folder")
+    parser.add_argument("--profiler", choices=list(MetricsReporter.PROFILERS), default="cprofile",
+                        help="Profiler used with --profile-dir (CPU or memory allocations)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a resident daemon taking jobs from --socket and/or --spool-dir")
+    parser.add_argument("--socket", default=None,
+                        help="Unix socket the daemon listens on (or --submit sends to)")
+    parser.add_argument("--spool-dir", default=None,
+                        help="Folder the daemon watches for new documents")
+    parser.add_argument("--queue-size", type=int, default=64,
+                        help="Jobs the daemon queues before rejecting new submissions")
+    parser.add_argument("--submit", action="store_true",
+                        help="Send the inputs to the daemon at --socket instead of extracting here")
+    return parser.parse_args(argv)
+
+
+def serve(args):
+    """Run the extraction daemon until it is told to stop."""
+    from src.service.daemon import ExtractionDaemon
+
+    daemon = ExtractionDaemon(
+        socket_path=args.socket, spool_dir=args.spool_dir, workers=args.workers,
+        max_queue=args.queue_size,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024, **run_options(args)
+    )
+    daemon.serve_forever()
+    return 0
+
+def submit(args):
+    """Queue the inputs on a running daemon and print its replies."""
+    from src.service.daemon import send_request
+
+    rejected = 0
+    for path in collect_inputs(args.inputs, manifest=args.manifest):
+        reply = send_request(args.socket, {"op": "submit", "path": os.path.abspath(path)})
+        print(f"{path}: {reply}")
+        # Accepted jobs come back as the job (whose "error" is None until it fails)
+        rejected += "job_id" not in reply
+    return 1 if rejected else 0
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.incremental and "sql" not in args.sinks:
+        print("--incremental updates the SQL database; include sql in --sinks")
+        return 2
+
+    if args.serve or args.submit:
+        if args.submit and not args.socket:
+            print("--submit needs --socket")
+            return 2
+        if args.serve and not (args.socket or args.spool_dir):
+            print("--serve needs --socket and/or --spool-dir")
+            return 2
+        return serve(args) if args.serve else submit(args)
+
+    # fallback if no argument given
+    inputs = args.inputs or ["data/sample.pdf"]
+
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024,
+                                version=EXTRACTOR_VERSION)
+    options = run_options(args)
+    variant = cache_variant(options["profile"], options["table_detection"],
+                             options["all_tables"], options["keep_image_encoding"])
+
+    reporter = None
+    if args.metrics or args.metrics_file or args.profile_dir:
+        reporter = MetricsReporter(args.metrics or "json", output=args.metrics_file,
+                                   profile_dir=args.profile_dir, profiler=args.profiler)
+
+    # A single plain file keeps the original one-document behaviour
+    if (len(inputs) == 1 and not args.manifest and os.path.isfile(inputs[0])
+            and not is_archive(inputs[0])):
+        if cache is not None and args.invalidate:
+            cache.invalidate(inputs[0], variant)
+        run_extraction(inputs[0], cache=cache, reporter=reporter, **options)
+        return 0
+
+    file_paths = collect_inputs(inputs, manifest=args.manifest)
+    if cache is not None and args.invalidate:
+        for document in iter_documents(file_paths):
+            if not isinstance(document, str) or os.path.isfile(document):
+                cache.invalidate(document, variant)
+
+    worker = partial(run_extraction, cache=cache, reporter=reporter, **options)
+    runner = BatchRunner(worker, max_workers=args.workers,
+                         max_in_flight=args.max_in_flight)
+    # Archive members are streamed to the workers without unpacking to disk
+    results = runner.run(iter_documents(file_paths))
+
+    failed = [r for r in results if r["status"] != "ok"]
+    print(f"Batch complete: {len(results) - len(failed)} succeeded, {len(failed)} failed.")
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    # Use sys.argv to check if a custom path was provided
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]  # user-provided path
-    else:
-        # fallback if no argument given
-        input_file = "data/sample.pdf"
-
-    run_extraction(input_file)
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import os
+import glob
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.formats.registry import is_supported
+from src.loaders.archive_loader import ArchiveLoader, is_archive
+from src.loaders.document_source import DocumentSource
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(ch in pattern for ch in "*?[")
+
+
+def _read_manifest(manifest_path: str) -> List[str]:
+    """
+    Read one path/glob/directory per line. Blank lines and lines starting
+    with '#' are ignored; relative entries resolve against the manifest folder.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    entries = []
+    with open(manifest_path, "r", encoding="utf-8") as mf:
+        for line in mf:
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            if not os.path.isabs(entry):
+                entry = os.path.join(base_dir, entry)
+            entries.append(entry)
+    return entries
+
+
+def collect_inputs(sources: Iterable[str], manifest: Optional[str] = None) -> List[str]:
+    """
+    Expand directories, glob patterns and manifest files into a flat,
+    de-duplicated list of document paths (in the order they were found).
+
+    - A directory is walked recursively for supported extensions.
+    - A glob pattern is expanded (recursive '**' allowed).
+    - ZIP/TAR archives are kept as one entry (see iter_documents).
+    - An entry starting with '@' is treated as a manifest file.
+    - Anything else is taken as a plain file path.
+    """
+    pending = list(sources)
+    if manifest:
+        pending.extend(_read_manifest(manifest))
+
+    found = []
+    for source in pending:
+        if source.startswith("@"):
+            found.extend(collect_inputs(_read_manifest(source[1:])))
+        elif os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    if is_supported(name) or is_archive(name):
+                        found.append(os.path.join(root, name))
+        elif _is_glob(source):
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path) and (is_supported(path) or is_archive(path)):
+                    found.append(path)
+        else:
+            found.append(source)
+
+    seen = set()
+    unique = []
+    for path in found:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def iter_documents(paths: Iterable[str]) -> Iterator[Union[str, DocumentSource]]:
+    """
+    Yield each path, except that ZIP/TAR archives are replaced by their
+    supported members as in-memory DocumentSources. Members are read only
+    as they are consumed, so BatchRunner's max_in_flight also bounds how
+    many of them are held in memory.
+    """
+    for path in paths:
+        if is_archive(path) and os.path.isfile(path):
+            yield from ArchiveLoader(path).iter_members()
+        else:
+            yield path
+
+
+def _label(document) -> str:
+    """Display name of a path or DocumentSource."""
+    return getattr(document, "name", document)
+
+
+def _run_one(worker: Callable[[str], Any], file_path: str) -> float:
+    """Run the worker on one file inside a pool process and time it."""
+    start = time.perf_counter()
+    worker(file_path)
+    return time.perf_counter() - start
+
+
+class BatchRunner:
+    """
+    Runs a per-document worker (e.g. main.run_extraction) over many files
+    using a ProcessPoolExecutor. At most `max_in_flight` documents are
+    submitted at once, and a failing document never stops the run.
+    """
+
+    def __init__(self, worker: Callable[[str], Any], max_workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None):
+        self.worker = worker  # must be a picklable, module-level callable
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max(max_in_flight or self.max_workers * 2, 1)
+
+    def run(self, file_paths: Iterable[Union[str, DocumentSource]]) -> List[Dict[str, Any]]:
+        """
+        Process every file (a path, or a DocumentSource such as an archive
+        member) and return one result dict per file:
+            {"file_path": str, "status": "ok" | "error", "elapsed": float, "error": str}
+        """
+        if self.max_workers == 1:
+            return [self._run_inline(path) for path in file_paths]
+
+        # Imported here: loading multiprocessing is only worth it when a pool is used
+        from concurrent.futures import ProcessPoolExecutor
+
+        results = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            for path in file_paths:
+                if len(in_flight) >= self.max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results.append(self._collect(in_flight.pop(future), future))
+                in_flight[executor.submit(_run_one, self.worker, path)] = _label(path)
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results.append(self._collect(in_flight.pop(future), future))
+
+        return results
+
+    def _run_inline(self, file_path: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            self.worker(file_path)
+        except Exception as e:
+            return self._report(_label(file_path), "error", time.perf_counter() - start, str(e))
+        return self._report(_label(file_path), "ok", time.perf_counter() - start)
+
+    def _collect(self, file_path: str, future) -> Dict[str, Any]:
+        try:
+            elapsed = future.result()
+        except Exception as e:
+            return self._report(file_path, "error", 0.0, str(e))
+        return self._report(file_path, "ok", elapsed)
+
+    @staticmethod
+    def _report(file_path: str, status: str, elapsed: float, error: str = "") -> Dict[str, Any]:
+        if status == "ok":
+            print(f"[BatchRunner] OK    {file_path} ({elapsed:.2f}s)")
+        else:
+            print(f"[BatchRunner] ERROR {file_path}: {error}")
+        return {
+            "file_path": file_path,
+            "status": status,
+            "elapsed": elapsed,
+            "error": error
+        }
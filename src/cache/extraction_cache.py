@@ -0,0 +1,161 @@
+import os
+import hashlib
+import pickle
+import tempfile
+from typing import Dict, Any, FrozenSet, Iterable, NamedTuple, Optional
+
+
+def content_hash(file_path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Return the SHA-256 hex digest of a file, read in chunks. file_path may
+    also be a DocumentSource, whose shared buffer is hashed (once) without a read.
+    """
+    if not isinstance(file_path, (str, os.PathLike)):
+        return file_path.sha256
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    data: Dict[str, Any]
+    # Storage targets the data was stored in (see extraction_runner._sink_targets)
+    targets: FrozenSet[str]
+
+
+class ExtractionCache:
+    """
+    Persistent on-disk cache of extraction results (the `final_data` dict built
+    by run_extraction). Entries are keyed by the file's content hash plus the
+    extractor version, so renamed copies hit and any extractor change misses.
+    An optional variant (e.g. the extraction profile) keeps results of
+    different extraction settings apart. Each entry also records the storage
+    targets that hold its data, so a hit can still be stored in new ones.
+
+    Entries are pickled (page-number keys are ints, which JSON would not keep)
+    and evicted least-recently-used first once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = ".extraction_cache", max_bytes: int = 512 * 1024 * 1024,
+                 version: str = "1"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(self, file_path, variant: Optional[str] = None) -> str:
+        """Cache key for the file's current contents (a path or a DocumentSource)."""
+        key = f"{content_hash(file_path)}-v{self.version}"
+        return f"{key}-{variant}" if variant else key
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def get(self, file_path: str, variant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached final_data for this file, or None on a miss."""
+        entry = self.lookup(file_path, variant)
+        return entry.data if entry is not None else None
+
+    def lookup(self, file_path: str, variant: Optional[str] = None) -> Optional[CacheEntry]:
+        """Return the cache entry (data and storage targets) for this file, or None."""
+        entry_path = self._entry_path(self.key_for(file_path, variant))
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+            if not isinstance(entry, (CacheEntry, dict)):
+                raise ValueError(f"unexpected {type(entry).__name__} entry")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated or corrupted files, and entries pickled by code that
+            # has since changed (AttributeError, ImportError, ...), are misses
+            print(f"[ExtractionCache] Dropping unreadable entry {entry_path}: "
+                  f"{type(e).__name__}: {e}")
+            try:
+                self._remove(entry_path)
+            except OSError:
+                pass
+            return None
+
+        # Refresh the access time used for LRU eviction
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        if not isinstance(entry, CacheEntry):
+            # Written before entries recorded their targets
+            entry = CacheEntry(entry, frozenset())
+        return entry
+
+    def put(self, file_path: str, data: Dict[str, Any], variant: Optional[str] = None,
+            targets: Iterable[str] = ()):
+        """
+        Store final_data for this file and the storage targets holding it,
+        then evict if over the size limit.
+        """
+        entry_path = self._entry_path(self.key_for(file_path, variant))
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write to a temp file and rename so concurrent readers never see partial data
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(CacheEntry(data, frozenset(targets)), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def invalidate(self, file_path: str, variant: Optional[str] = None) -> bool:
+        """Drop the entry for this file's current contents. Returns True if one existed."""
+        return self._remove(self._entry_path(self.key_for(file_path, variant)))
+
+    def clear(self):
+        """Remove every cache entry."""
+        for entry_path, _, _ in self._entries():
+            self._remove(entry_path)
+
+    def size(self) -> int:
+        """Total size of all cache entries, in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits in max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for entry_path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            if self._remove(entry_path):
+                total -= size
+
+    def _entries(self):
+        """List (path, size, mtime) for every entry in the cache folder."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # removed by another process
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
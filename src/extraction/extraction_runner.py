@@ -0,0 +1,247 @@
+import os
+import contextlib
+from typing import Dict
+from src.formats.registry import get_format
+from src.loaders.archive_loader import document_name
+from src.loaders.document_source import DocumentSource
+
+from src.storage.file_storage import FileStorage
+from src.storage.sql_storage import SQLStorage
+from src.storage.columnar_storage import shared_columnar_storage
+from src.storage.pipeline import DEFAULT_SINKS, StoragePipeline
+from src.cache.extraction_cache import ExtractionCache
+from src.metrics.metrics import DocumentMetrics, MetricsReporter, timed
+
+def run_extraction(file_path, reporter: MetricsReporter = None, **options):
+    # file_path is a path or a DocumentSource (e.g. a member streamed out of
+    # an archive by iter_documents). options are _run_extraction's keywords;
+    # main.run_options() builds them from the command line.
+    if reporter is None:
+        return _run_extraction(file_path, **options)
+
+    # Stage timings, counters and (optionally) a profile for this document
+    with reporter.document(getattr(file_path, "name", file_path)) as metrics:
+        return _run_extraction(file_path, metrics=metrics, **options)
+
+def _run_extraction(file_path, page_workers: int = 1, cache: ExtractionCache = None,
+                    stream: bool = False, font_style_mode: str = "spans",
+                    keep_image_encoding: bool = False, table_detection: str = "auto",
+                    all_tables: bool = False, sql_storage: SQLStorage = None,
+                    incremental: bool = False, columnar_dir: str = None,
+                    columnar_format: str = "auto", sinks=DEFAULT_SINKS,
+                    profile: str = "full", metrics: DocumentMetrics = None):
+    # sql_storage lets a long-running caller (see src/service/daemon.py) reuse
+    # one open database connection instead of opening one per document
+    sinks = tuple(sinks)
+    if isinstance(file_path, DocumentSource):
+        source, file_path = file_path, file_path.name
+    else:
+        source = None
+
+    # The format's loader/extractor (and their libraries) are imported on first use
+    fmt = get_format(file_path)
+
+    # The file is mapped once; the cache hash, the loader and the extractor
+    # (e.g. pdfplumber for PDF tables) all read the same buffer
+    if source is None:
+        source = DocumentSource.from_path(file_path)
+
+    base_name = document_name(file_path)
+
+    # Passing columnar_dir alone keeps enabling the columnar sink
+    if columnar_dir and "columnar" not in sinks and not incremental:
+        sinks = tuple(sinks) + ("columnar",)
+
+    # SQL storage keeps one document per source: a re-run, a renamed copy (same
+    # content) or an edited file (same path) replaces it, in full and incremental runs
+    source_hash = source.sha256 if "sql" in sinks else None
+    source_path = os.path.abspath(file_path)
+    variant = cache_variant(profile, table_detection, all_tables, keep_image_encoding)
+    targets = _sink_targets(sinks, sql_storage, font_style_mode, columnar_dir, columnar_format)
+
+    # Unchanged documents were already extracted on a previous run; they are
+    # only stored again in sinks that do not hold them yet (e.g. a sink added
+    # since). Incremental runs compare page fingerprints instead.
+    if cache is not None and not incremental:
+        with timed(metrics, "cache_lookup"):
+            cached = cache.lookup(source, variant)
+        if cached is not None:
+            if metrics is not None:
+                metrics.count("cache_hits")
+            missing = tuple(name for name in sinks if targets[name] not in cached.targets)
+            if not missing:
+                print(f"Unchanged since last run, skipping: {file_path}")
+                return cached.data
+
+            print(f"Unchanged since last run, storing in {', '.join(missing)}: {file_path}")
+            with contextlib.ExitStack() as stack:
+                storages = _open_storages(stack, missing, sql_storage, font_style_mode,
+                                          columnar_dir, columnar_format)
+                with StoragePipeline(storages, metrics=metrics) as pipeline:
+                    pipeline.save(cached.data, base_name, source_hash, source_path)
+            with timed(metrics, "cache_store"):
+                cache.put(source, cached.data, variant,
+                          cached.targets.union(targets[name] for name in missing))
+            return cached.data
+
+    with timed(metrics, "load"):
+        doc_obj = fmt.load(source)
+        extractor = fmt.create_extractor(doc_obj, file_path, source=source,
+                                         page_workers=page_workers,
+                                         table_detection=table_detection, all_tables=all_tables,
+                                         keep_image_encoding=keep_image_encoding, metrics=metrics,
+                                         profile=profile)
+
+    if incremental:
+        if "sql" not in sinks:
+            raise ValueError("Incremental runs update the SQL database; enable the sql sink")
+        return _run_incremental(file_path, base_name, extractor, sql_storage, font_style_mode,
+                                source_path, source_hash, metrics)
+
+    with contextlib.ExitStack() as stack:
+        storages = _open_storages(stack, sinks, sql_storage, font_style_mode,
+                                  columnar_dir, columnar_format)
+        # Each storage writes on its own thread; closed before the SQL connection
+        pipeline = stack.enter_context(StoragePipeline(storages, metrics=metrics))
+
+        if stream:
+            # Page records go to every storage as they are extracted, so memory
+            # stays bounded by one page. Nothing is assembled, so nothing is cached.
+            with pipeline.open_stream(base_name, source_hash, source_path) as writer:
+                for record in extractor.iter_pages():
+                    writer.write_page(record)
+                    _count_record(metrics, record)
+            _count_storage(metrics, extractor, storages)
+
+            print(f"Extraction complete for: {file_path}")
+            return None
+
+        # One pass over the document builds text, links, images and tables
+        final_data = extractor.extract_all()
+
+        # File, SQL and columnar storage run in parallel; raises SinkError
+        # (after the other sinks finished) if any of them failed
+        pipeline.save(final_data, base_name, source_hash, source_path)
+
+    # Only reached once every sink stored the document
+    if cache is not None:
+        with timed(metrics, "cache_store"):
+            cache.put(source, final_data, variant, targets.values())
+
+    if metrics is not None:
+        text_data = final_data["text"]
+        metrics.count("pages", len(text_data["text"]))
+        metrics.count("spans", len(text_data["metadata"]["font_styles"]))
+        metrics.count("links", len(final_data["links"]))
+        metrics.count("images", len(final_data["images"]))
+        metrics.count("tables", len(final_data["tables"]))
+    _count_storage(metrics, extractor, storages)
+
+    print(f"Extraction complete for: {file_path}")
+    return final_data
+
+def _run_incremental(file_path: str, base_name: str, extractor, sql_storage: SQLStorage,
+                     font_style_mode: str, source_path: str, source_hash: str,
+                     metrics: DocumentMetrics = None):
+    """
+    Re-extract only the pages whose fingerprint changed since the last
+    incremental run of this file and update their SQL rows in place; rows of
+    removed pages are deleted. File outputs are left to full runs.
+    """
+    with _open_sql_storage(sql_storage, font_style_mode) as sql_storage:
+        with timed(metrics, "fingerprint"):
+            fingerprints = extractor.page_fingerprints()
+            plan = sql_storage.diff_pages(source_path, fingerprints, source_hash)
+
+        if plan["changed"] or plan["removed"] or plan["superseded"]:
+            records = extractor.iter_pages(page_numbers=plan["changed"])
+            with timed(metrics, "sql_save"):
+                plan["document_id"] = sql_storage.update_pages(base_name, source_path, plan,
+                                                               records, fingerprints, source_hash)
+        else:
+            print(f"No page changes since last run: {file_path}")
+
+        if metrics is not None:
+            metrics.count("pages", len(fingerprints))
+            metrics.count("pages_changed", len(plan["changed"]))
+            metrics.count("pages_removed", len(plan["removed"]))
+            metrics.count("bytes_written", extractor.image_writer.bytes_written)
+            metrics.count("sql_rows", sql_storage.rows_written)
+
+    print(f"Extraction complete for: {file_path}")
+    return plan
+
+def cache_variant(profile: str = "full", table_detection: str = "auto", all_tables: bool = False,
+                   keep_image_encoding: bool = False):
+    """
+    Cache key suffix for the options that change what is extracted. Runs
+    with the default options keep the plain key.
+    """
+    parts = []
+    if profile != "full":
+        parts.append(profile)
+    if table_detection != "auto":
+        parts.append(f"tables-{table_detection}")
+    if all_tables:
+        parts.append("all-tables")
+    if keep_image_encoding:
+        parts.append("keep-encoding")
+    return "-".join(parts) or None
+
+def _sink_targets(sinks, sql_storage: SQLStorage, font_style_mode: str, columnar_dir: str,
+                  columnar_format: str) -> Dict[str, str]:
+    """
+    Where and how each sink in `sinks` stores a document (see _open_storages).
+    Cache entries record the targets that hold them.
+    """
+    targets = {}
+    if "file" in sinks:
+        targets["file"] = f"file:{os.path.abspath('output')}:{font_style_mode}"
+    if "sql" in sinks:
+        db_path = sql_storage.db_path if sql_storage is not None else "extracted_data.db"
+        targets["sql"] = f"sql:{os.path.abspath(db_path)}:{font_style_mode}"
+    if "columnar" in sinks:
+        root = os.path.abspath(columnar_dir or "output/columnar")
+        targets["columnar"] = f"columnar:{root}:{columnar_format}:{font_style_mode}"
+    return targets
+
+def _open_sql_storage(sql_storage: SQLStorage, font_style_mode: str):
+    """The caller's open storage (left open), or a new one closed after use."""
+    if sql_storage is not None:
+        return contextlib.nullcontext(sql_storage)
+    return SQLStorage(db_path="extracted_data.db", font_style_mode=font_style_mode)
+
+def _open_storages(stack: contextlib.ExitStack, sinks, sql_storage: SQLStorage,
+                   font_style_mode: str, columnar_dir: str, columnar_format: str):
+    """The storages named in `sinks`, by name; ones opened here close with `stack`."""
+    storages = {}
+    if "file" in sinks:
+        storages["file"] = FileStorage(font_style_mode)
+    if "sql" in sinks:
+        storages["sql"] = stack.enter_context(_open_sql_storage(sql_storage, font_style_mode))
+    if "columnar" in sinks:
+        # Buffered per process and written in large parts across documents
+        storages["columnar"] = shared_columnar_storage(columnar_dir or "output/columnar",
+                                                       columnar_format,
+                                                       font_style_mode=font_style_mode)
+    return storages
+
+def _count_record(metrics: DocumentMetrics, record):
+    if metrics is None:
+        return
+    metrics.count("pages")
+    metrics.count("spans", len(record["font_styles"]))
+    metrics.count("links", len(record["links"]))
+    metrics.count("images", len(record["images"]))
+    metrics.count("tables", len(record["tables"]))
+
+def _count_storage(metrics: DocumentMetrics, extractor, storages):
+    if metrics is None:
+        return
+    # Image bytes from page-parallel workers are merged in by the extractor
+    bytes_written = extractor.image_writer.bytes_written
+    if "file" in storages:
+        bytes_written += storages["file"].bytes_written
+    metrics.count("bytes_written", bytes_written)
+    if "sql" in storages:
+        metrics.count("sql_rows", storages["sql"].rows_written)
@@ -2,384 +2,1045 @@ import os
 import csv
 import io
 import json
+import itertools
+from typing import List, Optional
+
+# fitz, pdfplumber and PIL are imported where they are used, so importing
+# this module (or handling one format) does not load every format's backend.
+
+from .docx_walker import DocxPackage, DocxTable
+from .fingerprints import fingerprint, opc_part_parts
+from .font_styles import FontStyleColumns
+from .headings import HeadingClassifier
+from .image_writer import ImageWriter, image_digest
+from .page_records import merge_page_records, new_page_record
+from src.loaders.archive_loader import document_name
+from src.loaders.document_source import DocumentSource
+from src.metrics.metrics import DocumentMetrics, timed
+
+# Bump whenever extractor output changes, so cached results are not reused
+EXTRACTOR_VERSION = "10"
+
+# Sections a PDF page record can be built from
+PDF_SECTIONS = frozenset({"text", "links", "images", "tables"})
+
+TABLE_DETECTION_MODES = ("auto", "all", "fitz")
+
+# What each extractor collects:
+#   "full"   - every section, with span/run-level font styles and headings
+#   "text"   - plain text only, from the cheapest text mode; no font styles,
+#              headings, links, images or tables
+#   "layout" - like "full", with text in reading order (top to bottom, then
+#              left to right) instead of the order it is stored in
+EXTRACTION_PROFILES = ("full", "text", "layout")
+
+
+def profile_sections(profile: str) -> frozenset:
+    """The sections an extraction profile extracts; ValueError if unknown."""
+    if profile not in EXTRACTION_PROFILES:
+        raise ValueError(f"Unsupported profile: {profile}")
+    return frozenset({"text"}) if profile == "text" else PDF_SECTIONS
+
+
+def profile_version(profile: str) -> str:
+    """EXTRACTOR_VERSION qualified by the profile, so profiles never share results."""
+    return EXTRACTOR_VERSION if profile == "full" else f"{EXTRACTOR_VERSION}-{profile}"
 
-import fitz        # For PDF
-import pdfplumber  # Also for PDF table extraction
-from docx import Document
-from pptx import Presentation
-from PIL import Image
 
 class PDFDataExtractor:
     """
     Extracts text, links, images, and tables from a PyMuPDF Document object.
     """
 
-    def __init__(self, pdf_doc, file_path: str):
+    def __init__(self, pdf_doc, file_path: str, workers: int = 1, chunk_size: int = None,
+                 image_writer: ImageWriter = None, table_detection: str = "auto",
+                 all_tables: bool = False, metrics: DocumentMetrics = None,
+                 source: DocumentSource = None, profile: str = "full"):
+        """
+        Args:
+            table_detection: how pages are picked for table extraction:
+                "auto" - only pages whose vector drawings contain both horizontal
+                         and vertical rulings are handed to pdfplumber,
+                "all"  - every page goes through pdfplumber,
+                "fitz" - PyMuPDF's own table finder, pdfplumber is not used.
+            all_tables: extract every table on a page instead of only the first.
+            metrics: optional DocumentMetrics that collects per-stage timings.
+            source: the DocumentSource pdf_doc was opened from; pdfplumber reads
+                the same buffer instead of opening file_path again.
+            profile: see EXTRACTION_PROFILES. "text" reads pages with
+                get_text("text"), "layout" with get_text("dict", sort=True).
+        """
+        if table_detection not in TABLE_DETECTION_MODES:
+            raise ValueError(f"Unsupported table_detection: {table_detection}")
+
         self.pdf_doc = pdf_doc     # a fitz Document
         self.file_path = file_path # so we can name output folders, etc.
+        self.workers = max(workers or 1, 1)  # >1 enables page-parallel extraction
+        self.chunk_size = chunk_size         # pages per worker task (None = auto)
+        self.image_writer = image_writer or ImageWriter()  # background, de-duplicating writes
+        self.table_detection = table_detection
+        self.all_tables = all_tables
+        self.metrics = metrics
+        self.source = source
+        self.profile = profile
+        self.sections = profile_sections(profile)
+        self._plumber_pdf = None             # opened on the first page that needs it
 
-    def extract_text(self):
-        text_content = {}
-        font_styles = []
-        headings = {}
+    def _images_dir(self):
+        output_dir = os.path.join("output", document_name(self.file_path), "images")
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
 
-        for page_index, page in enumerate(self.pdf_doc):
-            page_num = page_index + 1
-            blocks = page.get_text("dict")["blocks"]
-            page_text = []
+    def _tables_dir(self):
+        output_dir = os.path.join("output/tables", document_name(self.file_path))
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
 
-            for block in blocks:
-                for line in block.get("lines", []):
-                    for span in line.get("spans", []):
-                        font_size = span["size"]
-                        font_name = span["font"]
-                        extracted_text = span["text"].strip()
-
-                        if extracted_text:
-                            page_text.append(extracted_text)
-                            font_styles.append({
-                                "page_number": page_num,
-                                "text": extracted_text,
-                                "font": font_name,
-                                "size": font_size
-                            })
-                            # Simple heading heuristic
-                            if font_size >= 14:
-                                if page_num not in headings:
-                                    headings[page_num] = []
-                                headings[page_num].append(extracted_text)
+    def _page_text(self, page, page_num):
+        page_text = []
+        font_styles = FontStyleColumns()
 
-            text_content[page_num] = page_text
+        if self.profile == "text":
+            # Plain text straight from MuPDF, one entry per line, no span dicts
+            for line in page.get_text("text").splitlines():
+                line = line.strip()
+                if line:
+                    page_text.append(line)
+            return page_text, font_styles
 
-        return {
-            "text": text_content,
-            "metadata": {
-                "font_styles": font_styles,
-                "headings": headings
-            }
-        }
+        blocks = page.get_text("dict", sort=self.profile == "layout")["blocks"]
+        for block in blocks:
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    font_size = span["size"]
+                    font_name = span["font"]
+                    extracted_text = span["text"].strip()
+
+                    if extracted_text:
+                        page_text.append(extracted_text)
+                        font_styles.append(page_num, extracted_text, font_name, font_size)
+
+        return page_text, font_styles
+
+    def _page_links(self, page, page_num):
+        links_info = []
+        for link in page.get_links():
+            if 'uri' in link:
+                links_info.append({
+                    "url": link['uri'],
+                    "page_number": page_num
+                })
+        return links_info
+
+    def _page_images(self, page, page_num, output_dir):
+        images_info = []
+        for img in page.get_images(full=True):
+            xref = img[0]
+            # Images shared across pages (logos, backgrounds) are decoded and stored once
+            xref_key = (self.file_path, xref)
+            img_path = self.image_writer.lookup(xref_key)
+            if img_path is None:
+                base_image = self.pdf_doc.extract_image(xref)
+                image_data = base_image["image"]
+                digest = image_digest(image_data)
+                img_path = self.image_writer.lookup(digest)
+                if img_path is None:
+                    img_filename = f"image_{digest[:16]}.{base_image['ext']}"
+                    img_path = self.image_writer.write_bytes(
+                        os.path.join(output_dir, img_filename), image_data, digest
+                    )
+                self.image_writer.remember(img_path, xref_key)
+
+            images_info.append({
+                "page_number": page_num,
+                "image_path": img_path
+            })
+        return images_info
+
+    @staticmethod
+    def _has_ruling_lines(page) -> bool:
+        """
+        Cheap pre-filter for pdfplumber's default (lines-based) table finder:
+        a table needs at least two horizontal and two vertical ruling edges,
+        which come from line, rectangle and curve drawing items.
+        """
+        horizontal = vertical = 0
+        for path in page.get_drawings():
+            for item in path["items"]:
+                kind = item[0]
+                if kind == "l":
+                    p1, p2 = item[1], item[2]
+                    if abs(p1.y - p2.y) < 1:
+                        horizontal += 1
+                    elif abs(p1.x - p2.x) < 1:
+                        vertical += 1
+                elif kind in ("re", "qu"):
+                    horizontal += 2
+                    vertical += 2
+                elif kind == "c":
+                    horizontal += 1
+                    vertical += 1
+                if horizontal >= 2 and vertical >= 2:
+                    return True
+        return False
+
+    def _plumber_page(self, page_index):
+        if self._plumber_pdf is None:
+            import pdfplumber
+            self._plumber_pdf = pdfplumber.open(
+                self.source.reader() if self.source is not None else self.file_path)
+        return self._plumber_pdf.pages[page_index]
+
+    def _close_plumber(self):
+        if self._plumber_pdf is not None:
+            self._plumber_pdf.close()
+            self._plumber_pdf = None
+
+    def _find_tables(self, page):
+        """Return the tables on a page (list of row lists), using the configured detector."""
+        if self.table_detection == "fitz":
+            found = [table.extract() for table in page.find_tables().tables]
+            return [rows for rows in found if rows]
+
+        if self.table_detection == "auto" and not self._has_ruling_lines(page):
+            return []
+
+        plumber_page = self._plumber_page(page.number)
+        try:
+            if self.all_tables:
+                return [rows for rows in plumber_page.extract_tables() if rows]
+            extracted_table = plumber_page.extract_table()
+            return [extracted_table] if extracted_table else []
+        finally:
+            # Drop pdfplumber's cached layout objects for this page
+            plumber_page.close()
+
+    def _page_tables(self, page, page_num, output_dir):
+        tables = self._find_tables(page)
+        if not self.all_tables:
+            tables = tables[:1]
+
+        tables_info = []
+        for table_index, extracted_table in enumerate(tables):
+            if self.all_tables:
+                table_filename = f"page_{page_num}_table_{table_index}.csv"
+            else:
+                table_filename = f"page_{page_num}_table.csv"
+            table_path = os.path.join(output_dir, table_filename)
+            with open(table_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                for row in extracted_table:
+                    writer.writerow(row)
+
+            tables_info.append({
+                "page_number": page_num,
+                "table_index": table_index,
+                "table_data": extracted_table,
+                "table_path": table_path
+            })
+        return tables_info
+
+    def extract_text(self):
+        return merge_page_records(self._extract_pages({"text"}))["text"]
 
     def extract_links(self):
         links_info = []
         for page_index, page in enumerate(self.pdf_doc):
-            page_num = page_index + 1
-            links = page.get_links()
-            for link in links:
-                if 'uri' in link:
-                    links_info.append({
-                        "url": link['uri'],
-                        "page_number": page_num
-                    })
+            links_info.extend(self._page_links(page, page_index + 1))
         return links_info
 
     def extract_images(self):
         images_info = []
-        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
-        output_dir = os.path.join("output", base_name, "images")
-        os.makedirs(output_dir, exist_ok=True)
+        output_dir = self._images_dir()
+        for page_index, page in enumerate(self.pdf_doc):
+            images_info.extend(self._page_images(page, page_index + 1, output_dir))
+
+        failed = self.image_writer.flush()
+        return [img for img in images_info if img["image_path"] not in failed]
+
+    def extract_tables(self):
+        return merge_page_records(self._extract_pages({"tables"}))["tables"]
+
+    def extract_page(self, page, page_num, images_dir, tables_dir, sections=PDF_SECTIONS):
+        """
+        Extract the requested sections for a single page in one visit and return
+        a page record:
+            {"page_number", "text", "font_styles", "headings", "links", "images", "tables"}
+        Sections that were not requested come back empty. Headings are left
+        to iter_pages, which classifies them against the document's font sizes.
+        """
+        record = new_page_record(page_num)
+        if "text" in sections:
+            with timed(self.metrics, "extract_text"):
+                record["text"], record["font_styles"] = self._page_text(page, page_num)
+        if "links" in sections:
+            with timed(self.metrics, "extract_links"):
+                record["links"] = self._page_links(page, page_num)
+        if "images" in sections:
+            with timed(self.metrics, "extract_images"):
+                record["images"] = self._page_images(page, page_num, images_dir)
+        if "tables" in sections:
+            with timed(self.metrics, "extract_tables"):
+                record["tables"] = self._page_tables(page, page_num, tables_dir)
+        return record
+
+    def iter_range(self, start: int, stop: int, sections=PDF_SECTIONS):
+        """
+        Yield page records for pages [start, stop) (0-based indexes), one page
+        at a time. pdfplumber is only opened once a page needs table extraction.
+        """
+        images_dir = self._images_dir() if "images" in sections else None
+        tables_dir = self._tables_dir() if "tables" in sections else None
+
+        records = (
+            self.extract_page(self.pdf_doc[page_index], page_index + 1, images_dir, tables_dir, sections)
+            for page_index in range(start, stop)
+        )
+        # Images are written in the background; records wait until theirs are on disk
+        if "images" in sections:
+            records = _with_written_images(records, self.image_writer, self.metrics)
+        try:
+            yield from records
+        finally:
+            self._close_plumber()
+
+    def extract_range(self, start: int, stop: int, sections=PDF_SECTIONS):
+        """Return the page records for pages [start, stop) as a list."""
+        return list(self.iter_range(start, stop, sections))
+
+    def _page_chunks(self):
+        """Split the page range into (start, stop) chunks for the worker pool."""
+        page_count = len(self.pdf_doc)
+        chunk_size = self.chunk_size or max(1, -(-page_count // (self.workers * 4)))
+        return [(start, min(start + chunk_size, page_count))
+                for start in range(0, page_count, chunk_size)]
 
+    def iter_pages(self, sections=None, page_numbers=None):
+        """
+        Yield page records for the whole document, in page order (sections
+        default to the profile's). With
+        workers > 1 the page range is split into chunks that run in worker
+        processes, each opening its own fitz/pdfplumber handles.
+
+        Headings are classified against the font sizes of the whole
+        document, so a page gets the same headings whether it is extracted
+        alone, streamed or in a full run. The records are therefore held
+        until the last page is extracted and labelled from the font styles
+        they carry (the text profile, which has no headings, streams page by page).
+
+        page_numbers (1-based) limits extraction to those pages, e.g. the
+        pages whose fingerprint changed since the last run.
+        """
+        sections = sections or self.sections
+        records = self._iter_records(sections, page_numbers)
+        if "text" not in sections or self.profile == "text":
+            yield from records
+            return
+
+        records = list(records)
+        with timed(self.metrics, "classify_headings"):
+            classifier = self._heading_classifier(records, page_numbers)
+            for record in records:
+                if record["font_styles"]:
+                    classifier.label(record, observe=False)
+        yield from records
+
+    def _heading_classifier(self, records, page_numbers=None) -> HeadingClassifier:
+        """
+        A HeadingClassifier that has observed the spans of every page: those
+        of the extracted records, plus (when only some pages were extracted)
+        the span sizes of the other pages, read without image blocks.
+        """
+        classifier = HeadingClassifier(prior_chars=0)
+        for record in records:
+            classifier.observe_columns(record["font_styles"])
+        if page_numbers is None:
+            return classifier
+
+        import fitz
+
+        extracted = {record["page_number"] for record in records}
+        flags = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
         for page_index, page in enumerate(self.pdf_doc):
-            page_num = page_index + 1
-            image_list = page.get_images(full=True)
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
-                base_image = self.pdf_doc.extract_image(xref)
-                image_data = base_image["image"]
-                ext = base_image["ext"]
+            if page_index + 1 in extracted:
+                continue
+            sizes, lengths = [], []
+            for block in page.get_text("dict", flags=flags)["blocks"]:
+                for line in block.get("lines", []):
+                    for span in line.get("spans", []):
+                        length = len(span["text"].strip())
+                        if length:
+                            sizes.append(span["size"])
+                            lengths.append(length)
+            classifier.observe(sizes, lengths)
+        return classifier
 
-                img_filename = f"page_{page_num}_img_{img_index}.{ext}"
-                img_path = os.path.join(output_dir, img_filename)
+    def _iter_records(self, sections, page_numbers):
+        """Page records without headings, from this process or the page-parallel workers."""
+        if page_numbers is not None:
+            for start, stop in _page_runs(page_numbers, len(self.pdf_doc)):
+                yield from self.iter_range(start, stop, sections)
+            return
 
-                with open(img_path, "wb") as f:
-                    f.write(image_data)
+        chunks = self._page_chunks() if self.workers > 1 else []
+        # Workers reopen the document by path, so it has to exist on disk
+        path = self.source.path if self.source is not None else self.file_path
+        if len(chunks) < 2 or not path or not os.path.isfile(path):
+            yield from self.iter_range(0, len(self.pdf_doc), sections)
+            return
 
-                images_info.append({
-                    "page_number": page_num,
-                    "image_path": img_path
-                })
-        return images_info
+        from concurrent.futures import ProcessPoolExecutor
 
-    def extract_tables(self):
-        tables_info = []
-        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
-        output_dir = os.path.join("output/tables", base_name)
-        os.makedirs(output_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(_extract_pdf_page_range, path, start, stop, sections,
+                                self._worker_options())
+                for start, stop in chunks
+            ]
+            # Futures are consumed in submission order, so records stay in page order
+            for future in futures:
+                records, worker_metrics = future.result()
+                if self.metrics is not None:
+                    self.metrics.merge(worker_metrics)
+                yield from records
 
-        # Use pdfplumber for table extraction
-        with pdfplumber.open(self.file_path) as pdf_file:
-            for page_index, page in enumerate(pdf_file.pages):
-                page_num = page_index + 1
-                extracted_table = page.extract_table()
-                if extracted_table:
-                    table_filename = f"page_{page_num}_table.csv"
-                    table_path = os.path.join(output_dir, table_filename)
-                    with open(table_path, "w", newline="", encoding="utf-8") as f:
-                        writer = csv.writer(f)
-                        for row in extracted_table:
-                            writer.writerow(row)
-
-                    tables_info.append({
-                        "page_number": page_num,
-                        "table_data": extracted_table,
-                        "table_path": table_path
-                    })
+    def page_fingerprints(self):
+        """
+        {page_number: fingerprint} from each page's content stream, the forms
+        (Form XObjects, nested ones too) and images it draws, the fonts it
+        uses and its links - everything the extracted record depends on.
+        """
+        doc = self.pdf_doc
+        digests = {}       # xref -> digest, resources are often shared between pages
 
-        return tables_info
+        def digest(xref, read):
+            if xref not in digests:
+                digests[xref] = image_digest(read(xref))
+            return digests[xref].encode("ascii")
+
+        def form(xref):
+            return doc.xref_object(xref, compressed=True).encode("utf-8") + (doc.xref_stream_raw(xref) or b"")
+
+        fingerprints = {}
+        for page_index, page in enumerate(doc):
+            parts = [page.read_contents()]
+            for xref in sorted({xobj[0] for xobj in page.get_xobjects()}):
+                parts.append(digest(xref, form))
+            for xref in sorted({img[0] for img in page.get_images(full=True)}):
+                parts.append(digest(xref, lambda x: doc.xref_stream_raw(x) or b""))
+            for xref in sorted({font[0] for font in page.get_fonts(full=True) if font[0]}):
+                parts.append(digest(xref, self._font_data))
+            for link in page.get_links():
+                parts.append(repr((link.get("uri"), tuple(link["from"]))).encode("utf-8"))
+            fingerprints[page_index + 1] = fingerprint(parts, profile_version(self.profile))
+        return fingerprints
+
+    def _font_data(self, xref: int) -> bytes:
+        """A font's dictionary, embedded font file and ToUnicode map."""
+        doc = self.pdf_doc
+        parts = [doc.xref_object(xref, compressed=True).encode("utf-8"), doc.extract_font(xref)[3] or b""]
+        kind, value = doc.xref_get_key(xref, "ToUnicode")
+        if kind == "xref":
+            parts.append(doc.xref_stream_raw(int(value.split()[0])) or b"")
+        return b"\0".join(parts)
+
+    def _worker_options(self):
+        """Constructor options that page-parallel workers must share."""
+        return {
+            "table_detection": self.table_detection,
+            "all_tables": self.all_tables,
+            "profile": self.profile,
+            "collect_metrics": self.metrics is not None
+        }
+
+    def _extract_pages(self, sections):
+        return list(self.iter_pages(sections))
+
+    def extract_all(self):
+        """
+        Single-pass extraction: each page is visited once and text, links, images
+        and tables are built together (pdfplumber only sees pages that may hold tables).
+        Returns the same dict shape that run_extraction assembles from the four
+        individual extract_* calls; sections outside the profile come back empty.
+        """
+        return merge_page_records(self._extract_pages(self.sections))
+
+
+def _with_written_images(records, image_writer: ImageWriter, metrics: DocumentMetrics = None):
+    """
+    Yield page records once the images they reference are on disk, dropping
+    images that failed to write. Each record is held while the next one is
+    extracted, so the background writes still overlap extraction.
+    """
+    def written(record):
+        if record["images"]:
+            with timed(metrics, "extract_images"):
+                failed = image_writer.wait(img["image_path"] for img in record["images"])
+            if failed:
+                record["images"] = [img for img in record["images"] if img["image_path"] not in failed]
+        return record
+
+    previous = None
+    for record in records:
+        if previous is not None:
+            yield written(previous)
+        previous = record
+    if previous is not None:
+        yield written(previous)
+
+    with timed(metrics, "extract_images"):
+        image_writer.flush()
+
+
+def _page_runs(page_numbers, page_count):
+    """Group 1-based page numbers into contiguous 0-based [start, stop) ranges."""
+    runs = []
+    for page_num in sorted(set(page_numbers)):
+        if not 1 <= page_num <= page_count:
+            continue
+        if runs and runs[-1][1] == page_num - 1:
+            runs[-1][1] = page_num
+        else:
+            runs.append([page_num - 1, page_num])
+    return [tuple(run) for run in runs]
+
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int, sections, options):
+    """
+    Worker entry point for page-parallel extraction: maps the file (the OS
+    shares its pages between workers), opens private fitz/pdfplumber handles
+    on it and extracts pages [start, stop). Returns the page
+    records plus this worker's metrics snapshot (stage timings, image bytes).
+    """
+    options = dict(options)
+    import fitz
+
+    metrics = DocumentMetrics(file_path) if options.pop("collect_metrics", False) else None
+    source = DocumentSource.from_path(file_path)
+    pdf_doc = fitz.open(stream=source.buffer, filetype="pdf")
+    try:
+        extractor = PDFDataExtractor(pdf_doc, file_path, metrics=metrics, source=source, **options)
+        records = extractor.extract_range(start, stop, sections)
+    finally:
+        pdf_doc.close()
+        source.close()
+
+    if metrics is None:
+        return records, {}
+    metrics.count("bytes_written", extractor.image_writer.bytes_written)
+    return records, metrics.snapshot()
+
+
+def _docx_style_level(style_name: str) -> int:
+    """Heading level implied by a paragraph style name (0 for body styles)."""
+    if style_name == "Title":
+        return 1
+    if style_name.startswith("Heading"):
+        number = style_name[len("Heading"):].strip()
+        return min(int(number), 3) if number.isdigit() else 1
+    return 0
+
+
+def _docx_spans(paragraph):
+    """Merge a paragraph's consecutive runs of the same font and size into spans."""
+    spans = []
+    for key, runs in itertools.groupby(paragraph.runs, key=lambda run: (run.font, run.size)):
+        text = "".join(run.text for run in runs).strip()
+        if text:
+            spans.append((text, key[0], key[1]))
+    return spans
+
+
+def _docx_dominant(paragraph):
+    """(font, size, bold) of a paragraph: the font and size carrying most characters, bold if every run is."""
+    chars = {}
+    runs = [run for run in paragraph.runs if run.text.strip()]
+    for run in runs:
+        chars[(run.font, run.size)] = chars.get((run.font, run.size), 0) + len(run.text)
+    font, size = max(chars, key=chars.get)
+    return font, size, all(run.bold for run in runs)
 
 
 class DOCXDataExtractor:
     """
-    Extracts text, links, images, and tables from a python-docx Document object.
+    Extracts text, links, images, and tables from a DOCX in one streaming
+    walk over its body (see src/extractors/docx_walker.py).
     """
 
-    def __init__(self, docx_doc, file_path: str):
-        self.docx_doc = docx_doc   # a Document
+    def __init__(self, docx_doc, file_path: str, image_writer: ImageWriter = None,
+                 metrics: DocumentMetrics = None, profile: str = "full"):
+        """
+        Args:
+            docx_doc: a DocxPackage (what DOCXPackageLoader returns) or a
+                python-docx Document, which is converted to one.
+            profile: see EXTRACTION_PROFILES. "text" skips resolving run
+                fonts through the styles; "layout" is the same as "full"
+                (the body is already in reading order).
+        """
+        if not isinstance(docx_doc, DocxPackage):
+            docx_doc = DocxPackage.from_document(docx_doc)
+        self.docx_doc = docx_doc   # a DocxPackage
         self.file_path = file_path
+        self.image_writer = image_writer or ImageWriter()
+        self.metrics = metrics
+        self.profile = profile
+        self.sections = profile_sections(profile)
 
-    def extract_text(self):
-        text_content = {}
-        headings = {}
-        font_styles = []
-        page_num = 1  # For DOCX we typically treat everything as page 1
-
-        all_paragraphs = []
-        for para in self.docx_doc.paragraphs:
-            txt = para.text.strip()
-            if txt:
-                all_paragraphs.append(txt)
-                style_name = para.style.name if para.style else "Normal"
-                font_styles.append({
-                    "page_number": page_num,
-                    "text": txt,
-                    "font": style_name,
-                    "size": 12  # rough default
-                })
-                if style_name.startswith("Heading"):
-                    headings.setdefault(page_num, []).append(txt)
+    def _images_dir(self):
+        output_dir = os.path.join("output", document_name(self.file_path), "images")
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
 
-        text_content[page_num] = all_paragraphs
+    def _tables_dir(self):
+        output_dir = os.path.join("output/tables", document_name(self.file_path))
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
+
+    def _image(self, rel, page_num, output_dir):
+        blob = self.docx_doc.read_part(rel.target)
+        digest = image_digest(blob)
+        img_path = self.image_writer.lookup(digest)
+        if img_path is None:
+            img_ext = os.path.splitext(rel.target)[1]
+            img_path = self.image_writer.write_bytes(
+                os.path.join(output_dir, f"image_{digest[:16]}{img_ext}"), blob, digest
+            )
         return {
-            "text": text_content,
-            "metadata": {
-                "headings": headings,
-                "font_styles": font_styles
-            }
+            "page_number": page_num,
+            "image_path": img_path
         }
 
-    def extract_links(self):
-        links_info = []
-        page_num = 1
-
-        for para in self.docx_doc.paragraphs:
-            for run in para.runs:
-                if hasattr(run._element, 'xpath'):
-                    hyperlink_refs = run._element.xpath('.//w:hyperlink')
-                    for link_ref in hyperlink_refs:
-                        rel_id = link_ref.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                        if rel_id and rel_id in self.docx_doc.part.rels:
-                            target = self.docx_doc.part.rels[rel_id].target_ref
-                            link_text = run.text.strip()
-                            links_info.append({
-                                "url": target,
-                                "page_number": page_num,
-                                "text": link_text
-                            })
+    @staticmethod
+    def _table(table, page_num, tbl_index, output_dir):
+        table_path = os.path.join(output_dir, f"table_{tbl_index}.csv")
+        with open(table_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(table.rows)
+        return {
+            "page_number": page_num,
+            "table_index": tbl_index,
+            "table_data": table.rows,
+            "table_path": table_path
+        }
 
-        return links_info
+    def _iter_records(self, sections, page_numbers=None):
+        """
+        Page records from one pass over the body, in page order (pages are
+        counted from the document's breaks, see DocxWalker). Sections that
+        were not requested come back empty.
 
-    def extract_images(self):
-        images_info = []
-        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
-        output_dir = os.path.join("output", base_name, "images")
-        os.makedirs(output_dir, exist_ok=True)
+        Every page is walked, so heading statistics and table numbers do not
+        depend on page_numbers, which only limits the records built and
+        yielded (and the images and CSVs written). Headings are classified
+        against the paragraph sizes of the whole body, so pages are held
+        until the walk ends (the text profile, without headings, yields
+        each page as soon as it ends).
+        """
+        images_dir = self._images_dir() if "images" in sections else None
+        tables_dir = self._tables_dir() if "tables" in sections else None
+        rels = self.docx_doc.rels
+        # The text profile needs neither run fonts nor headings
+        fonts = self.profile != "text"
+        classifier = HeadingClassifier(prior_chars=0) if fonts else None
+        pages = []      # wanted pages waiting for the whole body's statistics
+        page = None
+        tbl_index = 0
 
-        image_index = 0
-        for rel in self.docx_doc.part.rels.values():
-            if "image" in rel.reltype:
-                img_ext = os.path.splitext(rel.target_ref)[1]
-                img_path = os.path.join(output_dir, f"image_{image_index}{img_ext}")
-                with open(img_path, "wb") as f:
-                    f.write(rel.target_part.blob)
-                images_info.append({
-                    "page_number": 1,
-                    "image_path": img_path
-                })
-                image_index += 1
-        return images_info
+        items = iter(self.docx_doc.walk(fonts=fonts))
+        while True:
+            with timed(self.metrics, "walk_docx"):
+                item = next(items, None)
+            if item is None:
+                break
+
+            if page is None or item.page != page.record["page_number"]:
+                if page is not None:
+                    yield from page.end(classifier, pages)
+                wanted = page_numbers is None or item.page in page_numbers
+                page = _DocxPage(item.page, wanted, fonts)
+            record = page.record
+
+            if isinstance(item, DocxTable):
+                if page.wanted and "tables" in sections:
+                    record["tables"].append(self._table(item, item.page, tbl_index, tables_dir))
+                tbl_index += 1
+            elif "text" in sections:
+                page.add_paragraph(item)
+
+            if not page.wanted:
+                continue
+            if "links" in sections:
+                for url, link_text in item.links:
+                    record["links"].append({
+                        "url": url,
+                        "page_number": item.page,
+                        "text": link_text.strip()
+                    })
+            if "images" in sections:
+                for r_id in item.images:
+                    rel = rels.get(r_id)
+                    if r_id in page.image_ids or rel is None or rel.external:
+                        continue
+                    page.image_ids.add(r_id)
+                    record["images"].append(self._image(rel, item.page, images_dir))
+
+        if page is not None:
+            yield from page.end(classifier, pages)
+        for page in pages:
+            page.label(classifier, self.metrics)
+            yield page.record
+
+    def _extract(self, section):
+        records = list(self._iter_records({section}))
+        if section == "images":
+            failed = self.image_writer.flush()
+            for record in records:
+                record["images"] = [img for img in record["images"] if img["image_path"] not in failed]
+        return merge_page_records(records)[section]
+
+    def extract_text(self):
+        return self._extract("text")
+
+    def extract_links(self):
+        return self._extract("links")
+
+    def extract_images(self):
+        return self._extract("images")
 
     def extract_tables(self):
-        tables_info = []
-        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
-        output_dir = os.path.join("output/tables", base_name)
-        os.makedirs(output_dir, exist_ok=True)
+        return self._extract("tables")
 
-        for tbl_index, table in enumerate(self.docx_doc.tables):
-            extracted_data = []
-            for row in table.rows:
-                row_data = [cell.text.strip() for cell in row.cells]
-                extracted_data.append(row_data)
+    def extract_all(self):
+        """Walk the body once and return the combined document dict."""
+        return merge_page_records(self.iter_pages())
 
-            table_filename = f"table_{tbl_index}.csv"
-            table_path = os.path.join(output_dir, table_filename)
-            with open(table_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerows(extracted_data)
+    def page_fingerprints(self):
+        """
+        {page_number: fingerprint} from what the walker reads on each page:
+        text with resolved run fonts, link targets, table cells and the
+        pictures placed (by part name and CRC-32, so images are not read).
+        """
+        rels = self.docx_doc.rels
+        parts = {}
+        for item in self.docx_doc.walk(fonts=self.profile != "text"):
+            page_parts = parts.setdefault(item.page, [])
+            page_parts.append(repr(item).encode("utf-8"))
+            for r_id in item.images:
+                rel = rels.get(r_id)
+                if rel is not None and not rel.external and self.docx_doc.has_part(rel.target):
+                    page_parts.append(f"{rel.target} {self.docx_doc.part_crc(rel.target):08x}".encode("utf-8"))
+        return {page_num: fingerprint(page_parts, profile_version(self.profile))
+                for page_num, page_parts in parts.items()}
 
-            tables_info.append({
-                "page_number": 1,
-                "table_index": tbl_index,
-                "table_data": extracted_data,
-                "table_path": table_path
-            })
+    def iter_pages(self, page_numbers=None):
+        """
+        Yield one page record per page that has body content, as pages are
+        read. page_numbers limits the records to those pages (1-based).
+        """
+        if page_numbers is not None:
+            page_numbers = set(page_numbers)
+        yield from _with_written_images(self._iter_records(self.sections, page_numbers),
+                                        self.image_writer, self.metrics)
+
+
+class _DocxPage:
+    """A DOCX page record being filled while the walker is on that page."""
+
+    def __init__(self, page_num: int, wanted: bool, fonts: bool = True):
+        self.record = new_page_record(page_num)
+        self.wanted = wanted
+        self.fonts = fonts         # collect font styles and headings
+        self.image_ids = set()     # each picture once per page
+        # One entry per paragraph (its dominant font and size) for the classifier
+        self.paragraph_styles = FontStyleColumns()
+        self.bold = []
+        self.style_levels = []
+
+    def add_paragraph(self, paragraph):
+        txt = paragraph.text.strip()
+        if not txt:
+            return
+        page_num = self.record["page_number"]
+        if self.wanted:
+            self.record["text"].append(txt)
+        if not self.fonts:
+            return
+        if self.wanted:
+            for span_text, font, size in _docx_spans(paragraph):
+                self.record["font_styles"].append(page_num, span_text, font, size)
+        font, size, is_bold = _docx_dominant(paragraph)
+        self.paragraph_styles.append(page_num, txt, font, size)
+        self.bold.append(is_bold)
+        self.style_levels.append(_docx_style_level(paragraph.style))
+
+    def end(self, classifier: Optional[HeadingClassifier], pages: List["_DocxPage"]):
+        """
+        The walker has left the page: add its paragraphs to the document's
+        font statistics (even when the page is not wanted). A wanted page is
+        queued on `pages` for labelling, or yielded now when there are no
+        headings to classify.
+        """
+        if classifier is None:
+            if self.wanted:
+                yield self.record
+            return
+        if self.paragraph_styles:
+            classifier.observe_columns(self.paragraph_styles)
+        if self.wanted:
+            pages.append(self)
+
+    def label(self, classifier: HeadingClassifier, metrics: DocumentMetrics = None):
+        """Classify the page's paragraphs against the whole body's statistics."""
+        if not self.paragraph_styles:
+            return
+        # Heading styles give their own level; other paragraphs are judged by
+        # size and boldness against the whole body
+        with timed(metrics, "classify_headings"):
+            levels = classifier.classify(self.paragraph_styles, bold=self.bold,
+                                         observe=False).tolist()
+        for txt, style_level, level in zip(self.paragraph_styles.texts, self.style_levels, levels):
+            level = style_level or level
+            if level:
+                self.record["headings"].append(txt)
+                self.record["heading_levels"].append(level)
 
-        return tables_info
 
 class PPTDataExtractor:
     """
     Extracts text, links, images, and tables from a python-pptx Presentation object.
     """
 
-    def __init__(self, ppt_doc, file_path: str):
+    def __init__(self, ppt_doc, file_path: str, image_writer: ImageWriter = None,
+                 keep_original_encoding: bool = False, metrics: DocumentMetrics = None,
+                 profile: str = "full"):
+        """
+        Args:
+            profile: see EXTRACTION_PROFILES. "text" skips run font lookups
+                and title headings; "layout" visits shapes by position
+                (top, then left) instead of z-order.
+        """
         self.ppt_doc = ppt_doc
         self.file_path = file_path
+        self.image_writer = image_writer or ImageWriter()
+        self.metrics = metrics
+        # Store picture blobs as-is instead of re-encoding them to PNG with PIL
+        self.keep_original_encoding = keep_original_encoding
+        self.profile = profile
+        self.sections = profile_sections(profile)
 
-    def extract_text(self):
-        text_content = {}
-        headings = {}
-        font_styles = []
-
-        for i, slide in enumerate(self.ppt_doc.slides):
-            slide_num = i + 1
-            slide_text_list = []
-
-            # Title placeholder
-            if slide.shapes.title and hasattr(slide.shapes.title, 'text'):
-                title_text = slide.shapes.title.text.strip()
-                if title_text:
-                    slide_text_list.append(title_text)
-                    headings.setdefault(slide_num, []).append(title_text)
-
-            # All shapes
-            for shape in slide.shapes:
-                if hasattr(shape, "text_frame") and shape.text_frame:
-                    for paragraph in shape.text_frame.paragraphs:
-                        paragraph_text = paragraph.text.strip()
-                        if paragraph_text:
-                            slide_text_list.append(paragraph_text)
-                            # run-level font info
-                            for run in paragraph.runs:
-                                run_txt = run.text.strip()
-                                if run_txt:
-                                    size_pts = run.font.size.pt if run.font.size else 12
-                                    font_styles.append({
-                                        "page_number": slide_num,
-                                        "text": run_txt,
-                                        "font": run.font.name if run.font.name else "Default",
-                                        "size": size_pts
-                                    })
-
-            text_content[slide_num] = slide_text_list
+    def _images_dir(self):
+        output_dir = os.path.join("output", document_name(self.file_path), "images")
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
 
-        return {
-            "text": text_content,
-            "metadata": {
-                "headings": headings,
-                "font_styles": font_styles
+    def _tables_dir(self):
+        output_dir = os.path.join("output/tables", document_name(self.file_path))
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
+
+    def _slide_image(self, shape, slide_num, output_dir):
+        try:
+            image = shape.image
+            # The same picture on many slides is stored once
+            digest = image.sha1
+            out_path = self.image_writer.lookup(digest)
+            if out_path is None:
+                if self.keep_original_encoding:
+                    img_filename = f"image_{digest[:16]}.{image.ext}"
+                    out_path = self.image_writer.write_bytes(
+                        os.path.join(output_dir, img_filename), image.blob, digest
+                    )
+                else:
+                    from PIL import Image
+
+                    # Opening only reads the header; the PNG encode runs in the background
+                    pil_img = Image.open(io.BytesIO(image.blob))
+                    img_filename = f"image_{digest[:16]}.png"
+                    out_path = self.image_writer.submit(
+                        os.path.join(output_dir, img_filename), pil_img.save, digest
+                    )
+
+            return {
+                "page_number": slide_num,
+                "image_path": out_path,
+                # Optional: capture alt_text if present
+                "alt_text": shape.alt_text if hasattr(shape, "alt_text") else ""
             }
+        except Exception as e:
+            print(f"Error extracting image on slide {slide_num}: {e}")
+            return None
+
+    @staticmethod
+    def _slide_table(shape, slide_num, output_dir, table_index):
+        table_data = []
+        for row in shape.table.rows:
+            row_data = [cell.text.strip() for cell in row.cells]
+            table_data.append(row_data)
+
+        csv_filename = f"slide_{slide_num}_table_{table_index}.csv"
+        csv_path = os.path.join(output_dir, csv_filename)
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(table_data)
+
+        return {
+            "page_number": slide_num,
+            "table_data": table_data,
+            "table_path": csv_path
         }
 
-    def extract_links(self):
-        links_info = []
-        for i, slide in enumerate(self.ppt_doc.slides):
-            slide_num = i + 1
-            for shape in slide.shapes:
-                # 1) Shape-level hyperlink (click_action)
-                if hasattr(shape, "click_action") and shape.click_action:
-                    if (hasattr(shape.click_action, "hyperlink") 
-                            and shape.click_action.hyperlink 
-                            and hasattr(shape.click_action.hyperlink, "address") 
-                            and shape.click_action.hyperlink.address):
-                        # Grab shape text from text_frame, if present
-                        shape_text = ""
-                        if hasattr(shape, "text_frame") and shape.text_frame:
-                            shape_text = shape.text_frame.text.strip()
-                        links_info.append({
-                            "page_number": slide_num,
-                            "text": shape_text,
-                            "url": shape.click_action.hyperlink.address,
-                            "shape_name": shape.name if hasattr(shape, "name") else ""
-                        })
-
-                # 2) Run-level hyperlinks (within text_frame paragraphs)
-                if hasattr(shape, "text_frame") and shape.text_frame:
-                    for paragraph in shape.text_frame.paragraphs:
-                        for run in paragraph.runs:
-                            if run.hyperlink and run.hyperlink.address:
-                                links_info.append({
-                                    "page_number": slide_num,
-                                    "text": run.text.strip(),
-                                    "url": run.hyperlink.address,
-                                    "shape_name": shape.name if hasattr(shape, "name") else ""
-                                })
-        return links_info
+    def _visit_slide(self, slide, slide_num, images_dir, tables_dir, table_counter,
+                     sections=PDF_SECTIONS):
+        """
+        Build a slide's page record in one pass over its shapes (group shapes
+        included): text and run fonts, the title as heading, shape and run
+        hyperlinks, pictures and tables. Sections that were not requested
+        come back empty; tables still advance table_counter.
+        """
+        record = new_page_record(slide_num)
+        title = None
+        fonts = "text" in sections and self.profile != "text"
+        reading_order = self.profile == "layout"
 
-    def extract_images(self):
-        images_info = []
-        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
-        output_dir = os.path.join("output", base_name, "images")
-        os.makedirs(output_dir, exist_ok=True)
+        for shape in _iter_shapes(slide.shapes, reading_order):
+            # Title placeholder (what slide.shapes.title finds)
+            if title is None and shape.is_placeholder and shape.placeholder_format.idx == 0:
+                title = shape.text_frame.text.strip() if shape.has_text_frame else ""
+
+            # 1) Shape-level hyperlink (click_action), listed before the shape's run links
+            shape_url = shape.click_action.hyperlink.address if "links" in sections else None
+            shape_link_index = len(record["links"])
+
+            if shape.has_text_frame:
+                paragraph_texts = []
+                for paragraph in shape.text_frame.paragraphs:
+                    paragraph_text = paragraph.text
+                    paragraph_texts.append(paragraph_text)
+                    paragraph_text = paragraph_text.strip()
+                    for run in paragraph.runs:
+                        run_txt = run.text.strip()
+                        if fonts and paragraph_text and run_txt:
+                            # run-level font info
+                            font = run.font
+                            size_pts = font.size.pt if font.size else 12
+                            font_name = font.name if font.name else "Default"
+                            record["font_styles"].append(slide_num, run_txt, font_name, size_pts)
+                        # 2) Run-level hyperlinks (within text_frame paragraphs)
+                        if "links" in sections and run.hyperlink.address:
+                            record["links"].append({
+                                "page_number": slide_num,
+                                "text": run_txt,
+                                "url": run.hyperlink.address,
+                                "shape_name": shape.name
+                            })
+                    if "text" in sections and paragraph_text:
+                        record["text"].append(paragraph_text)
+                shape_text = "\n".join(paragraph_texts).strip()
+            else:
+                shape_text = ""
+
+            if shape_url:
+                record["links"].insert(shape_link_index, {
+                    "page_number": slide_num,
+                    "text": shape_text,
+                    "url": shape_url,
+                    "shape_name": shape.name
+                })
+
+            if shape.has_table:
+                table_index = next(table_counter)
+                if "tables" in sections:
+                    record["tables"].append(self._slide_table(shape, slide_num, tables_dir, table_index))
+            elif "images" in sections and _shape_type(shape) == 13:   # 13 => PICTURE
+                image = self._slide_image(shape, slide_num, images_dir)
+                if image is not None:
+                    record["images"].append(image)
+
+        if "text" in sections and title:
+            record["text"].insert(0, title)
+            if fonts:
+                record["headings"] = [title]
+                record["heading_levels"] = [1]   # slide titles
+        return record
+
+    def _iter_records(self, sections, page_numbers=None):
+        """Page records for the requested sections, one slide visit each."""
+        images_dir = self._images_dir() if "images" in sections else None
+        tables_dir = self._tables_dir() if "tables" in sections else None
+        table_counter = itertools.count()
+        if page_numbers is not None:
+            page_numbers = set(page_numbers)
 
-        image_index = 0
         for slide_index, slide in enumerate(self.ppt_doc.slides):
             slide_num = slide_index + 1
-            for shape in slide.shapes:
-                # shape_type == 13 => PICTURE
-                if shape.shape_type == 13 and hasattr(shape, "image"):
-                    try:
-                        img_stream = io.BytesIO(shape.image.blob)
-                        pil_img = Image.open(img_stream)
-                        img_filename = f"slide_{slide_num}_img_{image_index}.png"
-                        out_path = os.path.join(output_dir, img_filename)
-                        pil_img.save(out_path)
-
-                        images_info.append({
-                            "page_number": slide_num,
-                            "image_path": out_path,
-                            # Optional: capture alt_text if present
-                            "alt_text": shape.alt_text if hasattr(shape, "alt_text") else ""
-                        })
-                        image_index += 1
-                    except Exception as e:
-                        print(f"Error extracting image on slide {slide_num}: {e}")
-        return images_info
+            if page_numbers is not None and slide_num not in page_numbers:
+                # Skipped slides still advance the counter, so table file names stay stable
+                for shape in _iter_shapes(slide.shapes, self.profile == "layout"):
+                    if shape.has_table:
+                        next(table_counter)
+                continue
+            with timed(self.metrics, "walk_slides"):
+                record = self._visit_slide(slide, slide_num, images_dir, tables_dir,
+                                           table_counter, sections)
+            yield record
+
+    def _extract(self, section):
+        records = list(self._iter_records({section}))
+        if section == "images":
+            failed = self.image_writer.flush()
+            for record in records:
+                record["images"] = [img for img in record["images"] if img["image_path"] not in failed]
+        return merge_page_records(records)[section]
+
+    def extract_text(self):
+        return self._extract("text")
+
+    def extract_links(self):
+        return self._extract("links")
+
+    def extract_images(self):
+        return self._extract("images")
 
     def extract_tables(self):
-        tables_info = []
-        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
-        output_dir = os.path.join("output/tables", base_name)
-        os.makedirs(output_dir, exist_ok=True)
+        return self._extract("tables")
 
-        table_count = 0
-        for slide_index, slide in enumerate(self.ppt_doc.slides):
-            slide_num = slide_index + 1
-            for shape in slide.shapes:
-                if hasattr(shape, "has_table") and shape.has_table:
-                    table_data = []
-                    for row in shape.table.rows:
-                        row_data = [cell.text.strip() for cell in row.cells]
-                        table_data.append(row_data)
-
-                    csv_filename = f"slide_{slide_num}_table_{table_count}.csv"
-                    csv_path = os.path.join(output_dir, csv_filename)
-                    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                        writer = csv.writer(f)
-                        writer.writerows(table_data)
-
-                    tables_info.append({
-                        "page_number": slide_num,
-                        "table_data": table_data,
-                        "table_path": csv_path
-                    })
-                    table_count += 1
+    def page_fingerprints(self):
+        """{slide_number: fingerprint} from each slide's XML and its related parts."""
+        return {
+            slide_index + 1: fingerprint(opc_part_parts(slide.part), profile_version(self.profile))
+            for slide_index, slide in enumerate(self.ppt_doc.slides)
+        }
 
-        return tables_info
+    def iter_pages(self, page_numbers=None):
+        """
+        Yield one page record per slide, so slides can be stored as they are read.
+        page_numbers limits extraction to those slides (1-based).
+        """
+        yield from _with_written_images(self._iter_records(self.sections, page_numbers),
+                                        self.image_writer, self.metrics)
+
+    def extract_all(self):
+        """Visit every slide once and return the combined document dict."""
+        return merge_page_records(self.iter_pages())
+
+
+def _shape_type(shape):
+    """shape.shape_type, or None for shapes python-pptx does not recognize."""
+    try:
+        return shape.shape_type
+    except NotImplementedError:
+        return None
+
+
+def _iter_shapes(shapes, reading_order: bool = False):
+    """
+    Shapes in z-order (or by position with reading_order), with group shapes
+    replaced by their members.
+    """
+    if reading_order:
+        shapes = sorted(shapes, key=lambda shape: (shape.top or 0, shape.left or 0))
+    for shape in shapes:
+        if _shape_type(shape) == 6:     # 6 => GROUP
+            yield from _iter_shapes(shape.shapes, reading_order)
+        else:
+            yield shape
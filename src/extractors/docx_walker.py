@@ -0,0 +1,448 @@
+"""
+A streaming reader for the body of a DOCX file.
+
+DocxPackage opens the OPC zip straight from a DocumentSource and resolves
+what the body refers to (styles, theme fonts, relationship targets); the
+walker then reads word/document.xml once with ElementTree.iterparse and
+yields the body in document order:
+
+    DocxParagraph(text, style, runs, links, images, page)
+    DocxTable(rows, links, images, page)
+
+`page` is the page the element's content starts on. DOCX stores no layout,
+so pages are counted from the breaks in the markup (see DocxWalker).
+
+Each top-level element is dropped from memory as soon as it has been
+yielded, so a long contract never exists as a full object tree the way a
+python-docx Document does.
+"""
+import io
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from src.loaders.document_source import DocumentSource
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+V = "{urn:schemas-microsoft-com:vml}"
+PKG_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+DOCUMENT_PART = "word/document.xml"
+DEFAULT_SIZE = 11.0
+
+# Elements whose runs belong to the enclosing paragraph (tracked insertions,
+# smart tags, content controls, simple fields)
+_RUN_CONTAINERS = frozenset({W + "ins", W + "smartTag", W + "sdt", W + "sdtContent",
+                             W + "fldSimple", W + "customXml", W + "moveTo"})
+
+# Built-in styles python-docx shows capitalized ("heading 1" -> "Heading 1")
+_UI_STYLE_NAMES = ("heading ", "caption", "header", "footer")
+
+
+class DocxRun(NamedTuple):
+    text: str
+    font: str
+    size: float
+    bold: bool
+
+
+class DocxParagraph(NamedTuple):
+    text: str
+    style: str
+    runs: List[DocxRun]
+    links: List[Tuple[str, str]]      # (url, link text)
+    images: List[str]                 # relationship ids, in order
+    page: int
+
+
+class DocxTable(NamedTuple):
+    rows: List[List[str]]
+    links: List[Tuple[str, str]]
+    images: List[str]
+    page: int
+
+
+class _Style(NamedTuple):
+    name: str
+    based_on: Optional[str]
+    font: Optional[str]
+    size: Optional[float]
+    bold: Optional[bool]
+
+
+class _Rel(NamedTuple):
+    reltype: str
+    target: str                       # URL, or part name inside the zip
+    external: bool
+
+
+def _val(elem, default=None):
+    return elem.get(W + "val", default) if elem is not None else default
+
+
+def _on_off(elem) -> Optional[bool]:
+    """A w:b-style toggle: present means on unless w:val says otherwise."""
+    if elem is None:
+        return None
+    return _val(elem, "true") not in ("0", "false", "off")
+
+
+class DocxPackage:
+    """
+    The parts of a DOCX that extraction needs, read from the zip on demand.
+    Open one with from_source(); from_document() adapts an already loaded
+    python-docx Document by saving it to memory first.
+    """
+
+    def __init__(self, zip_file: zipfile.ZipFile, source: Optional[DocumentSource] = None):
+        self.zip = zip_file
+        self.source = source
+        self._rels: Optional[Dict[str, _Rel]] = None
+        self._styles = None
+
+    @classmethod
+    def from_source(cls, source: DocumentSource) -> "DocxPackage":
+        return cls(zipfile.ZipFile(source.reader()), source)
+
+    @classmethod
+    def from_document(cls, docx_doc) -> "DocxPackage":
+        buf = io.BytesIO()
+        docx_doc.save(buf)
+        return cls(zipfile.ZipFile(buf))
+
+    def has_part(self, name: str) -> bool:
+        try:
+            self.zip.getinfo(name)
+            return True
+        except KeyError:
+            return False
+
+    def read_part(self, name: str) -> bytes:
+        return self.zip.read(name)
+
+    def part_crc(self, name: str) -> int:
+        """CRC-32 of a part as recorded in the zip, without reading it."""
+        return self.zip.getinfo(name).CRC
+
+    def open_part(self, name: str):
+        return self.zip.open(name)
+
+    @property
+    def rels(self) -> Dict[str, _Rel]:
+        """rId -> relationship of the document body."""
+        if self._rels is None:
+            self._rels = {}
+            rels_part = "word/_rels/document.xml.rels"
+            if self.has_part(rels_part):
+                for rel in ET.fromstring(self.read_part(rels_part)).iter(PKG_RELS + "Relationship"):
+                    external = rel.get("TargetMode") == "External"
+                    target = rel.get("Target", "")
+                    if not external:
+                        target = posixpath.normpath(posixpath.join("word", target)).lstrip("/")
+                    self._rels[rel.get("Id")] = _Rel(rel.get("Type", ""), target, external)
+        return self._rels
+
+    @property
+    def styles(self) -> "DocxStyles":
+        if self._styles is None:
+            theme = self.read_part("word/theme/theme1.xml") if self.has_part("word/theme/theme1.xml") else None
+            styles = self.read_part("word/styles.xml") if self.has_part("word/styles.xml") else None
+            self._styles = DocxStyles(styles, theme)
+        return self._styles
+
+    def walk(self, fonts: bool = True) -> Iterator:
+        """
+        Yield the body's DocxParagraphs and DocxTables in document order.
+        With fonts=False runs are not resolved through the styles (their
+        font is "", their size DEFAULT_SIZE and bold False).
+        """
+        return DocxWalker(self, fonts).walk()
+
+    def close(self):
+        self.zip.close()
+
+
+class DocxStyles:
+    """
+    Run formatting from word/styles.xml: each style's font, size and bold,
+    following basedOn chains, with the document defaults underneath and
+    theme fonts (asciiTheme="minorHAnsi") resolved through the theme part.
+    """
+
+    def __init__(self, styles_xml: Optional[bytes] = None, theme_xml: Optional[bytes] = None):
+        self.theme: Dict[str, str] = {}
+        if theme_xml:
+            root = ET.fromstring(theme_xml)
+            for kind in ("major", "minor"):
+                latin = root.find(f".//{A}{kind}Font/{A}latin")
+                if latin is not None:
+                    self.theme[kind] = latin.get("typeface")
+
+        self.styles: Dict[str, _Style] = {}
+        self.default_style: Optional[str] = None
+        self.defaults = _Style("", None, None, None, None)
+        self._resolved: Dict[Tuple[Optional[str], str], object] = {}
+        if styles_xml:
+            self._parse(ET.fromstring(styles_xml))
+
+    def _parse(self, root):
+        rpr = root.find(f"{W}docDefaults/{W}rPrDefault/{W}rPr")
+        self.defaults = _Style("", None, self.font(rpr), self.size(rpr), self.bold(rpr))
+        for style in root.iter(W + "style"):
+            style_id = style.get(W + "styleId")
+            name = _val(style.find(W + "name"), style_id) or ""
+            if name.lower().startswith(_UI_STYLE_NAMES):
+                name = name[0].upper() + name[1:]
+            rpr = style.find(W + "rPr")
+            self.styles[style_id] = _Style(name, _val(style.find(W + "basedOn")),
+                                           self.font(rpr), self.size(rpr), self.bold(rpr))
+            if style.get(W + "type") == "paragraph" and style.get(W + "default") in ("1", "true"):
+                self.default_style = style_id
+
+    # w:rPr properties (None when the element does not set them)
+
+    def font(self, rpr) -> Optional[str]:
+        fonts = rpr.find(W + "rFonts") if rpr is not None else None
+        if fonts is None:
+            return None
+        name = fonts.get(W + "ascii") or fonts.get(W + "hAnsi")
+        if name:
+            return name
+        theme_font = fonts.get(W + "asciiTheme") or fonts.get(W + "hAnsiTheme")
+        if theme_font is None:
+            return None
+        return self.theme.get("major" if theme_font.startswith("major") else "minor")
+
+    @staticmethod
+    def size(rpr) -> Optional[float]:
+        sz = _val(rpr.find(W + "sz")) if rpr is not None else None
+        return int(sz) / 2 if sz and sz.isdigit() else None
+
+    @staticmethod
+    def bold(rpr) -> Optional[bool]:
+        return _on_off(rpr.find(W + "b")) if rpr is not None else None
+
+    def name(self, style_id: Optional[str]) -> str:
+        style = self.styles.get(style_id or self.default_style)
+        return style.name if style is not None else "Normal"
+
+    def inherited(self, style_id: Optional[str], attr: str):
+        """An attribute of a style or the styles it is based on (None if unset)."""
+        key = (style_id, attr)
+        if key not in self._resolved:
+            value, seen = None, set()
+            while style_id in self.styles and style_id not in seen and value is None:
+                seen.add(style_id)
+                style = self.styles[style_id]
+                value = getattr(style, attr)
+                style_id = style.based_on
+            self._resolved[key] = value
+        return self._resolved[key]
+
+    def run_attr(self, rpr, char_style: Optional[str], para_style: Optional[str], attr: str):
+        """A run's font/size/bold: direct formatting, then character style, paragraph style, defaults."""
+        value = getattr(self, attr)(rpr)
+        if value is None:
+            value = self.inherited(char_style, attr)
+        if value is None:
+            value = self.inherited(para_style, attr)
+        if value is None:
+            value = getattr(self.defaults, attr)
+        return value
+
+
+class DocxWalker:
+    """
+    One streaming pass over word/document.xml (see the module docstring).
+
+    Pages are counted while walking. The counter advances on:
+    - rendered page breaks (w:lastRenderedPageBreak), where Word's last
+      layout started a new page,
+    - explicit page breaks (w:br w:type="page"),
+    - paragraphs with w:pageBreakBefore,
+    - section breaks (a paragraph's w:sectPr) other than continuous ones.
+    Word also records a rendered break right after an explicit or section
+    break, so a rendered break with no content since the previous break is
+    the same page break and is not counted again. Without a later sectPr at
+    hand the walker cannot tell the type of the next section, so a section
+    break is judged by the type of the section it ends.
+
+    Each top-level paragraph or table is put on the page its first content
+    (text or a picture) falls on, so a paragraph or table that runs over a
+    page break belongs to the page it starts on.
+    """
+
+    # document -> body -> top-level element
+    BODY_DEPTH = 3
+
+    def __init__(self, package: DocxPackage, fonts: bool = True):
+        self.package = package
+        self.rels = package.rels
+        self.styles = package.styles if fonts else None
+        self.page = 1
+        self._started = False      # any content seen yet
+        self._broke = False        # a page break with no content after it yet
+        self._item_page = None     # page of the current top-level element
+
+    # Pagination
+
+    def _content(self):
+        if self._item_page is None:
+            self._item_page = self.page
+        self._started = True
+        self._broke = False
+
+    def _explicit_break(self):
+        self.page += 1
+        self._broke = True
+
+    def _rendered_break(self):
+        if self._broke:
+            self._broke = False
+        else:
+            self.page += 1
+
+    def walk(self) -> Iterator:
+        depth = 0
+        body = None
+        with self.package.open_part(DOCUMENT_PART) as stream:
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == self.BODY_DEPTH - 1:
+                        body = elem
+                    continue
+                if depth == self.BODY_DEPTH:
+                    yield from self._top_level(elem)
+                    body.clear()        # drop what has been yielded
+                depth -= 1
+
+    def _top_level(self, elem):
+        self._item_page = None
+        if elem.tag == W + "p":
+            yield self.paragraph(elem)
+        elif elem.tag == W + "tbl":
+            yield self.table(elem)
+        elif elem.tag == W + "sdt":
+            content = elem.find(W + "sdtContent")
+            for child in (content if content is not None else ()):
+                yield from self._top_level(child)
+
+    # Body elements
+
+    def paragraph(self, p) -> DocxParagraph:
+        ppr = p.find(W + "pPr")
+        para_style = _val(ppr.find(W + "pStyle")) if ppr is not None else None
+        if self.styles is None:
+            para_style = para_style or "Normal"
+        else:
+            para_style = para_style or self.styles.default_style
+        if ppr is not None and self._started and _on_off(ppr.find(W + "pageBreakBefore")):
+            self._explicit_break()
+
+        runs, links, images = [], [], []
+        self._collect(p, para_style, runs, links, images)
+        text = "".join(run.text for run in runs)
+        page = self._item_page or self.page
+
+        sect_pr = ppr.find(W + "sectPr") if ppr is not None else None
+        if sect_pr is not None and _val(sect_pr.find(W + "type"), "nextPage") != "continuous":
+            self._explicit_break()
+        style_name = self.styles.name(para_style) if self.styles is not None else para_style
+        return DocxParagraph(text, style_name, runs, links, images, page)
+
+    def _collect(self, parent, para_style, runs, links, images):
+        for child in parent:
+            tag = child.tag
+            if tag == W + "r":
+                run = self._run(child, para_style, images)
+                if run is not None:
+                    runs.append(run)
+            elif tag == W + "hyperlink":
+                link_runs = []
+                self._collect(child, para_style, link_runs, links, images)
+                runs.extend(link_runs)
+                rel = self.rels.get(child.get(R + "id"))
+                if rel is not None:
+                    links.append((rel.target, "".join(run.text for run in link_runs)))
+            elif tag in _RUN_CONTAINERS:
+                self._collect(child, para_style, runs, links, images)
+
+    def _run(self, r, para_style, images) -> Optional[DocxRun]:
+        parts = []
+        for child in r:
+            tag = child.tag
+            if tag == W + "t":
+                self._content()
+                parts.append(child.text or "")
+            elif tag in (W + "tab", W + "ptab"):
+                self._content()
+                parts.append("\t")
+            elif tag == W + "br":
+                br_type = child.get(W + "type")
+                if br_type == "page":
+                    self._explicit_break()
+                elif br_type != "column":
+                    self._content()
+                    parts.append("\n")
+            elif tag == W + "lastRenderedPageBreak":
+                self._rendered_break()
+            elif tag == W + "cr":
+                self._content()
+                parts.append("\n")
+            elif tag == W + "noBreakHyphen":
+                self._content()
+                parts.append("-")
+            elif tag in (W + "drawing", W + "pict", W + "object"):
+                self._content()
+                for blip in child.iter(A + "blip"):
+                    images.append(blip.get(R + "embed"))
+                for data in child.iter(V + "imagedata"):
+                    images.append(data.get(R + "id"))
+        if not parts:
+            return None
+        if self.styles is None:
+            return DocxRun("".join(parts), "", DEFAULT_SIZE, False)
+
+        rpr = r.find(W + "rPr")
+        char_style = _val(rpr.find(W + "rStyle")) if rpr is not None else None
+        font = self.styles.run_attr(rpr, char_style, para_style, "font")
+        size = self.styles.run_attr(rpr, char_style, para_style, "size")
+        bold = self.styles.run_attr(rpr, char_style, para_style, "bold")
+        return DocxRun("".join(parts), font or "", size or DEFAULT_SIZE, bool(bold))
+
+    def table(self, tbl) -> DocxTable:
+        rows, links, images = [], [], []
+        above: Dict[int, str] = {}      # grid column -> text, for vertically merged cells
+        for tr in tbl.findall(W + "tr"):
+            row, column = [], 0
+            for tc in tr.findall(W + "tc"):
+                text = self._cell(tc, links, images)
+                tc_pr = tc.find(W + "tcPr")
+                span = int(_val(tc_pr.find(W + "gridSpan"), "1")) if tc_pr is not None else 1
+                merge = tc_pr.find(W + "vMerge") if tc_pr is not None else None
+                if merge is not None and _val(merge) != "restart":
+                    text = above.get(column, "")
+                for _ in range(max(span, 1)):
+                    above[column] = text
+                    row.append(text)
+                    column += 1
+            rows.append(row)
+        return DocxTable(rows, links, images, self._item_page or self.page)
+
+    def _cell(self, tc, links, images) -> str:
+        """A cell's text (its own paragraphs); links and images include nested tables."""
+        texts = []
+        for child in tc:
+            if child.tag == W + "p":
+                paragraph = self.paragraph(child)
+                texts.append(paragraph.text)
+                links.extend(paragraph.links)
+                images.extend(paragraph.images)
+            elif child.tag == W + "tbl":
+                nested = self.table(child)
+                links.extend(nested.links)
+                images.extend(nested.images)
+        return "\n".join(texts).strip()
@@ -0,0 +1,30 @@
+import hashlib
+from typing import Iterable
+
+
+def fingerprint(parts: Iterable[bytes], version: str = "") -> str:
+    """
+    Hash the pieces that determine one page's extracted content. The
+    extractor version is mixed in so an extractor change re-extracts pages.
+    """
+    digest = hashlib.sha1(version.encode("utf-8"))
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))   # keeps part boundaries unambiguous
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def opc_part_parts(part) -> Iterable[bytes]:
+    """
+    The bytes that describe a python-pptx part (a slide): its XML plus
+    every relationship target - external URLs as text, images by content
+    hash, other parts by name.
+    """
+    yield part.blob
+    for r_id, rel in sorted(part.rels.items()):
+        if rel.is_external:
+            target = rel.target_ref
+        else:
+            target_part = rel.target_part
+            target = getattr(target_part, "sha1", None) or str(target_part.partname)
+        yield f"{r_id} {rel.reltype} {target}".encode("utf-8")
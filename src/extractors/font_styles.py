@@ -0,0 +1,133 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class FontStyleColumns:
+    """
+    Compact, struct-of-arrays store for span-level font styles.
+
+    Instead of one dict per span, page numbers and sizes live in typed arrays
+    and font names are dictionary-encoded (each distinct name is stored once,
+    spans keep a small integer id). Iterating still yields the familiar
+    {"page_number", "text", "font", "size"} dicts, so existing consumers keep
+    working; storages use rows()/runs() to avoid building those dicts.
+    """
+
+    __slots__ = ("page_numbers", "texts", "font_ids", "sizes", "fonts", "_font_index")
+
+    def __init__(self, styles: Iterable[Any] = ()):
+        self.page_numbers = array("I")
+        self.texts: List[str] = []
+        self.font_ids = array("I")
+        self.sizes = array("d")
+        self.fonts: List[str] = []      # font id -> name
+        self._font_index: Dict[str, int] = {}
+        self.extend(styles)
+
+    def _font_id(self, font: str) -> int:
+        font_id = self._font_index.get(font)
+        if font_id is None:
+            font_id = self._font_index[font] = len(self.fonts)
+            self.fonts.append(font)
+        return font_id
+
+    def append(self, page_number: int, text: str, font: str, size: float):
+        self.page_numbers.append(page_number)
+        self.texts.append(text)
+        self.font_ids.append(self._font_id(font))
+        self.sizes.append(size)
+
+    def extend(self, styles: Iterable[Any]):
+        """Append spans from another FontStyleColumns or from font-style dicts."""
+        if isinstance(styles, FontStyleColumns):
+            remap = [self._font_id(font) for font in styles.fonts]
+            self.page_numbers.extend(styles.page_numbers)
+            self.texts.extend(styles.texts)
+            self.font_ids.extend(remap[font_id] for font_id in styles.font_ids)
+            self.sizes.extend(styles.sizes)
+            return
+        for fs in styles:
+            self.append(fs.get("page_number", 0), fs.get("text", ""),
+                        fs.get("font", ""), fs.get("size", 0))
+
+    def rows(self) -> Iterator[Tuple[int, str, str, float]]:
+        """Yield (page_number, text, font, size) tuples."""
+        fonts = self.fonts
+        for page_number, text, font_id, size in zip(self.page_numbers, self.texts,
+                                                     self.font_ids, self.sizes):
+            yield page_number, text, fonts[font_id], size
+
+    def runs(self) -> Iterator[Tuple[int, str, float, int, int]]:
+        """
+        Run-length aggregate consecutive spans that share page, font and size.
+        Yields (page_number, font, size, span_count, char_count).
+        """
+        current = None
+        for page_number, text, font_id, size in zip(self.page_numbers, self.texts,
+                                                     self.font_ids, self.sizes):
+            if current is not None and current[:3] == [page_number, font_id, size]:
+                current[3] += 1
+                current[4] += len(text)
+                continue
+            if current is not None:
+                yield self._run(current)
+            current = [page_number, font_id, size, 1, len(text)]
+        if current is not None:
+            yield self._run(current)
+
+    def _run(self, current):
+        page_number, font_id, size, span_count, char_count = current
+        return page_number, self.fonts[font_id], size, span_count, char_count
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __bool__(self):
+        return bool(self.texts)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for page_number, text, font, size in self.rows():
+            yield {"page_number": page_number, "text": text, "font": font, "size": size}
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return {
+            "page_number": self.page_numbers[index],
+            "text": self.texts[index],
+            "font": self.fonts[self.font_ids[index]],
+            "size": self.sizes[index]
+        }
+
+    def __eq__(self, other):
+        if isinstance(other, (FontStyleColumns, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"FontStyleColumns({len(self)} spans, {len(self.fonts)} fonts)"
+
+    def __getstate__(self):
+        return (self.page_numbers, self.texts, self.font_ids, self.sizes, self.fonts)
+
+    def __setstate__(self, state):
+        self.page_numbers, self.texts, self.font_ids, self.sizes, self.fonts = state
+        self._font_index = {font: i for i, font in enumerate(self.fonts)}
+
+
+def font_style_rows(font_styles: Iterable[Any]) -> Iterator[Tuple[int, str, str, float]]:
+    """(page_number, text, font, size) tuples from columns or a list of dicts."""
+    if isinstance(font_styles, FontStyleColumns):
+        return font_styles.rows()
+    return (
+        (fs.get("page_number", 0), fs.get("text", ""), fs.get("font", ""), fs.get("size", 0))
+        for fs in font_styles
+    )
+
+
+def font_style_runs(font_styles: Iterable[Any]) -> Iterator[Tuple[int, str, float, int, int]]:
+    """Run-length aggregated font styles from columns or a list of dicts."""
+    if not isinstance(font_styles, FontStyleColumns):
+        font_styles = FontStyleColumns(font_styles)
+    return font_styles.runs()
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Tuple
+from .font_styles import FontStyleColumns
+
+# Words that mark a bold face in font names ("Helvetica-Bold", "Arial,Black", "RobotoSemibold")
+BOLD_MARKERS = ("bold", "black", "heavy", "semibold", "demi")
+
+
+def is_bold_font(font_name: str) -> bool:
+    name = font_name.lower()
+    return any(marker in name for marker in BOLD_MARKERS)
+
+
+class HeadingClassifier:
+    """
+    Classifies spans as headings (levels 1-3) or body text from their size
+    relative to the document's body size and from boldness, in one vectorized
+    NumPy pass per batch of spans instead of a per-span threshold.
+
+    The body size is the size carrying the most characters. Statistics
+    accumulate batch by batch, seeded with a `prior_size` worth
+    `prior_chars` characters. The extractors observe the whole document
+    first (PDF from its collected page records, DOCX over the whole body
+    walk) and then classify with observe=False, so no page depends on the
+    ones before it and a page gets the same headings however it is extracted.
+
+    A span is a heading when it is at most `max_chars` long and either at
+    least `min_ratio` times the body size or bold at body size or larger.
+    Its score (size ratio, plus `bold_bonus` if bold) gives the level:
+    >= h1_ratio -> 1, >= h2_ratio -> 2, otherwise 3.
+    """
+
+    def __init__(self, min_ratio: float = 1.15, h1_ratio: float = 1.6, h2_ratio: float = 1.3,
+                 bold_bonus: float = 0.15, max_chars: int = 200,
+                 prior_size: float = 11.0, prior_chars: int = 500):
+        self.min_ratio = min_ratio
+        self.h1_ratio = h1_ratio
+        self.h2_ratio = h2_ratio
+        self.bold_bonus = bold_bonus
+        self.max_chars = max_chars
+        # characters seen per size, bucketed to half points
+        self.size_chars: Dict[float, float] = {round(prior_size * 2) / 2: float(prior_chars)}
+
+    @property
+    def body_size(self) -> float:
+        return max(self.size_chars.items(), key=lambda item: (item[1], -item[0]))[0]
+
+    def observe(self, sizes, lengths):
+        """Add spans (sizes and character counts) to the document statistics."""
+        import numpy as np
+
+        if len(sizes) == 0:
+            return
+        buckets, inverse = np.unique(np.round(np.asarray(sizes) * 2) / 2, return_inverse=True)
+        chars = np.bincount(inverse, weights=lengths)
+        for size, n in zip(buckets.tolist(), chars.tolist()):
+            self.size_chars[size] = self.size_chars.get(size, 0.0) + n
+
+    def observe_columns(self, columns: FontStyleColumns):
+        """Add the spans of a FontStyleColumns to the document statistics."""
+        self.observe(*_sizes_and_lengths(columns))
+
+    def levels(self, sizes, lengths, bold):
+        """Heading level per span (0 = body text) against the current statistics."""
+        import numpy as np
+
+        sizes = np.asarray(sizes, dtype=np.float64)
+        if sizes.size == 0:
+            return np.zeros(0, dtype=np.int8)
+        ratio = sizes / self.body_size
+        bold = np.asarray(bold, dtype=bool)
+        heading = (np.asarray(lengths) <= self.max_chars) & (
+            (ratio >= self.min_ratio) | (bold & (ratio >= 1.0)))
+        score = ratio + self.bold_bonus * bold
+        level = np.select([score >= self.h1_ratio, score >= self.h2_ratio], [1, 2], default=3)
+        return np.where(heading, level, 0).astype(np.int8)
+
+    def classify(self, columns: FontStyleColumns, bold=None, observe: bool = True):
+        """
+        Observe (unless observe is False) and classify the spans of a
+        FontStyleColumns. Boldness comes from the font names (looked up once
+        per distinct font) unless given.
+        """
+        import numpy as np
+
+        sizes, lengths = _sizes_and_lengths(columns)
+        if bold is None:
+            font_bold = np.fromiter(map(is_bold_font, columns.fonts), dtype=bool,
+                                    count=len(columns.fonts))
+            font_ids = np.frombuffer(columns.font_ids, dtype=np.dtype(columns.font_ids.typecode))
+            bold = font_bold[font_ids] if len(font_ids) else np.zeros(0, dtype=bool)
+        if observe:
+            self.observe(sizes, lengths)
+        return self.levels(sizes, lengths, bold)
+
+    def headings(self, columns: FontStyleColumns, bold=None,
+                 observe: bool = True) -> Tuple[List[str], List[int]]:
+        """(heading texts, their levels) for a batch of spans, in span order."""
+        levels = self.classify(columns, bold, observe)
+        indexes = levels.nonzero()[0].tolist()
+        return [columns.texts[i] for i in indexes], levels[indexes].tolist()
+
+    def label(self, record: Dict, bold: Optional[List[bool]] = None, observe: bool = True):
+        """Set a page record's "headings" and "heading_levels" from its font styles."""
+        record["headings"], record["heading_levels"] = self.headings(record["font_styles"], bold,
+                                                                     observe)
+
+
+def _sizes_and_lengths(columns: FontStyleColumns):
+    """Span sizes and character counts of a FontStyleColumns as NumPy arrays."""
+    import numpy as np
+
+    # array("d") exposes its buffer, so sizes is not a copy
+    sizes = np.frombuffer(columns.sizes, dtype=np.float64)
+    lengths = np.fromiter(map(len, columns.texts), dtype=np.int64, count=len(columns))
+    return sizes, lengths
@@ -0,0 +1,132 @@
+import os
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+def image_digest(data: bytes) -> str:
+    """Content hash used to name and de-duplicate stored images."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def _atomic_write(path: str, write_fn: Callable[[str], None]):
+    """
+    Run write_fn against a temp file and rename it into place, so a file that
+    exists is always complete (other workers may be writing the same image).
+    Returns the number of bytes written.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        write_fn(tmp_path)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        return size
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ImageWriter:
+    """
+    Writes extracted images from a background thread pool and remembers what
+    was already stored, so an image used on many pages is written once and
+    every later occurrence just references the same file.
+
+    Keys are whatever identifies an image cheaply (a PDF xref, a content hash);
+    one stored path can be registered under several keys.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = []
+        self._paths: Dict[object, str] = {}
+        self._failed = set()
+        self.bytes_written = 0
+
+    def lookup(self, *keys) -> Optional[str]:
+        """Return the stored path for the first known key, or None."""
+        for key in keys:
+            path = self._paths.get(key)
+            if path is not None:
+                return path
+        return None
+
+    def remember(self, path: str, *keys):
+        for key in keys:
+            self._paths[key] = path
+
+    def submit(self, path: str, write_fn: Callable[[str], None], *keys) -> str:
+        """
+        Register `path` under `keys` and write it in the background with
+        write_fn(target_path). Files already on disk (earlier runs, other
+        workers) are not rewritten.
+        """
+        self.remember(path, *keys)
+        self._failed.discard(path)
+        if os.path.exists(path):
+            return path
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="image-writer")
+        self._pending.append((path, self._executor.submit(_atomic_write, path, write_fn)))
+        return path
+
+    def write_bytes(self, path: str, data: bytes, *keys) -> str:
+        """Store raw image bytes as-is (no re-encoding)."""
+        def write(target):
+            with open(target, "wb") as f:
+                f.write(data)
+        return self.submit(path, write, *keys)
+
+    def _settle(self, path: str, future) -> bool:
+        """Wait for one queued write; a failed path is forgotten so a later occurrence can try again."""
+        try:
+            self.bytes_written += future.result()
+            return True
+        except Exception as e:
+            print(f"[ImageWriter] Error writing image {path}: {e}")
+            self._failed.add(path)
+            self._paths = {key: known for key, known in self._paths.items() if known != path}
+            return False
+
+    def wait(self, paths: Iterable[str]) -> List[str]:
+        """
+        Wait for the queued writes of `paths` only, leaving the rest in the
+        background. Returns those of `paths` that failed to write.
+        """
+        paths = set(paths)
+        pending = []
+        for path, future in self._pending:
+            if path in paths:
+                self._settle(path, future)
+            else:
+                pending.append((path, future))
+        self._pending = pending
+        return [path for path in paths if path in self._failed]
+
+    def flush(self) -> List[str]:
+        """
+        Wait for queued writes and stop the writer threads (they restart on
+        the next submit). Returns the paths that failed to write.
+        """
+        failed = [path for path, future in self._pending if not self._settle(path, future)]
+        self._pending = []
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return failed
+
+    close = flush
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
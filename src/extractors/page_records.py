@@ -0,0 +1,78 @@
+"""
+Page records are the unit of the streaming pipeline: one dict per page/slide,
+    {"page_number", "text", "font_styles", "headings", "heading_levels",
+     "links", "images", "tables"}
+where "text" and "headings" are lists of strings, "heading_levels" holds
+each heading's level (1-3), "font_styles" is a FontStyleColumns and the
+rest are lists of the same dicts the whole-document extractors return.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+from .font_styles import FontStyleColumns
+
+
+def new_page_record(page_num: int):
+    """Return an empty page record for the given page number."""
+    return {
+        "page_number": page_num,
+        "text": [],
+        "font_styles": FontStyleColumns(),
+        "headings": [],
+        "heading_levels": [],
+        "links": [],
+        "images": [],
+        "tables": []
+    }
+
+
+def merge_page_records(records):
+    """
+    Assemble per-page records into the document-level dict that
+    run_extraction stores: {"text": ..., "links": ..., "images": ..., "tables": ...}.
+    Records are merged in the order given (i.e. page order).
+    """
+    text_content = {}
+    font_styles = FontStyleColumns()
+    headings = {}
+    heading_levels = {}
+    links_info = []
+    images_info = []
+    tables_info = []
+
+    for record in records:
+        page_num = record["page_number"]
+        text_content[page_num] = record["text"]
+        font_styles.extend(record["font_styles"])
+        if record["headings"]:
+            headings.setdefault(page_num, []).extend(record["headings"])
+            if record.get("heading_levels"):
+                heading_levels.setdefault(page_num, []).extend(record["heading_levels"])
+        links_info.extend(record["links"])
+        images_info.extend(record["images"])
+        tables_info.extend(record["tables"])
+
+    return {
+        "text": {
+            "text": text_content,
+            "metadata": {
+                "font_styles": font_styles,
+                "headings": headings,
+                "heading_levels": heading_levels
+            }
+        },
+        "links": links_info,
+        "images": images_info,
+        "tables": tables_info
+    }
+
+
+def heading_rows(headings: Dict[int, List[str]],
+                 levels: Optional[Dict[int, List[int]]] = None) -> Iterator[Tuple[int, str, Optional[int]]]:
+    """
+    (page_number, heading, level) tuples from the document-level headings
+    and heading_levels dicts; level is None where none was recorded.
+    """
+    levels = levels or {}
+    for page_num, page_headings in headings.items():
+        page_levels = levels.get(page_num, [])
+        for index, heading in enumerate(page_headings):
+            yield page_num, heading, page_levels[index] if index < len(page_levels) else None
@@ -0,0 +1,116 @@
+import os
+import importlib
+from typing import Any, Dict, Iterable, Tuple
+
+
+class DocumentFormat:
+    """
+    One supported document format: which loader opens it and which extractor
+    reads it. Loader and extractor are "module:Class" strings that are only
+    imported when a file of this format is processed, so handling a DOCX
+    never pays for importing PyMuPDF or python-pptx.
+
+    `options` names the run options (see run_extraction) this format's
+    extractor accepts, mapped to its constructor keyword. `backends` lists
+    the third-party modules it needs, which warm() imports ahead of time.
+    """
+
+    def __init__(self, name: str, extensions: Iterable[str], loader: str, extractor: str,
+                 options: Dict[str, str] = None, backends: Iterable[str] = ()):
+        self.name = name
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.loader = loader
+        self.extractor = extractor
+        self.options = dict(options or {})
+        self.backends = tuple(backends)
+
+    @staticmethod
+    def _resolve(target: str):
+        module_name, class_name = target.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def loader_class(self):
+        return self._resolve(self.loader)
+
+    def extractor_class(self):
+        return self._resolve(self.extractor)
+
+    def warm(self):
+        """Import the loader, extractor and backends now (e.g. in a long-lived worker)."""
+        self.loader_class()
+        self.extractor_class()
+        for module_name in self.backends:
+            importlib.import_module(module_name)
+
+    def load(self, file_path):
+        """Open file_path (a path or a DocumentSource) with this format's loader."""
+        return self.loader_class()(file_path).load_file()
+
+    def create_extractor(self, doc_obj, file_path: str, **run_options):
+        """
+        Build the extractor, passing only the run options this format uses
+        (None values are left to the extractor's defaults).
+        """
+        kwargs = {
+            keyword: run_options[option]
+            for option, keyword in self.options.items()
+            if run_options.get(option) is not None
+        }
+        return self.extractor_class()(doc_obj, file_path, **kwargs)
+
+
+_FORMATS: Dict[str, DocumentFormat] = {}
+
+
+def register_format(fmt: DocumentFormat):
+    """Register (or replace) the format for each of its extensions."""
+    for ext in fmt.extensions:
+        _FORMATS[ext] = fmt
+
+
+def registered_formats() -> Tuple[DocumentFormat, ...]:
+    """Each registered format once (a format may have several extensions)."""
+    return tuple(dict.fromkeys(_FORMATS.values()))
+
+
+def supported_extensions() -> Tuple[str, ...]:
+    return tuple(_FORMATS)
+
+
+def is_supported(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in _FORMATS
+
+
+def get_format(file_path: str) -> DocumentFormat:
+    """The registered format for file_path's extension; ValueError if none."""
+    ext = os.path.splitext(file_path)[1].lower()
+    fmt = _FORMATS.get(ext)
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {ext}")
+    return fmt
+
+
+register_format(DocumentFormat(
+    "pdf", [".pdf"],
+    loader="src.loaders.pdf_loader:PDFLoader",
+    extractor="src.extractors.data_extractor:PDFDataExtractor",
+    options={"page_workers": "workers", "table_detection": "table_detection",
+             "all_tables": "all_tables", "metrics": "metrics", "source": "source",
+             "profile": "profile"},
+    backends=("fitz", "pdfplumber", "numpy")
+))
+register_format(DocumentFormat(
+    "docx", [".docx"],
+    loader="src.loaders.docx_loader:DOCXPackageLoader",
+    extractor="src.extractors.data_extractor:DOCXDataExtractor",
+    options={"metrics": "metrics", "profile": "profile"},
+    backends=("numpy",)
+))
+register_format(DocumentFormat(
+    "pptx", [".pptx"],
+    loader="src.loaders.ppt_loader:PPTLoader",
+    extractor="src.extractors.data_extractor:PPTDataExtractor",
+    options={"keep_image_encoding": "keep_original_encoding", "metrics": "metrics",
+             "profile": "profile"},
+    backends=("pptx", "PIL.Image")
+))
@@ -0,0 +1,95 @@
+import os
+from typing import Iterator
+from .document_source import DocumentSource
+from src.formats.registry import is_supported
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def document_name(file_path: str) -> str:
+    """
+    Name of a document's output folders and SQL row: its file name without
+    the extension. An archive member ("<archive>!/<member path>") is named
+    by the archive and its path inside it, "bundle.zip!/x/r.pdf" becoming
+    "bundle/x/r", so members that share a file name stay apart.
+    """
+    archive, sep, member = file_path.partition("!/")
+    if not sep:
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    archive = os.path.basename(archive)
+    for extension in ARCHIVE_EXTENSIONS:
+        if archive.lower().endswith(extension):
+            archive = archive[:-len(extension)]
+            break
+    # "..", "." and absolute prefixes must not lead out of the output folder
+    parts = [part for part in member.split("/") if part not in ("", ".", "..")]
+    return "/".join([archive] + parts[:-1] + [os.path.splitext(parts[-1])[0]])
+
+
+class ArchiveLoader:
+    """
+    Streams the supported documents (see src/formats/registry.py) out of a
+    ZIP or TAR bundle as in-memory DocumentSources, without unpacking to
+    disk. The format loaders open each member straight from its bytes.
+
+    Members are named "<archive>!/<member path>"; their output folders and
+    SQL rows use the archive's name and the member path (see document_name). TAR archives (compressed or not) are read as a
+    stream, one member at a time; ZIP members are read from the central
+    directory in archive order. Members larger than `max_member_bytes` are
+    skipped.
+    """
+
+    def __init__(self, archive_path: str, max_member_bytes: int = 1024 * 1024 * 1024):
+        self.archive_path = archive_path
+        self.max_member_bytes = max_member_bytes
+
+    def validate_file(self) -> bool:
+        return os.path.isfile(self.archive_path) and is_archive(self.archive_path)
+
+    def member_name(self, member: str) -> str:
+        return f"{self.archive_path}!/{member}"
+
+    def _wanted(self, member: str, size: int) -> bool:
+        if not is_supported(member) or os.path.basename(member).startswith("."):
+            return False
+        if size > self.max_member_bytes:
+            print(f"[ArchiveLoader] Skipping {self.member_name(member)}: "
+                  f"{size} bytes exceeds {self.max_member_bytes}")
+            return False
+        return True
+
+    def iter_members(self) -> Iterator[DocumentSource]:
+        """Yield one DocumentSource per supported member, read lazily."""
+        if not self.validate_file():
+            raise FileNotFoundError(f"Archive not found: {self.archive_path}")
+
+        if self.archive_path.lower().endswith(".zip"):
+            yield from self._iter_zip()
+        else:
+            yield from self._iter_tar()
+
+    def _iter_zip(self):
+        import zipfile
+
+        with zipfile.ZipFile(self.archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not self._wanted(info.filename, info.file_size):
+                    continue
+                yield DocumentSource.from_bytes(zf.read(info), self.member_name(info.filename))
+
+    def _iter_tar(self):
+        import tarfile
+
+        # "r|*": sequential stream with transparent gzip/bz2/xz, no seeking back
+        with tarfile.open(self.archive_path, "r|*") as tf:
+            for member in tf:
+                if not member.isfile() or not self._wanted(member.name, member.size):
+                    continue
+                with tf.extractfile(member) as f:
+                    data = f.read()
+                yield DocumentSource.from_bytes(data, self.member_name(member.name))
@@ -0,0 +1,145 @@
+import io
+import os
+import mmap
+import hashlib
+from typing import Optional, Union
+
+
+class BufferReader(io.RawIOBase):
+    """
+    A read-only, seekable file object over a shared buffer. Each consumer
+    gets its own reader (own position); reads copy only the bytes asked for.
+    """
+
+    def __init__(self, buffer: memoryview):
+        super().__init__()
+        self._buffer = buffer
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._buffer) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position: {pos}")
+        self._pos = pos
+        return pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._buffer) if size is None or size < 0 else min(self._pos + size, len(self._buffer))
+        data = bytes(self._buffer[self._pos:end]) if end > self._pos else b""
+        self._pos = max(self._pos, end)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+class DocumentSource:
+    """
+    The bytes of one document, read from disk once (memory-mapped) or handed
+    over in memory (an archive member, a socket upload), and shared by every
+    consumer: the cache hash, PyMuPDF, pdfplumber, python-docx/python-pptx.
+
+        source = DocumentSource.from_path("data/sample.pdf")
+        fitz.open(stream=source.buffer, filetype="pdf")
+        pdfplumber.open(source.reader())
+
+    `name` is what output folders and logs use; `path` is the file on disk,
+    or None for in-memory sources (page-parallel PDF workers need a path).
+    """
+
+    def __init__(self, name: str, buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+                 path: Optional[str] = None):
+        self.name = name
+        self.path = path
+        self._mmap = buffer if isinstance(buffer, mmap.mmap) else None
+        self._view = memoryview(buffer)
+        self._sha256 = None
+
+    @classmethod
+    def from_path(cls, path: str) -> "DocumentSource":
+        """Memory-map a file; pages are read from disk (once) as they are touched."""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap cannot map an empty file; the mapping outlives the descriptor
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        return cls(path, buffer, path=path)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview], name: str) -> "DocumentSource":
+        """Wrap bytes already in memory (no copy)."""
+        return cls(name, data)
+
+    @property
+    def buffer(self) -> memoryview:
+        """A view of the shared bytes (no copy); each consumer gets its own."""
+        return self._view[:]
+
+    @property
+    def size(self) -> int:
+        return len(self._view)
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the bytes, computed once (cache key, SQL deduplication)."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self._view).hexdigest()
+        return self._sha256
+
+    def reader(self) -> BufferReader:
+        """A new file object over the shared bytes, for libraries that want one."""
+        return BufferReader(self.buffer)
+
+    def close(self):
+        """
+        Unmap the file. Documents opened from the source keep views of its
+        buffer; while any is alive the mapping is left to garbage collection.
+        """
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:     # still exported to an open document
+                pass
+
+    def __reduce__(self):
+        # Sent to a worker process: a file is mapped again there, in-memory
+        # bytes (e.g. an archive member) travel with it
+        if self.path is not None:
+            return (_from_path, (self.name, self.path))
+        return (DocumentSource.from_bytes, (bytes(self._view), self.name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"DocumentSource({self.name!r}, {self.size} bytes)"
+
+
+def _from_path(name: str, path: str) -> DocumentSource:
+    source = DocumentSource.from_path(path)
+    source.name = name
+    return source
@@ -1,5 +1,4 @@
 from .file_loader import FileLoader
-from docx import Document
 
 class DOCXLoader(FileLoader):
     """Loader for DOCX files (just opens the file)."""
@@ -15,8 +14,30 @@ class DOCXLoader(FileLoader):
         if not self.validate_file():
             raise FileNotFoundError(f"DOCX file not found: {self.file_path}")
 
+        from docx import Document  # imported on first use to keep startup fast
+
+        try:
+            self.doc = Document(self.open_source().reader())
+            print(f"DOCX loaded from {self.file_path}")
+            return self.doc
+        except Exception as e:
+            raise RuntimeError(f"Failed to open DOCX: {e}")
+
+
+class DOCXPackageLoader(DOCXLoader):
+    """
+    Opens a DOCX as a DocxPackage for the streaming extractor: the zip is
+    read from the shared buffer and python-docx is never imported.
+    """
+
+    def load_file(self):
+        if not self.validate_file():
+            raise FileNotFoundError(f"DOCX file not found: {self.file_path}")
+
+        from src.extractors.docx_walker import DocxPackage
+
         try:
-            self.doc = Document(self.file_path)
+            self.doc = DocxPackage.from_source(self.open_source())
             print(f"DOCX loaded from {self.file_path}")
             return self.doc
         except Exception as e:
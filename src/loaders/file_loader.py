@@ -1,19 +1,38 @@
 from abc import ABC, abstractmethod
 import os
+from typing import Union
+from .document_source import DocumentSource
 
 class FileLoader(ABC):
     """
     Abstract base class for loading/validating files.
     Concrete classes (PDFLoader, DOCXLoader, PPTLoader) implement load_file().
+
+    Accepts a path or a DocumentSource (bytes already in memory, e.g. an
+    archive member); either way the document is opened from one shared
+    buffer that other consumers (see PDFDataExtractor) reuse.
     """
 
-    def __init__(self, file_path: str):
-        self.file_path = file_path
+    def __init__(self, file_path: Union[str, DocumentSource]):
+        if isinstance(file_path, DocumentSource):
+            self.source = file_path
+            self.file_path = file_path.name
+        else:
+            self.source = None
+            self.file_path = file_path
 
     def validate_file(self) -> bool:
-        """Check if file exists on disk."""
+        """Check if file exists on disk (or the in-memory source is not empty)."""
+        if self.source is not None:
+            return self.source.size > 0
         return os.path.isfile(self.file_path)
 
+    def open_source(self) -> DocumentSource:
+        """The document's bytes, memory-mapping the file on first use."""
+        if self.source is None:
+            self.source = DocumentSource.from_path(self.file_path)
+        return self.source
+
     @abstractmethod
     def load_file(self):
         """Open the file and return a loaded doc/presentation object."""
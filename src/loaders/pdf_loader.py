@@ -1,5 +1,4 @@
 from .file_loader import FileLoader
-import fitz  # PyMuPDF
 
 class PDFLoader(FileLoader):
     """Loader for PDF files (just opens the file)."""
@@ -15,8 +14,10 @@ class PDFLoader(FileLoader):
         if not self.validate_file():
             raise FileNotFoundError(f"PDF file not found: {self.file_path}")
 
+        import fitz  # PyMuPDF, imported on first use to keep startup fast
+
         try:
-            self.doc = fitz.open(self.file_path)
+            self.doc = fitz.open(stream=self.open_source().buffer, filetype="pdf")
             print(f"PDF loaded from {self.file_path}")
             return self.doc
         except Exception as e:
@@ -1,5 +1,4 @@
 from .file_loader import FileLoader
-from pptx import Presentation
 
 class PPTLoader(FileLoader):
     """Loader for PPTX files (just opens the file)."""
@@ -15,8 +14,10 @@ class PPTLoader(FileLoader):
         if not self.validate_file():
             raise FileNotFoundError(f"PPTX file not found: {self.file_path}")
 
+        from pptx import Presentation  # imported on first use to keep startup fast
+
         try:
-            self.prs = Presentation(self.file_path)
+            self.prs = Presentation(self.open_source().reader())
             print(f"PPTX loaded from {self.file_path}")
             return self.prs
         except Exception as e:
@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import tracemalloc
+import contextlib
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process (or of its largest finished
+    child, e.g. a page-parallel worker), in bytes. 0 if unsupported.
+    """
+    if resource is None:
+        return 0
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def timed(metrics: Optional["DocumentMetrics"], stage: str):
+    """metrics.stage(stage), or a no-op when metrics are not being collected."""
+    if metrics is None:
+        return contextlib.nullcontext()
+    return metrics.stage(stage)
+
+
+class DocumentMetrics:
+    """
+    Stage timings and counters for one document. Timings for the same stage
+    accumulate, so per-page work (e.g. extract_text on every page) adds up.
+    """
+
+    def __init__(self, document: str = ""):
+        self.document = document
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def count(self, name: str, n: int = 1):
+        self.counts[name] += n
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Add timings and counts collected elsewhere (e.g. a worker process)."""
+        for name, seconds in snapshot.get("timings", {}).items():
+            self.timings[name] += seconds
+        for name, n in snapshot.get("counts", {}).items():
+            self.counts[name] += n
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "document": self.document,
+            "timings": dict(self.timings),
+            "counts": dict(self.counts),
+            "total_seconds": time.perf_counter() - self.started,
+            "peak_rss_bytes": peak_rss_bytes()
+        }
+
+
+def to_json(snapshot: Dict[str, Any]) -> str:
+    return json.dumps(snapshot, sort_keys=True)
+
+
+def to_prometheus(snapshot: Dict[str, Any], prefix: str = "extraction") -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    document = str(snapshot.get("document", "")).replace("\\", "\\\\").replace('"', '\\"')
+    label = f'{{document="{document}"}}'
+    lines = []
+    for name, seconds in sorted(snapshot.get("timings", {}).items()):
+        lines.append(f'{prefix}_stage_seconds{{document="{document}",stage="{name}"}} {seconds:.6f}')
+    for name, n in sorted(snapshot.get("counts", {}).items()):
+        lines.append(f"{prefix}_{name}_total{label} {n}")
+    lines.append(f"{prefix}_document_seconds{label} {snapshot.get('total_seconds', 0):.6f}")
+    lines.append(f"{prefix}_peak_rss_bytes{label} {snapshot.get('peak_rss_bytes', 0)}")
+    if "status" in snapshot:
+        ok = 1 if snapshot["status"] == "ok" else 0
+        lines.append(f"{prefix}_document_success{label} {ok}")
+    return "\n".join(lines)
+
+
+class MetricsReporter:
+    """
+    Creates DocumentMetrics for each document and writes them out when the
+    document finishes, as one JSON line or a Prometheus text block. Output is
+    appended to `output` (or printed), so pool workers can share one file.
+
+    With `profile_dir` set, each document is also profiled with cProfile
+    (<file>.prof, readable with pstats) or tracemalloc (<file>.tracemalloc.txt).
+    """
+
+    FORMATS = ("json", "prometheus")
+    PROFILERS = ("cprofile", "tracemalloc")
+
+    def __init__(self, fmt: str = "json", output: Optional[str] = None,
+                 profile_dir: Optional[str] = None, profiler: str = "cprofile"):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported metrics format: {fmt}")
+        if profiler not in self.PROFILERS:
+            raise ValueError(f"Unsupported profiler: {profiler}")
+        self.fmt = fmt
+        self.output = output
+        self.profile_dir = profile_dir
+        self.profiler = profiler
+
+    @contextlib.contextmanager
+    def document(self, file_path: str):
+        """Collect metrics (and optionally a profile) for one document."""
+        metrics = DocumentMetrics(file_path)
+        base_name = os.path.basename(file_path)   # keeps the extension: a.pdf and a.docx differ
+        status = "ok"
+        try:
+            with self._profiling(base_name, metrics):
+                yield metrics
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            snapshot = metrics.snapshot()
+            snapshot["status"] = status
+            self.report(snapshot)
+
+    @contextlib.contextmanager
+    def _profiling(self, base_name: str, metrics: DocumentMetrics):
+        if not self.profile_dir:
+            yield
+            return
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        if self.profiler == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                profile.dump_stats(os.path.join(self.profile_dir, f"{base_name}.prof"))
+            return
+
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            metrics.count("tracemalloc_peak_bytes", peak)
+            top_stats = tracemalloc.take_snapshot().statistics("lineno")[:30]
+            if not already_tracing:
+                tracemalloc.stop()
+            report_path = os.path.join(self.profile_dir, f"{base_name}.tracemalloc.txt")
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(f"Peak traced memory: {peak} bytes\n\n")
+                for stat in top_stats:
+                    f.write(f"{stat}\n")
+
+    def report(self, snapshot: Dict[str, Any]):
+        text = to_json(snapshot) if self.fmt == "json" else to_prometheus(snapshot)
+        if self.output is None:
+            print(text)
+            return
+        # One write per document keeps lines from concurrent workers intact
+        with open(self.output, "a", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,338 @@
+import os
+import json
+import time
+import queue
+import shutil
+import signal
+import socket
+import itertools
+import threading
+import socketserver
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from src.formats.registry import is_supported, registered_formats
+
+# Per-process state of a pool worker, set up once by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(options: Dict[str, Any]):
+    """
+    Pool initializer: import every format backend and open the storage
+    connection once, so each job only pays for the extraction itself.
+    """
+    from multiprocessing.util import Finalize
+    from src.cache.extraction_cache import ExtractionCache
+    from src.extractors.data_extractor import EXTRACTOR_VERSION
+    from src.storage.sql_storage import SQLStorage
+
+    for fmt in registered_formats():
+        fmt.warm()
+
+    options = dict(options)
+    cache_dir = options.pop("cache_dir", None)
+    cache_max_bytes = options.pop("cache_max_bytes")
+    db_path = options.pop("db_path")
+    sql_storage = None
+    if "sql" in options.get("sinks", ("sql",)):
+        sql_storage = SQLStorage(db_path=db_path,
+                                 font_style_mode=options.get("font_style_mode", "spans"))
+        # Pool workers exit without running atexit hooks; Finalize still runs
+        Finalize(sql_storage, sql_storage.close, exitpriority=10)
+
+    _worker_state["sql_storage"] = sql_storage
+    _worker_state["cache"] = None
+    if cache_dir:
+        _worker_state["cache"] = ExtractionCache(cache_dir, max_bytes=cache_max_bytes,
+                                                 version=EXTRACTOR_VERSION)
+    _worker_state["options"] = options
+
+
+def _run_job(file_path: str) -> float:
+    """Extract one document in a warm worker; returns the elapsed seconds."""
+    from src.extraction.extraction_runner import run_extraction
+
+    start = time.perf_counter()
+    run_extraction(file_path, cache=_worker_state["cache"],
+                   sql_storage=_worker_state["sql_storage"], **_worker_state["options"])
+    return time.perf_counter() - start
+
+
+class QueueFull(Exception):
+    """The daemon's job queue is at capacity; the client should retry later."""
+
+
+class ExtractionDaemon:
+    """
+    Resident extraction service. Jobs arrive over a Unix socket (one JSON
+    request per line) and/or from a spool directory, wait in a bounded queue
+    and run on a pool of warm worker processes that keep their imports and
+    SQLite connection between documents.
+
+    Backpressure: at most `max_queue` jobs wait and at most `workers` run at
+    once; socket submissions beyond that are rejected with "queue full", and
+    spooled files simply stay in the spool directory until there is room.
+
+    Socket requests:
+        {"op": "submit", "path": "..."}  -> {"job_id": 1, "status": "queued"}
+        {"op": "status", "job_id": 1}    -> the job's status dict
+        {"op": "jobs"}                   -> every tracked job
+        {"op": "shutdown"}               -> drain and stop
+
+    SIGTERM/SIGINT (or shutdown) stop intake, then let queued and running
+    documents finish before the pool is closed.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, spool_dir: Optional[str] = None,
+                 workers: int = None, max_queue: int = 64, poll_interval: float = 1.0,
+                 max_finished: int = 1000, db_path: str = "extracted_data.db",
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 512 * 1024 * 1024,
+                 **run_options):
+        if not socket_path and not spool_dir:
+            raise ValueError("ExtractionDaemon needs a socket_path, a spool_dir or both")
+        self.socket_path = socket_path
+        self.spool_dir = spool_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.max_finished = max_finished
+        self.worker_options = dict(run_options, db_path=db_path, cache_dir=cache_dir,
+                                   cache_max_bytes=cache_max_bytes)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = None
+        self._server = None
+        self._threads = []
+
+    # ---- job bookkeeping -------------------------------------------------
+
+    def submit(self, file_path: str, source: str = "socket") -> Dict[str, Any]:
+        """Queue a document. Raises QueueFull or ValueError (bad path, stopping)."""
+        if not os.path.isfile(file_path):
+            raise ValueError(f"File not found: {file_path}")
+        if not is_supported(file_path):
+            raise ValueError(f"Unsupported file type: {os.path.splitext(file_path)[1]}")
+
+        with self._lock:
+            # Checked under the lock so no job can be queued behind shutdown's sentinel
+            if self._stopping.is_set():
+                raise ValueError("daemon is shutting down")
+            job = {"job_id": next(self._job_ids), "file_path": os.path.abspath(file_path),
+                   "source": source, "status": "queued", "submitted": time.time(),
+                   "elapsed": None, "error": None}
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFull(f"queue full ({self._queue.maxsize} jobs waiting)")
+            self._jobs[job["job_id"]] = job
+            return dict(job)
+
+    def status(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def jobs(self):
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def _finish(self, job: Dict[str, Any], future):
+        self._slots.release()
+        with self._lock:
+            try:
+                job["elapsed"] = future.result()
+                job["status"] = "ok"
+                print(f"[Daemon] OK    {job['file_path']} ({job['elapsed']:.2f}s)")
+            except Exception as e:
+                job["status"] = "error"
+                job["error"] = f"{type(e).__name__}: {e}"
+                print(f"[Daemon] ERROR {job['file_path']}: {job['error']}")
+            self._forget_finished()
+        if job["source"] == "spool":
+            self._archive_spooled(job)
+
+    def _forget_finished(self):
+        """Keep the status table bounded: drop the oldest finished jobs."""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job["status"] in ("ok", "error")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    # ---- dispatch --------------------------------------------------------
+
+    def _dispatch(self):
+        """Move queued jobs onto the pool, never more than `workers` at once."""
+        while True:
+            job = self._queue.get()
+            if job is None:      # sentinel from shutdown(), queued after the last job
+                return
+            self._slots.acquire()
+            with self._lock:
+                job["status"] = "running"
+            try:
+                future = self._executor.submit(_run_job, job["file_path"])
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed by the OOM killer) and the pool
+                # refuses new work: fail this job and carry on with a new pool
+                print(f"[Daemon] Worker pool broke, starting a new one: {e}")
+                self._executor.shutdown(wait=False)
+                self._executor = self._new_executor()
+                future = Future()
+                future.set_exception(e)
+            future.add_done_callback(lambda f, job=job: self._finish(job, f))
+
+    # ---- spool directory -------------------------------------------------
+
+    def _spool_subdir(self, name: str) -> str:
+        path = os.path.join(self.spool_dir, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _poll_spool(self):
+        """
+        Claim supported files from the spool directory by moving them into
+        spool/processing; they end up in spool/done or spool/failed.
+        Hidden files (e.g. partial uploads named .name) are ignored.
+        """
+        processing = self._spool_subdir("processing")
+        while not self._stopping.is_set():
+            for name in sorted(os.listdir(self.spool_dir)):
+                path = os.path.join(self.spool_dir, name)
+                if name.startswith(".") or not os.path.isfile(path) or not is_supported(path):
+                    continue
+                if self._queue.full():
+                    break        # backpressure: leave the rest for a later poll
+                claimed = os.path.join(processing, name)
+                os.replace(path, claimed)
+                try:
+                    self.submit(claimed, source="spool")
+                except (QueueFull, ValueError):
+                    os.replace(claimed, path)
+                    break
+            self._stopping.wait(self.poll_interval)
+
+    def _archive_spooled(self, job: Dict[str, Any]):
+        target_dir = self._spool_subdir("done" if job["status"] == "ok" else "failed")
+        target = os.path.join(target_dir, os.path.basename(job["file_path"]))
+        try:
+            shutil.move(job["file_path"], target)
+        except OSError as e:
+            print(f"[Daemon] Could not move {job['file_path']}: {e}")
+
+    # ---- socket ----------------------------------------------------------
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one socket request (see the class docstring)."""
+        op = request.get("op")
+        try:
+            if op == "submit":
+                return self.submit(request["path"])
+            if op == "status":
+                job = self.status(int(request["job_id"]))
+                return job if job else {"error": f"unknown job {request['job_id']}"}
+            if op == "jobs":
+                return {"jobs": self.jobs()}
+            if op == "shutdown":
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {"status": "stopping"}
+            return {"error": f"unknown op: {op}"}
+        except QueueFull as e:
+            return {"error": str(e), "retry": True}
+        except (KeyError, ValueError) as e:
+            return {"error": str(e)}
+
+    def _make_server(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        response = daemon.handle_request(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        response = {"error": f"invalid JSON: {e}"}
+                    self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)   # stale socket from a previous run
+        server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        server.daemon_threads = True
+        return server
+
+    # ---- lifecycle -------------------------------------------------------
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.worker_options,))
+
+    def start(self):
+        """Start the warm pool and the intake threads (returns immediately)."""
+        self._executor = self._new_executor()
+        self._start_thread(self._dispatch)
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._start_thread(self._poll_spool)
+        if self.socket_path:
+            self._server = self._make_server()
+            self._start_thread(self._server.serve_forever)
+        print(f"[Daemon] Ready with {self.workers} workers "
+              f"(socket: {self.socket_path}, spool: {self.spool_dir})")
+
+    def _start_thread(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def shutdown(self):
+        """Stop intake, let queued and running jobs finish, then close the pool."""
+        with self._lock:
+            if self._stopping.is_set():
+                return
+            self._stopping.set()
+        print("[Daemon] Shutting down, draining queued and running jobs...")
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        print("[Daemon] Stopped.")
+        self._stopped.set()
+
+    def serve_forever(self):
+        """Run until SIGTERM/SIGINT or a shutdown request, then drain."""
+        done = threading.Event()
+
+        def stop(signum, frame):
+            done.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.start()
+        while not done.is_set() and not self._stopping.is_set():
+            done.wait(0.5)
+        self.shutdown()
+        self._stopped.wait()   # a shutdown request may be draining on another thread
+
+
+def send_request(socket_path: str, request: Dict[str, Any], timeout: float = 30.0) -> Dict[str, Any]:
+    """Client helper: send one request to a running daemon and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reply:
+            return json.loads(reply.readline())
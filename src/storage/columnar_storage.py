@@ -0,0 +1,328 @@
+import os
+import json
+import gzip
+import time
+import shutil
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .storage import Storage
+from .sql_storage import url_domain
+from src.extractors.font_styles import font_style_rows, font_style_runs
+from src.extractors.page_records import heading_rows
+
+# Datasets written by ColumnarStorage and their columns
+DATASETS: Dict[str, Tuple[str, ...]] = {
+    "text": ("document", "page_number", "content"),
+    "headings": ("document", "page_number", "heading", "level"),
+    "links": ("document", "page_number", "url", "link_text", "domain"),
+    "images": ("document", "page_number", "image_path", "alt_text"),
+    "tables": ("document", "page_number", "table_path", "table_data"),
+    "font_styles": ("document", "page_number", "text", "font", "size"),
+    "font_runs": ("document", "page_number", "font", "size", "span_count", "char_count"),
+}
+
+FORMATS = ("auto", "parquet", "columns")
+
+# Filter operators understood by ColumnarReader (same spelling as pyarrow)
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+}
+
+
+def _have_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _resolve_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported columnar format: {fmt}")
+    if fmt == "auto":
+        return "parquet" if _have_pyarrow() else "columns"
+    if fmt == "parquet" and not _have_pyarrow():
+        raise ValueError("format='parquet' needs pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def _column_stats(values: List[Any]) -> Dict[str, Any]:
+    present = [v for v in values if v is not None]
+    try:
+        return {"min": min(present), "max": max(present)} if present else {}
+    except TypeError:       # mixed types cannot be ordered; no pruning on this column
+        return {}
+
+
+def _encode_column(values: List[Any]) -> Dict[str, Any]:
+    """Dictionary-encode repetitive columns (document names, fonts, domains)."""
+    distinct = {}
+    for value in values:
+        if len(distinct) * 2 > len(values):
+            return {"values": values}
+        distinct.setdefault(value, len(distinct))
+    if len(distinct) * 2 > len(values):
+        return {"values": values}
+    return {"dictionary": list(distinct), "codes": [distinct[v] for v in values]}
+
+
+def _decode_column(encoded: Dict[str, Any]) -> List[Any]:
+    if "values" in encoded:
+        return encoded["values"]
+    dictionary = encoded["dictionary"]
+    return [dictionary[code] for code in encoded["codes"]]
+
+
+class ColumnarStorage(Storage):
+    """
+    Appends extracted records to partitioned columnar files for analytics:
+        <root>/<dataset>/part-<time>-<pid>-<n>.parquet      (pyarrow installed)
+        <root>/<dataset>/part-<time>-<pid>-<n>/             (fallback "columns" format)
+            _meta.json          row count and per-column min/max
+            <column>.json.gz    one file per column, dictionary-encoded when repetitive
+
+    Rows from many documents are buffered and written together once
+    `flush_rows` rows are pending (and on flush()/close()), so a batch run
+    produces a few large parts instead of many tiny files. Parts are written
+    under a temporary name and renamed, so readers never see partial parts
+    and several processes can append to the same root.
+    """
+
+    def __init__(self, root: str = "output/columnar", fmt: str = "auto",
+                 flush_rows: int = 100_000, font_style_mode: str = "spans"):
+        if font_style_mode not in ("spans", "runs"):
+            raise ValueError(f"Unsupported font_style_mode: {font_style_mode}")
+        self.root = root
+        self.format = _resolve_format(fmt)
+        self.flush_rows = flush_rows
+        self.font_style_mode = font_style_mode
+        self._buffers: Dict[str, Dict[str, List[Any]]] = {}
+        self._pending = 0
+        self._part_ids = itertools.count()
+
+    def _append(self, dataset: str, rows: Iterable[Tuple]):
+        columns = DATASETS[dataset]
+        buffer = self._buffers.setdefault(dataset, {name: [] for name in columns})
+        lists = [buffer[name] for name in columns]
+        for row in rows:
+            for values, value in zip(lists, row):
+                values.append(value)
+            self._pending += 1
+
+    def save(self, data: Dict[str, Any], file_name: str, content_hash: str = None,
+             source_path: str = None):
+        """Buffer one document's rows; written out once flush_rows is reached."""
+        text_data = data.get("text", {})
+        metadata = text_data.get("metadata", {})
+
+        self._append("text", (
+            (file_name, page_num, "\n".join(lines))
+            for page_num, lines in text_data.get("text", {}).items()
+        ))
+        self._append("headings", (
+            (file_name,) + row
+            for row in heading_rows(metadata.get("headings", {}), metadata.get("heading_levels", {}))
+        ))
+        self._append("links", (
+            (file_name, link.get("page_number", 0), link.get("url", ""), link.get("text", ""),
+             url_domain(link.get("url", "")))
+            for link in data.get("links", [])
+        ))
+        self._append("images", (
+            (file_name, img.get("page_number", 0), img.get("image_path", ""), img.get("alt_text", ""))
+            for img in data.get("images", [])
+        ))
+        self._append("tables", (
+            (file_name, tbl.get("page_number", 0), tbl.get("table_path", ""),
+             json.dumps(tbl["table_data"]) if "table_data" in tbl else "")
+            for tbl in data.get("tables", [])
+        ))
+        font_styles = metadata.get("font_styles", [])
+        if self.font_style_mode == "runs":
+            self._append("font_runs", ((file_name,) + run for run in font_style_runs(font_styles)))
+        else:
+            self._append("font_styles", ((file_name,) + row for row in font_style_rows(font_styles)))
+
+        if self._pending >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> List[str]:
+        """Write every buffered dataset as a new part; returns the part paths."""
+        written = []
+        for dataset, columns in self._buffers.items():
+            if columns and next(iter(columns.values())):
+                written.append(self._write_part(dataset, columns))
+        self._buffers = {}
+        self._pending = 0
+        return written
+
+    def _part_name(self) -> str:
+        return f"part-{time.time_ns()}-{os.getpid()}-{next(self._part_ids)}"
+
+    def _write_part(self, dataset: str, columns: Dict[str, List[Any]]) -> str:
+        dataset_dir = os.path.join(self.root, dataset)
+        os.makedirs(dataset_dir, exist_ok=True)
+        name = self._part_name()
+
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            path = os.path.join(dataset_dir, f"{name}.parquet")
+            tmp_path = os.path.join(dataset_dir, f".{name}.parquet.tmp")
+            pq.write_table(pa.table(columns), tmp_path)   # row-group stats enable pushdown
+            os.replace(tmp_path, path)
+            return path
+
+        path = os.path.join(dataset_dir, name)
+        tmp_dir = os.path.join(dataset_dir, f".{name}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            for column, values in columns.items():
+                with gzip.open(os.path.join(tmp_dir, f"{column}.json.gz"), "wt",
+                               encoding="utf-8") as f:
+                    json.dump(_encode_column(values), f, separators=(",", ":"))
+            meta = {
+                "num_rows": len(next(iter(columns.values()))),
+                "columns": list(columns),
+                "stats": {column: _column_stats(values) for column, values in columns.items()},
+            }
+            with open(os.path.join(tmp_dir, "_meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_dir, path)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return path
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_shared: Dict[Tuple, ColumnarStorage] = {}
+
+
+def shared_columnar_storage(root: str, fmt: str = "auto", flush_rows: int = 100_000,
+                            font_style_mode: str = "spans") -> ColumnarStorage:
+    """
+    One ColumnarStorage per process and root, so rows from every document a
+    process handles (e.g. a batch or daemon worker) share parts. Remaining
+    rows are flushed when the process exits.
+    """
+    key = (os.getpid(), os.path.abspath(root), fmt, font_style_mode)
+    storage = _shared.get(key)
+    if storage is None:
+        from multiprocessing.util import Finalize
+
+        storage = _shared[key] = ColumnarStorage(root, fmt, flush_rows, font_style_mode)
+        # Runs at exit in the main process and in pool workers alike
+        Finalize(storage, storage.flush, exitpriority=10)
+    return storage
+
+
+class ColumnarReader:
+    """
+    Scans datasets written by ColumnarStorage with projection (only the
+    requested columns are read) and predicate pushdown (parts whose min/max
+    stats cannot match are skipped). Filters are (column, op, value) tuples,
+    op one of == != < <= > >= in, all of which must hold.
+    """
+
+    def __init__(self, root: str = "output/columnar"):
+        self.root = root
+
+    def _parts(self, dataset: str) -> List[str]:
+        dataset_dir = os.path.join(self.root, dataset)
+        if not os.path.isdir(dataset_dir):
+            return []
+        return sorted(os.path.join(dataset_dir, name) for name in os.listdir(dataset_dir)
+                      if name.startswith("part-"))
+
+    @staticmethod
+    def _may_match(stats: Dict[str, Dict[str, Any]], filters) -> bool:
+        for column, op, value in filters:
+            column_stats = stats.get(column)
+            if not column_stats:
+                continue
+            low, high = column_stats["min"], column_stats["max"]
+            try:
+                if op == "==" and not low <= value <= high:
+                    return False
+                if op == "in" and not any(low <= v <= high for v in value):
+                    return False
+                if op in ("<", "<=") and not _OPS[op](low, value):
+                    return False
+                if op in (">", ">=") and not _OPS[op](high, value):
+                    return False
+            except TypeError:
+                continue
+        return True
+
+    def scan(self, dataset: str, columns: Optional[List[str]] = None,
+             filters: Optional[List[Tuple[str, str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield matching rows as dicts holding only `columns` (default: all)."""
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+        filters = list(filters or [])
+        for _, op, _ in filters:
+            if op not in _OPS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        columns = list(columns or DATASETS[dataset])
+
+        for part in self._parts(dataset):
+            if part.endswith(".parquet"):
+                yield from self._scan_parquet(part, columns, filters)
+            else:
+                yield from self._scan_columns(part, columns, filters)
+
+    def _scan_columns(self, part: str, columns, filters):
+        with open(os.path.join(part, "_meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if not self._may_match(meta["stats"], filters):
+            return
+
+        cache: Dict[str, List[Any]] = {}
+
+        def column(name):
+            if name not in meta["columns"]:     # added after this part was written
+                return [None] * meta["num_rows"]
+            if name not in cache:
+                with gzip.open(os.path.join(part, f"{name}.json.gz"), "rt", encoding="utf-8") as f:
+                    cache[name] = _decode_column(json.load(f))
+            return cache[name]
+
+        # Evaluate filters column by column, then read only the projected columns
+        selected = range(meta["num_rows"])
+        for name, op, value in filters:
+            values = column(name)
+            selected = [i for i in selected if _OPS[op](values[i], value)]
+            if not selected:
+                return
+        projected = [column(name) for name in columns]
+        for i in selected:
+            yield {name: values[i] for name, values in zip(columns, projected)}
+
+    @staticmethod
+    def _scan_parquet(part: str, columns, filters):
+        import pyarrow.parquet as pq
+
+        present = set(pq.read_schema(part).names)
+        table = pq.read_table(part, columns=[c for c in columns if c in present],
+                              filters=filters or None)
+        # Columns added after this part was written read as None
+        missing = {c: None for c in columns if c not in present}
+        for row in table.to_pylist():
+            yield {**row, **missing} if missing else row
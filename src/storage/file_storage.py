@@ -1,64 +1,129 @@
-
 import os
 import csv
 from typing import Dict, Any
-from .storage import Storage
+from .storage import Storage, StreamWriter
+from src.extractors.font_styles import font_style_rows, font_style_runs
+
+class FileStreamWriter(StreamWriter):
+    """
+    Writes a document's text, headings, links and font styles into their
+    files as each page arrives, so nothing is held in memory between pages.
+    """
+
+    def __init__(self, storage: "FileStorage", file_name: str):
+        super().__init__(storage, file_name)
+        self.output_dir = os.path.join("output", file_name)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.text_file = open(os.path.join(self.output_dir, "extracted_text.txt"), "w", encoding="utf-8")
+        self.headings_file = open(os.path.join(self.output_dir, "headings.txt"), "w", encoding="utf-8")
+        self.links_file = open(os.path.join(self.output_dir, "extracted_links.csv"), "w",
+                               newline="", encoding="utf-8")
+        self.font_runs = storage.font_style_mode == "runs"
+        font_file_name = "font_runs.csv" if self.font_runs else "font_styles.csv"
+        self.font_file = open(os.path.join(self.output_dir, font_file_name), "w",
+                              newline="", encoding="utf-8")
+
+        self.links_writer = csv.writer(self.links_file)
+        self.links_writer.writerow(["Page Number", "URL", "Link Text"])
+        self.font_writer = csv.writer(self.font_file)
+        if self.font_runs:
+            self.font_writer.writerow(["Page Number", "Font", "Size", "Span Count", "Char Count"])
+        else:
+            self.font_writer.writerow(["Page Number", "Text", "Font", "Size"])
+
+    def write_text(self, page_num, lines):
+        self.text_file.write(f"--- Page {page_num} ---\n")
+        for line in lines:
+            self.text_file.write(line + "\n")
+        self.text_file.write("\n")
+
+    def write_headings(self, page_num, hdgs):
+        self.headings_file.write(f"--- Page {page_num} Headings ---\n")
+        for h in hdgs:
+            self.headings_file.write(h + "\n")
+        self.headings_file.write("\n")
+
+    def write_links(self, links_list):
+        for link in links_list:
+            self.links_writer.writerow([
+                link.get("page_number", ""),
+                link.get("url", ""),
+                link.get("text", "")
+            ])
+
+    def write_font_styles(self, font_styles):
+        # Accepts FontStyleColumns or a list of font-style dicts
+        if self.font_runs:
+            self.font_writer.writerows(font_style_runs(font_styles))
+        else:
+            self.font_writer.writerows(font_style_rows(font_styles))
+
+    def write_page(self, record: Dict[str, Any]):
+        page_num = record["page_number"]
+        self.write_text(page_num, record["text"])
+        if record["headings"]:
+            self.write_headings(page_num, record["headings"])
+        self.write_links(record["links"])
+        self.write_font_styles(record["font_styles"])
+
+    def _close_files(self):
+        for f in (self.text_file, self.headings_file, self.links_file, self.font_file):
+            f.close()
+
+    def close(self):
+        self._close_files()
+        self.storage.bytes_written += sum(
+            os.path.getsize(f.name)
+            for f in (self.text_file, self.headings_file, self.links_file, self.font_file)
+        )
+        print(f"Extraction data saved to folder: {self.output_dir}")
+
+    def abort(self):
+        self._close_files()
+
 
 class FileStorage(Storage):
     """
     A simple file-based storage that writes text, links, headings,
     etc. into local files. (Images/tables are usually saved in the
     extractor stage, but we can still handle metadata here.)
+
+    font_style_mode="runs" writes run-length aggregated font/size ranges
+    (font_runs.csv) instead of one font_styles.csv row per span.
     """
 
-    def save(self, data: Dict[str, Any], file_name: str):
-        output_dir = os.path.join("output", file_name)
-        os.makedirs(output_dir, exist_ok=True)
+    def __init__(self, font_style_mode: str = "spans"):
+        if font_style_mode not in ("spans", "runs"):
+            raise ValueError(f"Unsupported font_style_mode: {font_style_mode}")
+        self.font_style_mode = font_style_mode
+        self.bytes_written = 0   # size of the files written by completed saves
+
+    def open_stream(self, file_name: str, content_hash: str = None,
+                    source_path: str = None) -> FileStreamWriter:
+        return FileStreamWriter(self, file_name)
 
-        # 1) Save text
+    def save(self, data: Dict[str, Any], file_name: str, content_hash: str = None,
+             source_path: str = None):
+        writer = FileStreamWriter(self, file_name)
         text_data = data.get("text", {})
-        text_path = os.path.join(output_dir, "extracted_text.txt")
-        with open(text_path, "w", encoding="utf-8") as tf:
+
+        try:
+            # 1) Save text
             for page_num, lines in text_data.get("text", {}).items():
-                tf.write(f"--- Page {page_num} ---\n")
-                for line in lines:
-                    tf.write(line + "\n")
-                tf.write("\n")
-
-        # 2) Save headings
-        headings_path = os.path.join(output_dir, "headings.txt")
-        with open(headings_path, "w", encoding="utf-8") as hf:
+                writer.write_text(page_num, lines)
+
+            # 2) Save headings
             for page_num, hdgs in text_data.get("metadata", {}).get("headings", {}).items():
-                hf.write(f"--- Page {page_num} Headings ---\n")
-                for h in hdgs:
-                    hf.write(h + "\n")
-                hf.write("\n")
-
-        # 3) Save links
-        links_list = data.get("links", [])
-        links_path = os.path.join(output_dir, "extracted_links.csv")
-        with open(links_path, "w", newline="", encoding="utf-8") as lf:
-            writer = csv.writer(lf)
-            writer.writerow(["Page Number", "URL", "Link Text"])
-            for link in links_list:
-                writer.writerow([
-                    link.get("page_number", ""),
-                    link.get("url", ""),
-                    link.get("text", "")
-                ])
-
-        # 4) Save font styles
-        font_styles = text_data.get("metadata", {}).get("font_styles", [])
-        font_path = os.path.join(output_dir, "font_styles.csv")
-        with open(font_path, "w", newline="", encoding="utf-8") as ff:
-            writer = csv.writer(ff)
-            writer.writerow(["Page Number", "Text", "Font", "Size"])
-            for fs in font_styles:
-                writer.writerow([
-                    fs.get("page_number", ""),
-                    fs.get("text", ""),
-                    fs.get("font", ""),
-                    fs.get("size", "")
-                ])
-
-        print(f"Extraction data saved to folder: {output_dir}")
+                writer.write_headings(page_num, hdgs)
+
+            # 3) Save links
+            writer.write_links(data.get("links", []))
+
+            # 4) Save font styles
+            writer.write_font_styles(text_data.get("metadata", {}).get("font_styles", []))
+        except Exception:
+            writer.abort()
+            raise
+
+        writer.close()
@@ -0,0 +1,192 @@
+import queue
+import threading
+from typing import Any, Dict, Tuple
+from .storage import Storage, StreamWriter
+from src.metrics.metrics import DocumentMetrics, timed
+
+# Sink names accepted by --sinks, in the order main.py creates them
+SINKS = ("file", "sql", "columnar")
+DEFAULT_SINKS = ("file", "sql")
+
+
+def parse_sinks(value: str) -> Tuple[str, ...]:
+    """Parse a comma-separated sink list such as "sql,columnar"."""
+    names = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in SINKS]
+    if unknown:
+        raise ValueError(f"Unknown storage sink(s): {', '.join(unknown)} "
+                         f"(choose from {', '.join(SINKS)})")
+    if not names:
+        raise ValueError("At least one storage sink is required")
+    return names
+
+
+class SinkError(Exception):
+    """
+    One or more sinks failed to store a document. The other sinks still
+    finished it; `errors` maps each failed sink's name to its exception.
+    """
+
+    def __init__(self, file_name: str, errors: Dict[str, Exception]):
+        self.file_name = file_name
+        self.errors = errors
+        details = "; ".join(f"{name}: {type(e).__name__}: {e}" for name, e in errors.items())
+        super().__init__(f"Storage failed for '{file_name}' ({details})")
+
+
+class _Sink(threading.Thread):
+    """
+    Runs one storage's work on its own thread, fed through a bounded queue.
+    Once a task fails the sink aborts its open stream and skips the rest of
+    the document, so a slow or broken sink never stalls the others.
+    """
+
+    def __init__(self, name: str, storage: Storage, queue_size: int,
+                 metrics: DocumentMetrics = None):
+        super().__init__(name=f"storage-{name}", daemon=True)
+        self.sink_name = name
+        self.storage = storage
+        self.metrics = metrics
+        self.tasks: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.writer: StreamWriter = None
+        self.error: Exception = None
+
+    def run(self):
+        while True:
+            task = self.tasks.get()
+            try:
+                if task is None:
+                    return
+                if self.error is None:
+                    method, args = task
+                    with timed(self.metrics, f"{self.sink_name}_save"):
+                        getattr(self, method)(*args)
+            except Exception as e:
+                self._fail(e)
+            finally:
+                self.tasks.task_done()
+
+    def _fail(self, error: Exception):
+        self.error = error
+        print(f"[StoragePipeline] {self.sink_name} sink failed: {type(error).__name__}: {error}")
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            try:
+                writer.abort()
+            except Exception:
+                pass
+
+    # Tasks, executed on the sink's thread
+    def save(self, data: Dict[str, Any], file_name: str, content_hash: str, source_path: str):
+        self.storage.save(data, file_name, content_hash, source_path)
+
+    def open(self, file_name: str, content_hash: str, source_path: str):
+        self.writer = self.storage.open_stream(file_name, content_hash, source_path)
+
+    def write(self, record: Dict[str, Any]):
+        self.writer.write_page(record)
+
+    def close(self):
+        self.writer.close()
+        self.writer = None
+
+    def abort(self):
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.abort()
+
+
+class PipelineStreamWriter(StreamWriter):
+    """
+    Hands each page record to every sink's queue and returns at once, so
+    extraction of the next page overlaps the sinks' writes. close() waits
+    for all sinks and raises SinkError if any of them failed.
+    """
+
+    def __init__(self, pipeline: "StoragePipeline", file_name: str, content_hash: str = None,
+                 source_path: str = None):
+        super().__init__(pipeline, file_name, content_hash, source_path)
+        pipeline._broadcast("open", file_name, content_hash, source_path)
+
+    def write_page(self, record: Dict[str, Any]):
+        self.storage._broadcast("write", record)
+
+    def close(self):
+        self.storage._broadcast("close")
+        self.storage.wait(self.file_name)
+
+    def abort(self):
+        self.storage._broadcast("abort")
+        self.storage._collect_errors()
+
+
+class StoragePipeline:
+    """
+    Fans extracted documents out to several storages at once, each running
+    on its own thread so file I/O, SQLite inserts and columnar buffering
+    overlap. Each sink has a bounded queue (`queue_size` tasks): a producer
+    that outruns the slowest sink blocks instead of growing memory.
+
+    Usage:
+        with StoragePipeline({"file": FileStorage(), "sql": sql_storage}) as pipeline:
+            pipeline.save(data, "report")            # waits for every sink
+            with pipeline.open_stream("slides") as writer:
+                for record in extractor.iter_pages():
+                    writer.write_page(record)
+
+    A failing sink does not stop the others; once every sink has finished
+    the document, SinkError reports which ones failed. Storages are not
+    closed by the pipeline; they belong to the caller.
+    """
+
+    def __init__(self, sinks: Dict[str, Storage], queue_size: int = 32,
+                 metrics: DocumentMetrics = None):
+        if not sinks:
+            raise ValueError("StoragePipeline needs at least one sink")
+        self.sinks = [_Sink(name, storage, queue_size, metrics) for name, storage in sinks.items()]
+        for sink in self.sinks:
+            sink.start()
+
+    def _broadcast(self, method: str, *args):
+        for sink in self.sinks:
+            sink.tasks.put((method, args))   # blocks while that sink's queue is full
+
+    def _collect_errors(self) -> Dict[str, Exception]:
+        """Wait for every sink to drain; return and reset their errors."""
+        errors = {}
+        for sink in self.sinks:
+            sink.tasks.join()
+            if sink.error is not None:
+                errors[sink.sink_name] = sink.error
+                sink.error = None
+        return errors
+
+    def wait(self, file_name: str):
+        """Wait until every sink has stored the document; raise SinkError on failures."""
+        errors = self._collect_errors()
+        if errors:
+            raise SinkError(file_name, errors)
+
+    def save(self, data: Dict[str, Any], file_name: str, content_hash: str = None,
+             source_path: str = None):
+        """Store one assembled document in every sink (in parallel)."""
+        self._broadcast("save", data, file_name, content_hash, source_path)
+        self.wait(file_name)
+
+    def open_stream(self, file_name: str, content_hash: str = None,
+                    source_path: str = None) -> PipelineStreamWriter:
+        """Start storing a document page by page in every sink."""
+        return PipelineStreamWriter(self, file_name, content_hash, source_path)
+
+    def close(self):
+        """Stop the sink threads once their queued work is done."""
+        for sink in self.sinks:
+            sink.tasks.put(None)
+        for sink in self.sinks:
+            sink.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
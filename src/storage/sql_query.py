@@ -0,0 +1,153 @@
+import sqlite3
+import json
+from typing import Dict, Any, Iterator, List, Optional
+
+
+class SQLQuery:
+    """
+    Read-side helpers over the database written by SQLStorage.
+    All results are returned as plain dicts.
+    """
+
+    def __init__(self, db_path="extracted_data.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _all(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def get_document(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recently stored document with this name, or None.
+        """
+        row = self.conn.execute('''
+            SELECT id, file_name, created_at FROM documents
+            WHERE file_name = ?
+            ORDER BY id DESC LIMIT 1;
+        ''', (file_name,)).fetchone()
+        return dict(row) if row else None
+
+    def get_pages(self, document_id: int) -> List[Dict[str, Any]]:
+        """
+        Return [{"page_number", "content"}, ...] for a document, in page order.
+        """
+        return self._all('''
+            SELECT page_number, content FROM document_text_content
+            WHERE document_id = ?
+            ORDER BY page_number;
+        ''', (document_id,))
+
+    def get_headings(self, document_id: int) -> List[Dict[str, Any]]:
+        """
+        Return [{"page_number", "heading", "level"}, ...] for a document, in page order.
+        """
+        return self._all('''
+            SELECT page_number, heading, level FROM document_headings
+            WHERE document_id = ?
+            ORDER BY page_number, id;
+        ''', (document_id,))
+
+    def get_links_for_domain(self, domain: str, include_subdomains: bool = False) -> List[Dict[str, Any]]:
+        """
+        Return every stored link pointing at a host, e.g. "example.com".
+        With include_subdomains, "docs.example.com" matches too.
+        """
+        domain = domain.lower()
+        sql = '''
+            SELECT l.document_id, d.file_name, l.page_number, l.url, l.link_text, l.shape_name
+            FROM document_links l JOIN documents d ON d.id = l.document_id
+            WHERE l.domain = ?
+        '''
+        params = [domain]
+        if include_subdomains:
+            sql += " OR l.domain LIKE ?"
+            params.append(f"%.{domain}")
+        sql += " ORDER BY l.document_id, l.page_number;"
+        return self._all(sql, params)
+
+    def find_images(self, document_id: int, page_number: int) -> List[Dict[str, Any]]:
+        """
+        Return the images stored for one page of a document.
+        """
+        return self._all('''
+            SELECT page_number, image_path, alt_text FROM document_images
+            WHERE document_id = ? AND page_number = ?
+            ORDER BY id;
+        ''', (document_id, page_number))
+
+    def get_tables(self, document_id: int, page_number: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return tables for a document (optionally one page), with table_data decoded.
+        """
+        sql = ("SELECT page_number, table_data, table_path FROM document_tables_content "
+               "WHERE document_id = ?")
+        params = [document_id]
+        if page_number is not None:
+            sql += " AND page_number = ?"
+            params.append(page_number)
+        tables = self._all(sql + " ORDER BY page_number, id;", params)
+        for tbl in tables:
+            tbl["table_data"] = json.loads(tbl["table_data"]) if tbl["table_data"] else []
+        return tables
+
+    def iter_font_styles(self, document_id: int, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream font-style rows for a document without loading them all at once.
+        Yields dicts shaped like extractor output: {"page_number", "text", "font", "size"}.
+        """
+        cursor = self.conn.execute('''
+            SELECT page_number, text_content, font_name, font_size FROM document_font_styles
+            WHERE document_id = ?
+            ORDER BY page_number, id;
+        ''', (document_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield {
+                    "page_number": row["page_number"],
+                    "text": row["text_content"],
+                    "font": row["font_name"],
+                    "size": row["font_size"]
+                }
+
+    def search_text(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over page content (FTS5 query syntax).
+        Returns matching pages, best match first, with a short snippet.
+        """
+        return self._all('''
+            SELECT t.document_id, d.file_name, t.page_number,
+                   snippet(document_text_fts, 0, '[', ']', '...', 12) AS snippet
+            FROM document_text_fts
+            JOIN document_text t ON t.id = document_text_fts.rowid
+            JOIN documents d ON d.id = t.document_id
+            WHERE document_text_fts MATCH ?
+            ORDER BY rank LIMIT ?;
+        ''', (query, limit))
+
+    def search_headings(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over headings (FTS5 query syntax).
+        """
+        return self._all('''
+            SELECT h.document_id, d.file_name, h.page_number, h.heading
+            FROM document_headings_fts
+            JOIN document_headings h ON h.id = document_headings_fts.rowid
+            JOIN documents d ON d.id = h.document_id
+            WHERE document_headings_fts MATCH ?
+            ORDER BY rank LIMIT ?;
+        ''', (query, limit))
@@ -1,28 +1,123 @@
 import os
 import sqlite3
 import json
-from typing import Dict, Any, List, Union
-from .storage import Storage  # your abstract base class
+import hashlib
+from urllib.parse import urlsplit
+from typing import Dict, Any, Iterable, List, Tuple, Union
+from .storage import Storage, StreamWriter  # your abstract base class
+from src.extractors.font_styles import font_style_rows, font_style_runs
+from src.extractors.page_records import heading_rows
+
+def url_domain(url: str) -> str:
+    """
+    Lower-cased host name of a URL ("" for mailto:, relative links, etc.).
+    """
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def blob_hash(content: str) -> str:
+    """
+    Key of a text in content_blobs (SHA-1 of its UTF-8 bytes).
+    """
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
 
 class SQLStorage(Storage):
     """
     Concrete class for SQL-based storage (using SQLite). Stores text, headings,
     links, images, tables, etc. in relational tables.
+
+    Storage is content-addressed in two ways:
+      - A document saved with the SHA-256 and path of its source file is
+        stored once per hash and path. Saving the same content again (a
+        re-run, or a copy under another name) or the same path again (an
+        edited file, full or incremental run) replaces the earlier rows and
+        keeps the documents.id.
+      - Page text and table JSON live in content_blobs, keyed by their own
+        hash, so identical pages and tables are stored once. Read them
+        through the document_text_content and document_tables_content views.
+        Blobs no longer referenced are deleted by triggers.
     """
 
-    def __init__(self, db_path="extracted_data.db"):
+    JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+    SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+    FONT_STYLE_MODES = {"spans", "runs"}
+    # Per-page child tables (all keyed by document_id, page_number)
+    CHILD_TABLES = ("document_text", "document_headings", "document_links", "document_images",
+                    "document_tables", "document_font_styles", "document_font_runs")
+    # (table, column) pairs referring to content_blobs.hash
+    BLOB_COLUMNS = (("document_text", "content_hash"), ("document_tables", "data_hash"))
+
+    def __init__(self, db_path="extracted_data.db", journal_mode="WAL", synchronous="NORMAL",
+                 page_size=None, timeout=30.0, font_style_mode="spans"):
         """
         Initialize SQLStorage with a path to the SQLite database.
+        One connection is opened here and reused by every save() until close().
+
+        Args:
+            journal_mode: SQLite journal mode (WAL lets readers run during writes).
+            synchronous: SQLite synchronous level (NORMAL is safe with WAL).
+            page_size: optional page size in bytes (only applies to a new database).
+            timeout: seconds to wait on a locked database (e.g. parallel batch workers).
+            font_style_mode: "spans" stores one document_font_styles row per span;
+                "runs" stores run-length aggregated rows in document_font_runs.
         """
         self.db_path = db_path
+        self.journal_mode = journal_mode.upper() if journal_mode else None
+        self.synchronous = synchronous.upper() if synchronous else None
+        self.page_size = page_size
+        self.timeout = timeout
+        self.font_style_mode = font_style_mode
+        self.rows_written = 0   # rows committed through this instance
+
+        if font_style_mode not in self.FONT_STYLE_MODES:
+            raise ValueError(f"Unsupported font_style_mode: {font_style_mode}")
+        if self.journal_mode and self.journal_mode not in self.JOURNAL_MODES:
+            raise ValueError(f"Unsupported journal_mode: {journal_mode}")
+        if self.synchronous and self.synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+
+        self.conn = self._connect()
         self._create_tables()
 
+    def _connect(self):
+        """
+        Open the long-lived connection and apply the configured pragmas.
+        """
+        # A StoragePipeline runs the inserts on its own thread; the connection
+        # is still only used by one thread at a time
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        # page_size has to be set before the database is first written
+        if self.page_size:
+            conn.execute(f"PRAGMA page_size = {int(self.page_size)};")
+        if self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode};")
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous};")
+        return conn
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def _create_tables(self):
         """
         Create the necessary database tables if they do not exist already.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
 
         # Documents: top-level table for each file processed
         cursor.execute('''
@@ -32,8 +127,21 @@ class SQLStorage(Storage):
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
         ''')
+        # Absolute path of the source file (NULL for in-memory saves)
+        self._ensure_column(cursor, "documents", "source_path", "TEXT")
+        # SHA-256 of the source file (unique where set)
+        self._ensure_column(cursor, "documents", "content_hash", "TEXT")
+
+        # Content blobs: page text and table JSON, stored once per distinct value
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS content_blobs (
+                hash TEXT PRIMARY KEY,
+                content TEXT NOT NULL
+            ) WITHOUT ROWID;
+        ''')
 
-        # Document text: stores text content, one row per page
+        # Document text: one row per page. The text is in content_blobs; content
+        # only holds pages stored before content_hash existed
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS document_text (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -43,6 +151,7 @@ class SQLStorage(Storage):
                 FOREIGN KEY(document_id) REFERENCES documents(id)
             );
         ''')
+        self._ensure_column(cursor, "document_text", "content_hash", "TEXT")
 
         # Document headings: store headings, one row per heading
         cursor.execute('''
@@ -54,6 +163,8 @@ class SQLStorage(Storage):
                 FOREIGN KEY(document_id) REFERENCES documents(id)
             );
         ''')
+        # Heading level 1-3 (NULL when the extractor did not classify it)
+        self._ensure_column(cursor, "document_headings", "level", "INTEGER")
 
         # Document links: store hyperlinks, one row per link
         cursor.execute('''
@@ -64,9 +175,12 @@ class SQLStorage(Storage):
                 url TEXT,
                 link_text TEXT,
                 shape_name TEXT,
+                domain TEXT,
                 FOREIGN KEY(document_id) REFERENCES documents(id)
             );
         ''')
+        # Databases created before the domain column existed
+        self._ensure_column(cursor, "document_links", "domain", "TEXT")
 
         # Document images: store extracted image metadata, one row per image
         cursor.execute('''
@@ -80,7 +194,7 @@ class SQLStorage(Storage):
             );
         ''')
 
-        # Document tables: store table data (as JSON) plus CSV path
+        # Document tables: table data (as JSON, in content_blobs) plus CSV path
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS document_tables (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -91,6 +205,7 @@ class SQLStorage(Storage):
                 FOREIGN KEY(document_id) REFERENCES documents(id)
             );
         ''')
+        self._ensure_column(cursor, "document_tables", "data_hash", "TEXT")
 
         # Document font styles: store run-level font info
         cursor.execute('''
@@ -105,12 +220,375 @@ class SQLStorage(Storage):
             );
         ''')
 
-        conn.commit()
-        conn.close()
+        # Document font runs: consecutive spans sharing page/font/size, aggregated
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS document_font_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                document_id INTEGER,
+                page_number INTEGER,
+                font_name TEXT,
+                font_size REAL,
+                span_count INTEGER,
+                char_count INTEGER,
+                FOREIGN KEY(document_id) REFERENCES documents(id)
+            );
+        ''')
+
+        # Document pages: per-page content fingerprints for incremental re-extraction
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS document_pages (
+                document_id INTEGER,
+                page_number INTEGER,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY(document_id, page_number),
+                FOREIGN KEY(document_id) REFERENCES documents(id)
+            );
+        ''')
+
+        self._create_indexes(cursor)
+        self._create_blob_views(cursor)
+        self.fts_enabled = self._create_search_tables(cursor)
+
+        self.conn.commit()
+
+    @staticmethod
+    def _ensure_column(cursor, table: str, column: str, decl: str):
+        """
+        Add a column to an existing table if it is missing. Another process
+        opening the same database may add it first, which is fine.
+        """
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table});")]
+        if column not in columns:
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl};")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" not in str(e):
+                    raise
+
+    def _create_indexes(self, cursor):
+        """
+        Indexes for the read-side lookups in SQLQuery (by name, page and domain).
+        """
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_documents_file_name ON documents(file_name);"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_documents_source_path ON documents(source_path);"
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_content_hash "
+            "ON documents(content_hash) WHERE content_hash IS NOT NULL;"
+        )
+        for table in self.CHILD_TABLES:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_document_page "
+                f"ON {table}(document_id, page_number);"
+            )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_document_links_domain ON document_links(domain);"
+        )
+        # Blob reference lookups (for the cleanup triggers)
+        for table, column in self.BLOB_COLUMNS:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column});"
+            )
+
+    def _create_blob_views(self, cursor):
+        """
+        Views that put the blob text back in place, and triggers that delete a
+        blob once no page or table refers to it any more.
+        """
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS document_text_content AS
+            SELECT t.id, t.document_id, t.page_number, COALESCE(b.content, t.content) AS content
+            FROM document_text t LEFT JOIN content_blobs b ON b.hash = t.content_hash;
+        ''')
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS document_tables_content AS
+            SELECT t.id, t.document_id, t.page_number,
+                   COALESCE(b.content, t.table_data) AS table_data, t.table_path
+            FROM document_tables t LEFT JOIN content_blobs b ON b.hash = t.data_hash;
+        ''')
+        unreferenced = " AND ".join(
+            f"NOT EXISTS (SELECT 1 FROM {table} WHERE {column} = old.{{column}})"
+            for table, column in self.BLOB_COLUMNS
+        )
+        for table, column in self.BLOB_COLUMNS:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_blob_delete AFTER DELETE ON {table}
+                WHEN old.{column} IS NOT NULL BEGIN
+                    DELETE FROM content_blobs WHERE hash = old.{column}
+                        AND {unreferenced.format(column=column)};
+                END;
+            ''')
 
-    def save(self, data: Dict[str, Any], file_name: str):
+    def _create_search_tables(self, cursor) -> bool:
+        """
+        Create FTS5 indexes over page text and headings, kept in sync by triggers.
+        Returns False (and skips full-text search) if SQLite lacks FTS5.
+        """
+        # fts table: (table, column, content table, the column's value for a row)
+        sources = {
+            "document_text_fts": (
+                "document_text", "content", "document_text_content",
+                "COALESCE((SELECT content FROM content_blobs WHERE hash = {row}.content_hash), "
+                "{row}.content)"
+            ),
+            "document_headings_fts": ("document_headings", "heading", "document_headings",
+                                      "{row}.heading"),
+        }
+        try:
+            for fts_table, (table, column, content, value) in sources.items():
+                row = cursor.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?;",
+                    (fts_table,)
+                ).fetchone()
+                if row is not None and f"content='{content}'" not in row[0]:
+                    # Indexed document_text itself before page text moved to content_blobs
+                    cursor.execute(f"DROP TABLE {fts_table};")
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_insert;")
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_delete;")
+                    row = None
+
+                # External-content table: the text itself is not stored twice
+                cursor.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+                    USING fts5({column}, content='{content}', content_rowid='id');
+                ''')
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                        INSERT INTO {fts_table}(rowid, {column})
+                        VALUES (new.id, {value.format(row="new")});
+                    END;
+                ''')
+                # BEFORE, so the text is read before its blob can be cleaned up
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_fts_delete BEFORE DELETE ON {table} BEGIN
+                        INSERT INTO {fts_table}({fts_table}, rowid, {column})
+                        VALUES ('delete', old.id, {value.format(row="old")});
+                    END;
+                ''')
+
+                # Index rows that were stored before the search table existed
+                if row is None:
+                    cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild');")
+        except sqlite3.OperationalError as e:
+            print(f"[SQLStorage] Full-text search disabled: {e}")
+            return False
+        return True
+
+    def _insert_document(self, cursor, data: Dict[str, Any], file_name: str,
+                         content_hash: str = None, source_path: str = None) -> Tuple[int, int]:
+        """
+        Insert one document and all of its rows with executemany batches.
+        The caller owns the transaction. Returns (documents.id, rows inserted).
+        """
+        # 1) Insert (or take over) the row in documents that represents this file
+        document_id = self._insert_document_row(cursor, file_name, source_path, content_hash)
+
+        text_data = data.get("text", {})
+        metadata = text_data.get("metadata", {})
+        #   => text_data["text"] is dict of page_num -> list of lines
+        rows = 1 + self._insert_rows(
+            cursor,
+            document_id,
+            pages=text_data.get("text", {}).items(),
+            headings=heading_rows(metadata.get("headings", {}),
+                                  metadata.get("heading_levels", {})),
+            links=data.get("links", []),
+            images=data.get("images", []),
+            tables=data.get("tables", []),
+            font_styles=metadata.get("font_styles", [])
+        )
+        return document_id, rows
+
+    def _insert_document_row(self, cursor, file_name: str, source_path: str = None,
+                             content_hash: str = None) -> int:
+        """
+        Insert a documents row. A document already stored with the same
+        content_hash or source_path is replaced instead: it keeps its id,
+        takes the new name, and its child rows are deleted so the caller can
+        insert the new ones. Other rows matching either key are deleted.
+        """
+        document_id, created, superseded = self._claim_document_row(
+            cursor, file_name, source_path, content_hash)
+        self._delete_documents(cursor, superseded)
+        if not created:
+            for table in self.CHILD_TABLES + ("document_pages",):
+                cursor.execute(f"DELETE FROM {table} WHERE document_id = ?;", (document_id,))
+        return document_id
+
+    @staticmethod
+    def _find_documents(cursor, source_path: str = None, content_hash: str = None) -> List[int]:
+        """
+        Ids of the stored versions of a source: the row with the same
+        content_hash first, then rows with the same source_path, newest first.
+        """
+        ids = []
+        if content_hash is not None:
+            row = cursor.execute(
+                "SELECT id FROM documents WHERE content_hash = ?;", (content_hash,)
+            ).fetchone()
+            if row is not None:
+                ids.append(row[0])
+        if source_path is not None:
+            ids += [document_id for document_id, in cursor.execute(
+                "SELECT id FROM documents WHERE source_path = ? ORDER BY id DESC;", (source_path,)
+            ).fetchall() if document_id not in ids]
+        return ids
+
+    @classmethod
+    def _claim_document_row(cls, cursor, file_name: str, source_path: str = None,
+                            content_hash: str = None) -> Tuple[int, bool, List[int]]:
+        """
+        Insert a documents row, or take over the stored version of the same
+        source (see _find_documents) and record both keys on it. Returns
+        (document_id, created, superseded ids); child rows are left alone.
+        """
+        ids = cls._find_documents(cursor, source_path, content_hash)
+        if not ids:
+            cursor.execute('''
+                INSERT INTO documents (file_name, source_path, content_hash) VALUES (?, ?, ?)
+                ON CONFLICT(content_hash) WHERE content_hash IS NOT NULL DO NOTHING;
+            ''', (file_name, source_path, content_hash))
+            if cursor.rowcount == 1:
+                return cursor.lastrowid, True, []
+            # Another writer stored the same content since the lookup
+            ids = cls._find_documents(cursor, source_path, content_hash)
+
+        document_id = ids[0]
+        cursor.execute('''
+            UPDATE documents SET file_name = ?, source_path = COALESCE(?, source_path),
+                                 content_hash = ?, created_at = CURRENT_TIMESTAMP
+            WHERE id = ?;
+        ''', (file_name, source_path, content_hash, document_id))
+        return document_id, False, ids[1:]
+
+    def _delete_documents(self, cursor, document_ids: List[int]):
+        """Delete documents rows together with all of their child rows."""
+        for document_id in document_ids:
+            for table in self.CHILD_TABLES + ("document_pages",):
+                cursor.execute(f"DELETE FROM {table} WHERE document_id = ?;", (document_id,))
+            cursor.execute("DELETE FROM documents WHERE id = ?;", (document_id,))
+
+    @staticmethod
+    def _insert_blobs(cursor, blobs: List[Tuple[str, str]]) -> int:
+        """
+        Store (hash, content) pairs not stored yet. Returns the number of new blobs.
+        """
+        cursor.executemany(
+            "INSERT OR IGNORE INTO content_blobs (hash, content) VALUES (?, ?);", blobs
+        )
+        return cursor.rowcount
+
+    def _insert_rows(self, cursor, document_id: int, pages, headings, links, images,
+                     tables, font_styles):
+        """
+        Insert child rows for a document. `pages` yields (page_num, lines) and
+        `headings` yields (page_num, heading, level); the rest are extractor dicts.
+        Returns the number of rows inserted.
+        """
+        rows = 0
+        # 2) Handle text (the page text goes to content_blobs, once per distinct text)
+        texts = [(page_num, "\n".join(lines_list)) for page_num, lines_list in pages]
+        hashes = [blob_hash(content) for _, content in texts]
+        rows += self._insert_blobs(cursor, [(h, content) for h, (_, content) in zip(hashes, texts)])
+        cursor.executemany('''
+            INSERT INTO document_text (document_id, page_number, content_hash)
+            VALUES (?, ?, ?);
+        ''', (
+            (document_id, page_num, h)
+            for h, (page_num, _) in zip(hashes, texts)
+        ))
+        rows += cursor.rowcount
+
+        # 3) Handle headings
+        cursor.executemany('''
+            INSERT INTO document_headings (document_id, page_number, heading, level)
+            VALUES (?, ?, ?, ?);
+        ''', (
+            (document_id, page_num, heading_str, level)
+            for page_num, heading_str, level in headings
+        ))
+        rows += cursor.rowcount
+
+        # 4) Handle links
+        cursor.executemany('''
+            INSERT INTO document_links
+                (document_id, page_number, url, link_text, shape_name, domain)
+            VALUES (?, ?, ?, ?, ?, ?);
+        ''', (
+            (
+                document_id,
+                link.get("page_number", 0),
+                link.get("url", ""),
+                link.get("text", ""),
+                link.get("shape_name", ""),
+                url_domain(link.get("url", ""))
+            )
+            for link in links
+        ))
+        rows += cursor.rowcount
+
+        # 5) Handle images
+        cursor.executemany('''
+            INSERT INTO document_images (document_id, page_number, image_path, alt_text)
+            VALUES (?, ?, ?, ?);
+        ''', (
+            (
+                document_id,
+                img.get("page_number", 0),
+                img.get("image_path", ""),
+                img.get("alt_text", "")
+            )
+            for img in images
+        ))
+        rows += cursor.rowcount
+
+        # 6) Handle tables (table data converted into JSON in content_blobs, if present)
+        tables = list(tables)
+        blobs = []
+        for tbl in tables:
+            data = json.dumps(tbl["table_data"]) if "table_data" in tbl else None
+            blobs.append((blob_hash(data), data) if data is not None else None)
+        rows += self._insert_blobs(cursor, [blob for blob in blobs if blob is not None])
+        cursor.executemany('''
+            INSERT INTO document_tables (document_id, page_number, table_data, data_hash, table_path)
+            VALUES (?, ?, ?, ?, ?);
+        ''', (
+            (
+                document_id,
+                tbl.get("page_number", 0),
+                None if blob else "",
+                blob[0] if blob else None,
+                tbl.get("table_path", "")
+            )
+            for tbl, blob in zip(tables, blobs)
+        ))
+        rows += cursor.rowcount
+
+        # 7) Handle font styles (one row per span, or run-length aggregated)
+        if self.font_style_mode == "runs":
+            cursor.executemany('''
+                INSERT INTO document_font_runs
+                    (document_id, page_number, font_name, font_size, span_count, char_count)
+                VALUES (?, ?, ?, ?, ?, ?);
+            ''', ((document_id,) + run for run in font_style_runs(font_styles)))
+        else:
+            cursor.executemany('''
+                INSERT INTO document_font_styles
+                    (document_id, page_number, text_content, font_name, font_size)
+                VALUES (?, ?, ?, ?, ?);
+            ''', ((document_id,) + row for row in font_style_rows(font_styles)))
+        rows += cursor.rowcount
+        return rows
+
+    def save(self, data: Dict[str, Any], file_name: str, content_hash: str = None,
+             source_path: str = None):
         """
         Save the extracted data dictionary for one file into the SQLite DB.
+        An earlier document with the same content_hash (SHA-256 of the source
+        file) or source_path is replaced rather than stored twice.
 
         Args:
             data: {
@@ -122,103 +600,207 @@ class SQLStorage(Storage):
                "tables": [...]
             }
             file_name: "my_document" (base name, or however you prefer)
+            content_hash: optional source file hash used to deduplicate
+            source_path: optional absolute path of the source file
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.save_many([(data, file_name, content_hash, source_path)])
+
+    def open_stream(self, file_name: str, content_hash: str = None,
+                    source_path: str = None) -> "SQLStreamWriter":
+        return SQLStreamWriter(self, file_name, content_hash, source_path)
+
+    def save_many(self, docs: Iterable[Tuple]):
+        """
+        Save many (data, file_name[, content_hash[, source_path]]) tuples
+        in a single transaction, so either all of them are stored or (on
+        error) none are and the error is raised.
+        """
+        cursor = self.conn.cursor()
+        saved = []
+        rows = 0
 
         try:
-            # 1) Insert a row into documents to represent this file
-            cursor.execute(
-                "INSERT INTO documents (file_name) VALUES (?);",
-                (file_name,)
-            )
-            document_id = cursor.lastrowid
-
-            # 2) Handle text
-            text_data = data.get("text", {})
-            #   => text_data["text"] is dict of page_num -> list of lines
-            pages_dict = text_data.get("text", {})
-            for page_num, lines_list in pages_dict.items():
-                combined_text = "\n".join(lines_list)
-                cursor.execute('''
-                    INSERT INTO document_text (document_id, page_number, content)
-                    VALUES (?, ?, ?);
-                ''', (document_id, page_num, combined_text))
-
-            # 3) Handle headings
-            headings_dict = text_data.get("metadata", {}).get("headings", {})
-            for page_num, heading_list in headings_dict.items():
-                for heading_str in heading_list:
-                    cursor.execute('''
-                        INSERT INTO document_headings (document_id, page_number, heading)
-                        VALUES (?, ?, ?);
-                    ''', (document_id, page_num, heading_str))
-
-            # 4) Handle links
-            links_list = data.get("links", [])
-            for link in links_list:
-                cursor.execute('''
-                    INSERT INTO document_links (document_id, page_number, url, link_text, shape_name)
-                    VALUES (?, ?, ?, ?, ?);
-                ''', (
-                    document_id,
-                    link.get("page_number", 0),
-                    link.get("url", ""),
-                    link.get("text", ""),
-                    link.get("shape_name", "")
-                ))
-
-            # 5) Handle images
-            images_list = data.get("images", [])
-            for img in images_list:
-                cursor.execute('''
-                    INSERT INTO document_images (document_id, page_number, image_path, alt_text)
-                    VALUES (?, ?, ?, ?);
-                ''', (
-                    document_id,
-                    img.get("page_number", 0),
-                    img.get("image_path", ""),
-                    img.get("alt_text", "")
-                ))
-
-            # 6) Handle tables
-            tables_list = data.get("tables", [])
-            for tbl in tables_list:
-                # Convert the table data into JSON if present
-                table_data_json = ""
-                if "table_data" in tbl:
-                    table_data_json = json.dumps(tbl["table_data"])
-                cursor.execute('''
-                    INSERT INTO document_tables (document_id, page_number, table_data, table_path)
-                    VALUES (?, ?, ?, ?);
-                ''', (
-                    document_id,
-                    tbl.get("page_number", 0),
-                    table_data_json,
-                    tbl.get("table_path", "")
-                ))
-
-            # 7) Handle font styles
-            font_styles_list = text_data.get("metadata", {}).get("font_styles", [])
-            for fs in font_styles_list:
-                cursor.execute('''
-                    INSERT INTO document_font_styles 
-                        (document_id, page_number, text_content, font_name, font_size)
-                    VALUES (?, ?, ?, ?, ?);
-                ''', (
-                    document_id,
-                    fs.get("page_number", 0),
-                    fs.get("text", ""),
-                    fs.get("font", ""),
-                    fs.get("size", 0)
-                ))
-
-            conn.commit()
-            print(f"[SQLStorage] Successfully saved data for '{file_name}' to {self.db_path}.")
+            for data, file_name, *keys in docs:
+                rows += self._insert_document(cursor, data, file_name, *keys)[1]
+                saved.append(file_name)
+
+            self.conn.commit()
+            self.rows_written += rows
+            if len(saved) == 1:
+                print(f"[SQLStorage] Successfully saved data for '{saved[0]}' to {self.db_path}.")
+            else:
+                print(f"[SQLStorage] Successfully saved {len(saved)} documents to {self.db_path}.")
 
         except Exception as e:
-            conn.rollback()
+            self.conn.rollback()
             print(f"[SQLStorage] Error saving data to database: {e}")
+            raise
+
+
+    def diff_pages(self, source_path: str, fingerprints: Dict[int, str],
+                   content_hash: str = None) -> Dict[str, Any]:
+        """
+        Compare a document's current page fingerprints with the ones stored
+        for the same source (by content_hash, else source_path; see
+        _find_documents). Returns
+            {"document_id": int or None, "changed": [page, ...], "removed": [page, ...],
+             "superseded": [document_id, ...]}
+        A file seen for the first time has every page "changed", and so does
+        one last stored by a full run, which keeps no fingerprints: all of its
+        rows are replaced. Superseded rows are other stored versions that
+        update_pages() deletes.
+        """
+        ids = self._find_documents(self.conn, source_path, content_hash)
+        document_id = ids[0] if ids else None
+        stored = {}
+        if document_id is not None:
+            stored = dict(self.conn.execute(
+                "SELECT page_number, fingerprint FROM document_pages WHERE document_id = ?;",
+                (document_id,)
+            ))
+            if not stored:
+                pages = " UNION ".join(f"SELECT page_number FROM {table} WHERE document_id = :id"
+                                       for table in self.CHILD_TABLES)
+                stored = {page: None for page, in self.conn.execute(pages, {"id": document_id})}
+        return {
+            "document_id": document_id,
+            "changed": sorted(p for p, fp in fingerprints.items() if stored.get(p) != fp),
+            "removed": sorted(p for p in stored if p not in fingerprints),
+            "superseded": ids[1:],
+        }
+
+    def update_pages(self, file_name: str, source_path: str, plan: Dict[str, Any],
+                     records: Iterable[Dict[str, Any]], fingerprints: Dict[int, str],
+                     content_hash: str = None):
+        """
+        Apply a diff_pages() plan in one transaction: drop the rows of changed
+        and removed pages, insert the re-extracted page records and store the
+        new fingerprints. Unchanged pages are not touched; the document row
+        records both source_path and content_hash, and superseded versions
+        are deleted.
+        """
+        cursor = self.conn.cursor()
+        try:
+            document_id, created, superseded = self._claim_document_row(
+                cursor, file_name, source_path, content_hash)
+            self._delete_documents(cursor, superseded)
+            rows = 1 if created else 0
+
+            stale = [(document_id, page) for page in plan["changed"] + plan["removed"]]
+            for table in self.CHILD_TABLES + ("document_pages",):
+                cursor.executemany(
+                    f"DELETE FROM {table} WHERE document_id = ? AND page_number = ?;", stale
+                )
+
+            for record in records:
+                page_num = record["page_number"]
+                rows += self._insert_rows(
+                    cursor, document_id,
+                    pages=[(page_num, record["text"])],
+                    headings=_record_heading_rows(record),
+                    links=record["links"],
+                    images=record["images"],
+                    tables=record["tables"],
+                    font_styles=record["font_styles"]
+                )
+
+            cursor.executemany(
+                "INSERT INTO document_pages (document_id, page_number, fingerprint) VALUES (?, ?, ?);",
+                ((document_id, page, fingerprints[page]) for page in plan["changed"])
+            )
+            rows += cursor.rowcount
+
+            self.conn.commit()
+            self.rows_written += rows
+            print(f"[SQLStorage] Updated {len(plan['changed'])} page(s), removed "
+                  f"{len(plan['removed'])} page(s) of '{file_name}' in {self.db_path}.")
+            return document_id
+        except Exception:
+            self.conn.rollback()
+            raise
+
+
+def _record_heading_rows(record: Dict[str, Any]):
+    page_num = record["page_number"]
+    return heading_rows({page_num: record["headings"]},
+                        {page_num: record.get("heading_levels", [])})
+
+
+class SQLStreamWriter(StreamWriter):
+    """
+    Inserts each page record's rows as it arrives and commits every
+    `batch_pages` pages, so a long extraction never holds the database's
+    write lock (other --stream workers would fail with "database is locked").
+    A re-ingested document keeps its earlier rows until close() deletes them
+    (rows up to the highest ids seen on open) along with superseded versions;
+    abort() deletes the rows written so far instead, leaving the earlier
+    versions in place.
+    """
+    BATCH_PAGES = 16
+
+    def __init__(self, storage: SQLStorage, file_name: str, content_hash: str = None,
+                 source_path: str = None, batch_pages: int = BATCH_PAGES):
+        super().__init__(storage, file_name, content_hash, source_path)
+        self.cursor = storage.conn.cursor()
+        self.batch_pages = batch_pages
+        self.pending_pages = 0
+        try:
+            self.document_id, self.created, self.superseded = storage._claim_document_row(
+                self.cursor, file_name, source_path, content_hash)
+            self.last_ids = {}
+            if not self.created:
+                for table in storage.CHILD_TABLES:
+                    last_id = self.cursor.execute(
+                        f"SELECT MAX(id) FROM {table} WHERE document_id = ?;", (self.document_id,)
+                    ).fetchone()[0]
+                    if last_id is not None:
+                        self.last_ids[table] = last_id
+            storage.conn.commit()
+        except Exception:
+            storage.conn.rollback()
+            raise
+        self.rows = 1
+
+    def write_page(self, record: Dict[str, Any]):
+        page_num = record["page_number"]
+        self.rows += self.storage._insert_rows(
+            self.cursor,
+            self.document_id,
+            pages=[(page_num, record["text"])],
+            headings=_record_heading_rows(record),
+            links=record["links"],
+            images=record["images"],
+            tables=record["tables"],
+            font_styles=record["font_styles"]
+        )
+        self.pending_pages += 1
+        if self.pending_pages >= self.batch_pages:
+            self.storage.conn.commit()
+            self.pending_pages = 0
+
+    def close(self):
+        try:
+            # Drop the earlier version's rows now that the new ones are complete
+            for table, last_id in self.last_ids.items():
+                self.cursor.execute(f"DELETE FROM {table} WHERE document_id = ? AND id <= ?;",
+                                    (self.document_id, last_id))
+            if not self.created:
+                self.cursor.execute("DELETE FROM document_pages WHERE document_id = ?;",
+                                    (self.document_id,))
+            self.storage._delete_documents(self.cursor, self.superseded)
+            self.storage.conn.commit()
+        except Exception:
+            self.storage.conn.rollback()
+            raise
+        self.storage.rows_written += self.rows
+        print(f"[SQLStorage] Successfully saved data for '{self.file_name}' to {self.storage.db_path}.")
 
-        finally:
-            conn.close()
+    def abort(self):
+        self.storage.conn.rollback()
+        # Remove the batches already committed; a new document goes entirely
+        for table in self.storage.CHILD_TABLES:
+            self.cursor.execute(f"DELETE FROM {table} WHERE document_id = ? AND id > ?;",
+                                (self.document_id, self.last_ids.get(table, 0)))
+        if self.created:
+            self.cursor.execute("DELETE FROM documents WHERE id = ?;", (self.document_id,))
+        self.storage.conn.commit()
@@ -1,6 +1,45 @@
-
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
+
+class StreamWriter:
+    """
+    Receives page records for one document as they are extracted.
+    The default implementation buffers the records and hands the merged
+    document to Storage.save() on close(); storages that can write
+    incrementally return their own subclass from open_stream().
+    """
+
+    def __init__(self, storage: "Storage", file_name: str, content_hash: str = None,
+                 source_path: str = None):
+        self.storage = storage
+        self.file_name = file_name
+        self.content_hash = content_hash
+        self.source_path = source_path
+        self.records = []
+
+    def write_page(self, record: Dict[str, Any]):
+        self.records.append(record)
+
+    def close(self):
+        # Imported here to keep the storage layer free of extractor imports
+        from src.extractors.page_records import merge_page_records
+        self.storage.save(merge_page_records(self.records), self.file_name, self.content_hash,
+                          self.source_path)
+        self.records = []
+
+    def abort(self):
+        """Discard whatever was written so far (extraction failed)."""
+        self.records = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
 
 class Storage(ABC):
     """
@@ -11,8 +50,27 @@ class Storage(ABC):
     """
 
     @abstractmethod
-    def save(self, data: Dict[str, Any], file_name: str):
+    def save(self, data: Dict[str, Any], file_name: str, content_hash: str = None,
+             source_path: str = None):
         """
-        Save the extracted data in the desired format.
+        Save the extracted data in the desired format. content_hash is the
+        SHA-256 of the source file and source_path its absolute path (None
+        for in-memory documents), for storages that replace earlier versions.
         """
         pass
+
+    def open_stream(self, file_name: str, content_hash: str = None,
+                    source_path: str = None) -> StreamWriter:
+        """
+        Start storing a document page by page (see extractors' iter_pages()).
+        """
+        return StreamWriter(self, file_name, content_hash, source_path)
+
+    def save_stream(self, records: Iterable[Dict[str, Any]], file_name: str,
+                    content_hash: str = None, source_path: str = None):
+        """
+        Store an iterable of page records as one document.
+        """
+        with self.open_stream(file_name, content_hash, source_path) as writer:
+            for record in records:
+                writer.write_page(record)
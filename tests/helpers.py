@@ -0,0 +1,19 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    Runs each test in its own scratch directory (extractors and storages
+    write to ./output and ./extracted_data.db). The previous working
+    directory is restored even if a subclass's setUp fails part way.
+    """
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.addCleanup(os.chdir, self.old_cwd)
+        os.chdir(self.tmp_dir)
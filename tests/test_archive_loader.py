@@ -0,0 +1,109 @@
+import unittest
+import io
+import os
+import pickle
+import sqlite3
+import tarfile
+import zipfile
+from functools import partial
+import fitz
+from docx import Document
+from pptx import Presentation
+from main import run_extraction
+from src.batch.batch_runner import BatchRunner, collect_inputs, iter_documents
+from src.loaders.archive_loader import ArchiveLoader, document_name
+from helpers import TempDirTestCase
+
+
+def _pdf_bytes(line: str) -> bytes:
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), line, fontsize=12)
+    return pdf.tobytes()
+
+
+def _docx_bytes(line: str) -> bytes:
+    buf = io.BytesIO()
+    doc = Document()
+    doc.add_paragraph(line)
+    doc.save(buf)
+    return buf.getvalue()
+
+
+MEMBERS = {
+    "reports/q1.pdf": _pdf_bytes("Quarter one"),
+    "memo.docx": _docx_bytes("Memo body"),
+    "readme.txt": b"not a document",
+}
+
+
+class TestArchiveLoader(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with zipfile.ZipFile("bundle.zip", "w") as zf:
+            for name, data in MEMBERS.items():
+                zf.writestr(name, data)
+        with tarfile.open("bundle.tar.gz", "w:gz") as tf:
+            for name, data in MEMBERS.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+
+    def test_members_are_streamed_from_zip_and_tar(self):
+        for archive in ("bundle.zip", "bundle.tar.gz"):
+            members = list(ArchiveLoader(archive).iter_members())
+            self.assertEqual([m.name for m in members],
+                             [f"{archive}!/reports/q1.pdf", f"{archive}!/memo.docx"])
+            self.assertEqual(bytes(members[0].buffer), MEMBERS["reports/q1.pdf"])
+
+        self.assertEqual(list(ArchiveLoader("bundle.zip", max_member_bytes=10).iter_members()), [])
+
+    def test_member_survives_pickling(self):
+        member = next(ArchiveLoader("bundle.zip").iter_members())
+        copy = pickle.loads(pickle.dumps(member))
+        self.assertEqual((copy.name, bytes(copy.buffer)), (member.name, bytes(member.buffer)))
+
+    def test_batch_extracts_members_without_unpacking(self):
+        self.assertEqual(collect_inputs(["."]), ["./bundle.tar.gz", "./bundle.zip"])
+
+        worker = partial(run_extraction, sinks=("sql",))
+        results = BatchRunner(worker, max_workers=2).run(iter_documents(["bundle.zip"]))
+        self.assertEqual([r["status"] for r in results], ["ok", "ok"])
+        self.assertFalse(os.path.exists("reports"))
+
+        with sqlite3.connect("extracted_data.db") as conn:
+            rows = conn.execute("SELECT d.file_name, t.content FROM documents d "
+                                "JOIN document_text_content t ON t.document_id = d.id "
+                                "ORDER BY d.file_name;").fetchall()
+        self.assertEqual(rows[0], ("bundle/memo", "Memo body"))
+        self.assertEqual(rows[1], ("bundle/reports/q1", "Quarter one"))
+
+    def test_members_with_the_same_file_name_stay_apart(self):
+        deck = Presentation()
+        deck.slides.add_slide(deck.slide_layouts[6]).shapes.add_textbox(0, 0, 100, 100) \
+            .text_frame.text = "Slide text"
+        buf = io.BytesIO()
+        deck.save(buf)
+        with zipfile.ZipFile("same.zip", "w") as zf:
+            zf.writestr("x/r.pdf", _pdf_bytes("From x"))
+            zf.writestr("y/r.pptx", buf.getvalue())
+
+        worker = partial(run_extraction, sinks=("file", "sql"))
+        results = BatchRunner(worker, max_workers=2).run(iter_documents(["same.zip"]))
+        self.assertEqual([r["status"] for r in results], ["ok", "ok"])
+
+        for member, text in (("x", "From x"), ("y", "Slide text")):
+            with open(os.path.join("output", "same", member, "r", "extracted_text.txt")) as f:
+                self.assertIn(text, f.read())
+        with sqlite3.connect("extracted_data.db") as conn:
+            names = [name for name, in conn.execute("SELECT file_name FROM documents ORDER BY 1;")]
+        self.assertEqual(names, ["same/x/r", "same/y/r"])
+
+    def test_document_names(self):
+        self.assertEqual(document_name("data/report.pdf"), "report")
+        self.assertEqual(document_name("in/bundle.tar.gz!/a/b.docx"), "bundle/a/b")
+        self.assertEqual(document_name("bundle.zip!/../../etc/r.pdf"), "bundle/etc/r")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import shutil
+import tempfile
+from src.batch.batch_runner import BatchRunner, collect_inputs
+
+
+def fake_worker(file_path):
+    # Module-level so it can be pickled into pool processes
+    if "broken" in os.path.basename(file_path):
+        raise RuntimeError("cannot parse")
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmp_dir, "nested"))
+        for name in ["a.pdf", "b.docx", "notes.txt", os.path.join("nested", "c.pptx")]:
+            with open(os.path.join(self.tmp_dir, name), "w") as f:
+                f.write("x")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_collect_directory(self):
+        paths = collect_inputs([self.tmp_dir])
+        names = sorted(os.path.basename(p) for p in paths)
+        self.assertEqual(names, ["a.pdf", "b.docx", "c.pptx"])
+
+    def test_collect_glob_and_manifest(self):
+        manifest = os.path.join(self.tmp_dir, "list.txt")
+        with open(manifest, "w") as f:
+            f.write("# comment\nb.docx\n\nnested\n")
+
+        paths = collect_inputs([os.path.join(self.tmp_dir, "*.pdf")], manifest=manifest)
+        names = [os.path.basename(p) for p in paths]
+        self.assertEqual(names, ["a.pdf", "b.docx", "c.pptx"])
+
+        # '@' prefix and duplicates collapse to one entry each
+        paths = collect_inputs(["@" + manifest, os.path.join(self.tmp_dir, "b.docx")])
+        self.assertEqual(len(paths), 2)
+
+    def test_run_reports_failures_without_stopping(self):
+        files = [f"doc_{i}.pdf" for i in range(5)] + ["broken.pdf"]
+        runner = BatchRunner(fake_worker, max_workers=2, max_in_flight=2)
+        results = runner.run(files)
+
+        self.assertEqual(len(results), 6)
+        statuses = {os.path.basename(r["file_path"]): r["status"] for r in results}
+        self.assertEqual(statuses.pop("broken.pdf"), "error")
+        self.assertTrue(all(s == "ok" for s in statuses.values()))
+
+    def test_run_inline(self):
+        runner = BatchRunner(fake_worker, max_workers=1)
+        results = runner.run(["one.pdf", "broken.docx"])
+        self.assertEqual([r["status"] for r in results], ["ok", "error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
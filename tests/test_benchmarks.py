@@ -0,0 +1,38 @@
+import unittest
+import os
+from benchmarks.corpus import generate_corpus
+from benchmarks.run_benchmarks import compare
+from src.loaders.pdf_loader import PDFLoader
+from src.extractors.data_extractor import PDFDataExtractor
+from helpers import TempDirTestCase
+
+
+class TestBenchmarkCorpus(TempDirTestCase):
+
+    def test_generated_pdf_matches_spec(self):
+        corpus = generate_corpus(os.path.join(self.tmp_dir, "corpus"), "small")
+        spec = corpus["spec"]
+        for ext in (".pdf", ".docx", ".pptx"):
+            self.assertTrue(os.path.exists(corpus[ext]))
+
+        pdf_doc = PDFLoader(corpus[".pdf"]).load_file()
+        data = PDFDataExtractor(pdf_doc, corpus[".pdf"]).extract_all()
+        self.assertEqual(len(data["text"]["text"]), spec["pages"])
+        self.assertEqual(len(data["links"]), spec["pages"] * spec["links"])
+        self.assertEqual(len(data["images"]), spec["pages"] * spec["images"])
+        self.assertEqual(len(data["tables"]), spec["pages"] * min(spec["tables"], 1))
+
+
+class TestBenchmarkCompare(unittest.TestCase):
+
+    def test_flags_time_and_memory_regressions(self):
+        baseline = {"results": {"extract.pdf": {"seconds": 1.0, "peak_bytes": 1000}}}
+        within = {"results": {"extract.pdf": {"seconds": 1.1, "peak_bytes": 1100}}}
+        slower = {"results": {"extract.pdf": {"seconds": 2.0, "peak_bytes": 5000}}}
+
+        self.assertEqual(compare(within, baseline), [])
+        self.assertEqual(len(compare(slower, baseline)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
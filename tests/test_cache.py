@@ -0,0 +1,127 @@
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+import fitz
+from main import run_extraction
+from src.cache.extraction_cache import ExtractionCache
+from src.storage.columnar_storage import ColumnarReader, shared_columnar_storage
+from helpers import TempDirTestCase
+
+
+class TestExtractionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.doc_path = os.path.join(self.tmp_dir, "doc.pdf")
+        with open(self.doc_path, "wb") as f:
+            f.write(b"original contents")
+        self.data = {"text": {"text": {1: ["Hello"]}, "metadata": {}}, "links": [],
+                     "images": [], "tables": []}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hit_after_put_and_miss_after_change(self):
+        cache = ExtractionCache(self.cache_dir)
+        self.assertIsNone(cache.get(self.doc_path))
+
+        cache.put(self.doc_path, self.data)
+        self.assertEqual(cache.get(self.doc_path), self.data)
+
+        with open(self.doc_path, "wb") as f:
+            f.write(b"edited contents")
+        self.assertIsNone(cache.get(self.doc_path))
+
+    def test_version_is_part_of_the_key(self):
+        ExtractionCache(self.cache_dir, version="1").put(self.doc_path, self.data)
+        self.assertIsNone(ExtractionCache(self.cache_dir, version="2").get(self.doc_path))
+
+    def test_invalidate_and_clear(self):
+        cache = ExtractionCache(self.cache_dir)
+        cache.put(self.doc_path, self.data)
+        self.assertTrue(cache.invalidate(self.doc_path))
+        self.assertIsNone(cache.get(self.doc_path))
+
+        cache.put(self.doc_path, self.data)
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+
+    def test_unreadable_entries_are_misses(self):
+        cache = ExtractionCache(self.cache_dir)
+        entry_path = cache._entry_path(cache.key_for(self.doc_path))
+        for contents in (b"\x80\x04\x95",                  # truncated
+                         b"cno_such_module\nThing\n.",    # class no longer importable
+                         b"cos\nno_such_attr\n.",         # attribute no longer defined
+                         b"K*."):                        # not an entry at all (42)
+            cache.put(self.doc_path, self.data)
+            with open(entry_path, "wb") as f:
+                f.write(contents)
+            self.assertIsNone(cache.get(self.doc_path))
+            self.assertFalse(os.path.exists(entry_path))
+
+        cache.put(self.doc_path, self.data)
+        self.assertEqual(cache.get(self.doc_path), self.data)
+
+    def test_size_based_eviction(self):
+        cache = ExtractionCache(self.cache_dir)
+        cache.put(self.doc_path, self.data)
+        # Make the first entry the least recently used one
+        os.utime(cache._entry_path(cache.key_for(self.doc_path)), (0, 0))
+
+        # Room for two entries: adding two more evicts the oldest one
+        cache.max_bytes = cache.size() * 2
+        paths = []
+        for i in range(2):
+            path = os.path.join(self.tmp_dir, f"other_{i}.pdf")
+            with open(path, "wb") as f:
+                f.write(f"contents {i}".encode())
+            cache.put(path, self.data)
+            paths.append(path)
+
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+        self.assertIsNone(cache.get(self.doc_path))
+        self.assertIsNotNone(cache.get(paths[-1]))
+
+
+class TestCachedRuns(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        pdf = fitz.open()
+        pdf.new_page().insert_text((72, 72), "Cached page", fontsize=12)
+        pdf.save("doc.pdf")
+        pdf.close()
+        self.cache = ExtractionCache("cache")
+
+    def _font_runs(self):
+        with sqlite3.connect("extracted_data.db") as conn:
+            return conn.execute("SELECT COUNT(*) FROM document_font_runs;").fetchone()[0]
+
+    def test_hit_is_stored_in_sinks_that_lack_it(self):
+        data = run_extraction("doc.pdf", cache=self.cache, sinks=("sql",))
+        # A sink added since, and SQL storage with another font-style mode
+        self.assertEqual(run_extraction("doc.pdf", cache=self.cache, sinks=("sql",),
+                                        columnar_dir="columnar", font_style_mode="runs"), data)
+        shared_columnar_storage("columnar", font_style_mode="runs").flush()
+        self.assertEqual([row["content"] for row in ColumnarReader("columnar").scan("text")],
+                         ["Cached page"])
+        self.assertEqual(self._font_runs(), 1)
+
+        # Every target holds it now: nothing is stored again
+        run_extraction("doc.pdf", cache=self.cache, sinks=("sql",),
+                       columnar_dir="columnar", font_style_mode="runs")
+        shared_columnar_storage("columnar", font_style_mode="runs").flush()
+        self.assertEqual(len(list(ColumnarReader("columnar").scan("text"))), 1)
+
+    def test_extraction_options_have_their_own_entries(self):
+        run_extraction("doc.pdf", cache=self.cache, sinks=("sql",))
+        self.assertIsNone(self.cache.get("doc.pdf", "all-tables"))
+        run_extraction("doc.pdf", cache=self.cache, sinks=("sql",), all_tables=True)
+        self.assertIsNotNone(self.cache.get("doc.pdf", "all-tables"))
+
+
+if __name__ == "__main__":
+    unittest.main()
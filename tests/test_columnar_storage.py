@@ -0,0 +1,96 @@
+import unittest
+import os
+import shutil
+import tempfile
+from src.extractors.font_styles import FontStyleColumns
+from src.storage.columnar_storage import ColumnarReader, ColumnarStorage, _have_pyarrow
+
+
+def _document(pages, url="https://example.com/a"):
+    styles = FontStyleColumns()
+    for page in pages:
+        styles.append(page, f"Text {page}", "Helvetica", 11.0)
+    return {
+        "text": {
+            "text": {page: [f"Text {page}"] for page in pages},
+            "metadata": {"headings": {pages[0]: ["Title"]}, "font_styles": styles}
+        },
+        "links": [{"page_number": pages[0], "url": url, "text": "a link"}],
+        "images": [],
+        "tables": [{"page_number": pages[-1], "table_data": [["a", "b"]], "table_path": "t.csv"}]
+    }
+
+
+class TestColumnarStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _parts(self, dataset):
+        return [name for name in os.listdir(os.path.join(self.root, dataset))
+                if name.startswith("part-")]
+
+    def test_documents_are_batched_into_one_part(self):
+        with ColumnarStorage(self.root, fmt="columns") as storage:
+            storage.save(_document([1, 2]), "first")
+            storage.save(_document([1, 2, 3], url="https://docs.python.org/x"), "second")
+            self.assertFalse(os.path.exists(os.path.join(self.root, "text")))
+
+        self.assertEqual(len(self._parts("text")), 1)
+        reader = ColumnarReader(self.root)
+        rows = list(reader.scan("text", columns=["document", "page_number"]))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(set(rows[0]), {"document", "page_number"})
+
+        links = list(reader.scan("links", columns=["document"],
+                                 filters=[("domain", "==", "docs.python.org")]))
+        self.assertEqual(links, [{"document": "second"}])
+        fonts = list(reader.scan("font_styles", filters=[("document", "in", ["first"]),
+                                                          ("page_number", ">", 1)]))
+        self.assertEqual([(r["page_number"], r["font"], r["size"]) for r in fonts],
+                         [(2, "Helvetica", 11.0)])
+
+    def test_flush_threshold_and_stats_pruning(self):
+        storage = ColumnarStorage(self.root, fmt="columns", flush_rows=1)
+        storage.save(_document([1]), "early")
+        storage.save(_document([7, 8]), "late")
+        storage.close()
+        self.assertEqual(len(self._parts("text")), 2)
+
+        # The "early" part's page_number stats (1..1) rule it out, so its
+        # column files are never opened
+        early = sorted(self._parts("text"))[0]
+        for name in os.listdir(os.path.join(self.root, "text", early)):
+            if name.endswith(".json.gz"):
+                os.remove(os.path.join(self.root, "text", early, name))
+
+        rows = list(ColumnarReader(self.root).scan("text", columns=["document"],
+                                                   filters=[("page_number", ">=", 7)]))
+        self.assertEqual(rows, [{"document": "late"}, {"document": "late"}])
+
+    def test_runs_mode_writes_font_runs(self):
+        with ColumnarStorage(self.root, fmt="columns", font_style_mode="runs") as storage:
+            storage.save(_document([1]), "doc")
+        runs = list(ColumnarReader(self.root).scan("font_runs"))
+        self.assertEqual(runs[0]["span_count"], 1)
+
+    def test_rejects_unknown_format_and_operator(self):
+        with self.assertRaises(ValueError):
+            ColumnarStorage(self.root, fmt="orc")
+        with self.assertRaises(ValueError):
+            list(ColumnarReader(self.root).scan("text", filters=[("page_number", "~", 1)]))
+
+    @unittest.skipUnless(_have_pyarrow(), "pyarrow is not installed")
+    def test_parquet_round_trip(self):
+        with ColumnarStorage(self.root, fmt="parquet") as storage:
+            storage.save(_document([1, 2]), "doc")
+        rows = list(ColumnarReader(self.root).scan("text", columns=["page_number"],
+                                                   filters=[("page_number", "==", 2)]))
+        self.assertEqual(rows, [{"page_number": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()
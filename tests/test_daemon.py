@@ -0,0 +1,116 @@
+import unittest
+import os
+import time
+import signal
+import sqlite3
+import fitz
+from main import main
+from src.service.daemon import (ExtractionDaemon, QueueFull, send_request, _init_worker,
+                                _worker_state)
+from helpers import TempDirTestCase
+
+
+def _make_pdf(path: str, text: str):
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), text, fontsize=12)
+    pdf.save(path)
+    pdf.close()
+
+
+class TestExtractionDaemon(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.socket_path = os.path.join(self.tmp_dir, "daemon.sock")
+        self.spool_dir = os.path.join(self.tmp_dir, "spool")
+        self.pdf_path = os.path.join(self.tmp_dir, "job.pdf")
+        _make_pdf(self.pdf_path, "Daemon job")
+
+    def _wait_for(self, daemon, job_id, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = daemon.status(job_id)
+            if job["status"] in ("ok", "error"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"job {job_id} did not finish")
+
+    def test_socket_and_spool_jobs_are_stored(self):
+        daemon = ExtractionDaemon(socket_path=self.socket_path, spool_dir=self.spool_dir,
+                                  workers=1, poll_interval=0.05,
+                                  db_path=os.path.join(self.tmp_dir, "daemon.db"))
+        daemon.start()
+        try:
+            reply = send_request(self.socket_path, {"op": "submit", "path": self.pdf_path})
+            self.assertEqual(reply["status"], "queued")
+            self.assertEqual(self._wait_for(daemon, reply["job_id"])["status"], "ok")
+
+            status = send_request(self.socket_path, {"op": "status", "job_id": reply["job_id"]})
+            self.assertEqual(status["status"], "ok")
+            self.assertIn("error", send_request(self.socket_path,
+                                                {"op": "submit", "path": "missing.pdf"}))
+            self.assertEqual(main(["--submit", "--socket", self.socket_path, self.pdf_path]), 0)
+            self.assertEqual(main(["--submit", "--socket", self.socket_path, "missing.pdf"]), 1)
+
+            _make_pdf(os.path.join(self.spool_dir, "spooled.pdf"), "Spooled job")
+            done_path = os.path.join(self.spool_dir, "done", "spooled.pdf")
+            deadline = time.time() + 30
+            while not os.path.exists(done_path) and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertTrue(os.path.exists(done_path))
+        finally:
+            daemon.shutdown()
+
+        self.assertFalse(os.path.exists(self.socket_path))
+        with sqlite3.connect(os.path.join(self.tmp_dir, "daemon.db")) as conn:
+            names = sorted(row[0] for row in conn.execute("SELECT file_name FROM documents;"))
+        self.assertEqual(names, ["job", "spooled"])
+
+    def test_full_queue_rejects_and_shutdown_drains(self):
+        daemon = ExtractionDaemon(socket_path=self.socket_path, workers=1, max_queue=1,
+                                  db_path=os.path.join(self.tmp_dir, "daemon.db"))
+        # Not started yet, so nothing leaves the queue
+        first = daemon.submit(self.pdf_path)
+        with self.assertRaises(QueueFull):
+            daemon.submit(self.pdf_path)
+        self.assertEqual(daemon.handle_request({"op": "submit", "path": self.pdf_path})["retry"], True)
+
+        daemon.start()
+        daemon.shutdown()
+        self.assertEqual(daemon.status(first["job_id"])["status"], "ok")
+        with self.assertRaises(ValueError):
+            daemon.submit(self.pdf_path)
+
+    def test_dead_worker_fails_one_job_and_the_pool_is_replaced(self):
+        daemon = ExtractionDaemon(socket_path=self.socket_path, workers=1,
+                                  db_path=os.path.join(self.tmp_dir, "daemon.db"))
+        daemon.start()
+        try:
+            self.assertEqual(self._wait_for(daemon, daemon.submit(self.pdf_path)["job_id"])["status"],
+                             "ok")
+            pool = daemon._executor
+            for pid in list(pool._processes):
+                os.kill(pid, signal.SIGKILL)
+            deadline = time.time() + 30
+            while not pool._broken and time.time() < deadline:
+                time.sleep(0.05)
+
+            failed = self._wait_for(daemon, daemon.submit(self.pdf_path)["job_id"])
+            self.assertEqual(failed["status"], "error")
+            self.assertIn("BrokenProcessPool", failed["error"])
+            self.assertEqual(self._wait_for(daemon, daemon.submit(self.pdf_path)["job_id"])["status"],
+                             "ok")
+        finally:
+            daemon.shutdown()
+
+    def test_workers_use_the_cache_size_limit(self):
+        daemon = ExtractionDaemon(spool_dir=self.spool_dir, cache_dir="cache",
+                                  cache_max_bytes=4096, sinks=("file",))
+        # The pool initializer, run in this process
+        self.addCleanup(_worker_state.clear)
+        _init_worker(daemon.worker_options)
+        self.assertEqual(_worker_state["cache"].max_bytes, 4096)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import io
+import os
+import fitz
+from docx import Document
+from pptx import Presentation
+from src.cache.extraction_cache import content_hash
+from src.extractors.data_extractor import PDFDataExtractor
+from src.loaders.document_source import DocumentSource
+from src.loaders.docx_loader import DOCXLoader
+from src.loaders.pdf_loader import PDFLoader
+from src.loaders.ppt_loader import PPTLoader
+from helpers import TempDirTestCase
+
+
+def _ruled_table_pdf(path: str):
+    pdf = fitz.open()
+    page = pdf.new_page()
+    for i in range(3):
+        page.draw_line((72, 72 + 20 * i), (272, 72 + 20 * i))
+    for x in (72, 172, 272):
+        page.draw_line((x, 72), (x, 112))
+    page.insert_text((80, 87), "a", fontsize=10)
+    page.insert_text((180, 87), "b", fontsize=10)
+    page.insert_text((80, 107), "1", fontsize=10)
+    page.insert_text((180, 107), "2", fontsize=10)
+    pdf.save(path)
+    pdf.close()
+
+
+class TestDocumentSource(TempDirTestCase):
+
+    def test_reader_is_independent_and_seekable(self):
+        source = DocumentSource.from_bytes(b"0123456789", "digits.bin")
+        first, second = source.reader(), source.reader()
+        self.assertEqual(first.read(4), b"0123")
+        self.assertEqual(second.read(2), b"01")
+        first.seek(-3, io.SEEK_END)
+        self.assertEqual(first.read(), b"789")
+        self.assertEqual(first.read(5), b"")
+        buf = bytearray(3)
+        self.assertEqual(second.readinto(buf), 3)
+        self.assertEqual(bytes(buf), b"234")
+
+    def test_loaders_open_in_memory_documents(self):
+        docx_buf = io.BytesIO()
+        doc = Document()
+        doc.add_paragraph("Hello from memory")
+        doc.save(docx_buf)
+        pptx_buf = io.BytesIO()
+        Presentation().save(pptx_buf)
+        pdf = fitz.open()
+        pdf.new_page()
+        pdf_bytes = pdf.tobytes()
+
+        docx_doc = DOCXLoader(DocumentSource.from_bytes(docx_buf.getvalue(), "memo.docx")).load_file()
+        self.assertEqual(docx_doc.paragraphs[0].text, "Hello from memory")
+        self.assertIsNotNone(PPTLoader(DocumentSource.from_bytes(pptx_buf.getvalue(), "deck.pptx")).load_file())
+        self.assertEqual(len(PDFLoader(DocumentSource.from_bytes(pdf_bytes, "doc.pdf")).load_file()), 1)
+
+        empty = PDFLoader(DocumentSource.from_bytes(b"", "empty.pdf"))
+        self.assertFalse(empty.validate_file())
+        with self.assertRaises(FileNotFoundError):
+            empty.load_file()
+
+    def test_pdf_tables_read_the_shared_buffer(self):
+        _ruled_table_pdf("tables.pdf")
+        loader = PDFLoader("tables.pdf")
+        pdf_doc = loader.load_file()
+        self.assertEqual(content_hash(loader.source), content_hash("tables.pdf"))
+
+        # The file is gone, so pdfplumber can only be reading the mapped buffer
+        os.remove("tables.pdf")
+        extractor = PDFDataExtractor(pdf_doc, "tables.pdf", source=loader.source)
+        tables = extractor.extract_tables()
+        self.assertEqual(tables[0]["table_data"], [["a", "b"], ["1", "2"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
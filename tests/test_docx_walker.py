@@ -0,0 +1,149 @@
+import unittest
+import io
+import os
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.enum.section import WD_SECTION
+from docx.shared import Inches, Pt
+from PIL import Image
+from src.extractors.data_extractor import DOCXDataExtractor
+from src.extractors.docx_walker import DocxParagraph, DocxRun, DocxTable
+from src.loaders.docx_loader import DOCXPackageLoader
+from helpers import TempDirTestCase
+
+
+def _add_hyperlink(paragraph, url: str, text: str):
+    r_id = paragraph.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    link = OxmlElement("w:hyperlink")
+    link.set(qn("r:id"), r_id)
+    run = OxmlElement("w:r")
+    t = OxmlElement("w:t")
+    t.text = text
+    run.append(t)
+    link.append(run)
+    paragraph._p.append(link)
+
+
+def _contract(path: str):
+    doc = Document()
+    doc.add_heading("Agreement", level=1)
+    para = doc.add_paragraph("Read ")
+    _add_hyperlink(para, "https://example.com/terms", "the terms")
+    tail = para.add_run(" first.")
+    tail.font.name = "Arial"
+    tail.font.size = Pt(9)
+
+    table = doc.add_table(rows=2, cols=2)
+    for i in range(2):
+        for j in range(2):
+            table.cell(i, j).text = f"{i}{j}"
+    table.cell(0, 0).merge(table.cell(0, 1))
+    _add_hyperlink(table.cell(1, 1).paragraphs[0], "https://example.com/annex", "annex")
+
+    png = io.BytesIO()
+    Image.new("RGB", (4, 4), (0, 0, 255)).save(png, "PNG")
+    doc.add_picture(io.BytesIO(png.getvalue()), width=Inches(1))
+    doc.add_picture(io.BytesIO(png.getvalue()), width=Inches(1))
+    doc.save(path)
+
+
+class TestDocxWalker(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        _contract("contract.docx")
+
+    def test_body_in_document_order(self):
+        package = DOCXPackageLoader("contract.docx").load_file()
+        items = list(package.walk())
+
+        self.assertEqual([type(item) for item in items],
+                         [DocxParagraph, DocxParagraph, DocxTable, DocxParagraph, DocxParagraph])
+        heading, para, table = items[:3]
+        self.assertEqual((heading.text, heading.style), ("Agreement", "Heading 1"))
+        self.assertTrue(heading.runs[0].bold)
+        # Runs carry their resolved font and size: theme font at the 11pt default, or direct formatting
+        self.assertEqual(para.runs[0], DocxRun("Read ", "Cambria", 11.0, False))
+        self.assertEqual(para.runs[-1], DocxRun(" first.", "Arial", 9.0, False))
+        self.assertEqual(para.text, "Read the terms first.")
+        self.assertEqual(para.links, [("https://example.com/terms", "the terms")])
+        self.assertEqual(table.rows, [["00\n01", "00\n01"], ["10", "11annex"]])
+        self.assertEqual(table.links, [("https://example.com/annex", "annex")])
+        self.assertEqual(items[3].images, items[4].images)
+
+    def test_extractor_matches_python_docx_text(self):
+        data = DOCXDataExtractor(DOCXPackageLoader("contract.docx").load_file(), "contract.docx").extract_all()
+
+        self.assertEqual(data["text"]["text"], {1: ["Agreement", "Read the terms first."]})
+        self.assertEqual(data["text"]["metadata"]["headings"], {1: ["Agreement"]})
+        self.assertEqual([link["url"] for link in data["links"]],
+                         ["https://example.com/terms", "https://example.com/annex"])
+        self.assertEqual(len(data["images"]), 1)         # one picture, placed twice
+        self.assertTrue(os.path.exists(data["images"][0]["image_path"]))
+        self.assertEqual(data["tables"][0]["table_data"][1], ["10", "11annex"])
+
+        # A python-docx Document is still accepted and gives the same result
+        legacy = DOCXDataExtractor(Document("contract.docx"), "contract.docx").extract_text()
+        self.assertEqual(legacy["text"], data["text"]["text"])
+
+    def test_fingerprint_follows_body_changes(self):
+        before = DOCXDataExtractor(DOCXPackageLoader("contract.docx").load_file(),
+                                   "contract.docx").page_fingerprints()
+        doc = Document("contract.docx")
+        doc.add_paragraph("Appendix")
+        doc.save("contract_v2.docx")
+        after = DOCXDataExtractor(DOCXPackageLoader("contract_v2.docx").load_file(),
+                                  "contract.docx").page_fingerprints()
+        self.assertNotEqual(before, after)
+
+
+class TestDocxPagination(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        doc = Document()
+        doc.add_heading("Intro", level=1)
+        doc.add_paragraph("Page one")
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = "first"
+        doc.add_page_break()
+        second = doc.add_paragraph("Page two")
+        # Word marks where its last layout started a page; after the explicit
+        # break above this is the same page break
+        second.runs[0]._r.insert(0, OxmlElement("w:lastRenderedPageBreak"))
+        doc.add_section(WD_SECTION.NEW_PAGE)
+        wrapped = doc.add_paragraph("Page three")
+        wrapped.runs[0]._r.append(OxmlElement("w:lastRenderedPageBreak"))
+        wrapped.add_run(" running onto four")
+        _add_hyperlink(doc.add_paragraph("Page four "), "https://example.com/four", "link")
+        doc.add_paragraph("Page five").paragraph_format.page_break_before = True
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = "cell"
+        doc.save("paged.docx")
+        self.extractor = DOCXDataExtractor(DOCXPackageLoader("paged.docx").load_file(), "paged.docx")
+
+    def test_content_lands_on_its_page(self):
+        data = self.extractor.extract_all()
+        self.assertEqual(data["text"]["text"], {
+            1: ["Intro", "Page one"],
+            2: ["Page two"],
+            3: ["Page three running onto four"],
+            4: ["Page four link"],
+            5: ["Page five"],
+        })
+        self.assertEqual(data["text"]["metadata"]["headings"], {1: ["Intro"]})
+        self.assertEqual([link["page_number"] for link in data["links"]], [4])
+        self.assertEqual([table["page_number"] for table in data["tables"]], [1, 5])
+
+    def test_selected_pages(self):
+        self.assertEqual(sorted(self.extractor.page_fingerprints()), [1, 2, 3, 4, 5])
+        records = list(self.extractor.iter_pages(page_numbers=[2, 5]))
+        self.assertEqual([(r["page_number"], r["text"]) for r in records],
+                         [(2, ["Page two"]), (5, ["Page five"])])
+        # Table numbering counts the tables on skipped pages too
+        self.assertEqual(records[1]["tables"][0]["table_index"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
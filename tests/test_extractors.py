@@ -1,5 +1,10 @@
 import unittest
 import os
+import io
+import fitz
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
 from src.loaders.pdf_loader import PDFLoader
 from src.loaders.docx_loader import DOCXLoader
 from src.loaders.ppt_loader import PPTLoader
@@ -9,6 +14,8 @@ from src.extractors.data_extractor import (
     DOCXDataExtractor,
     PPTDataExtractor
 )
+from src.extractors.page_records import merge_page_records
+from helpers import TempDirTestCase
 
 class TestExtractors(unittest.TestCase):
 
@@ -53,5 +60,193 @@ class TestExtractors(unittest.TestCase):
         self.assertIsInstance(links, list)
 
 
+class TestPDFSinglePass(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        png = io.BytesIO()
+        Image.new("RGB", (8, 8), (200, 0, 0)).save(png, "PNG")
+
+        doc = fitz.open()
+        for i in range(3):
+            page = doc.new_page()
+            # Same logo on every page
+            page.insert_image(fitz.Rect(300, 300, 340, 340), stream=png.getvalue())
+            page.insert_text((72, 72), f"Heading {i}", fontsize=18)
+            page.insert_text((72, 120), f"Body of page {i}", fontsize=11)
+            page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 60, 200, 80),
+                              "uri": f"https://example.com/{i}"})
+        doc.save("generated.pdf")
+        doc.close()
+
+        self.pdf_doc = PDFLoader("generated.pdf").load_file()
+        self.extractor = PDFDataExtractor(self.pdf_doc, "generated.pdf")
+
+    def tearDown(self):
+        self.pdf_doc.close()
+
+    def test_extract_all_matches_individual_calls(self):
+        expected = {
+            "text": self.extractor.extract_text(),
+            "links": self.extractor.extract_links(),
+            "images": self.extractor.extract_images(),
+            "tables": self.extractor.extract_tables()
+        }
+        self.assertEqual(self.extractor.extract_all(), expected)
+        self.assertEqual(expected["text"]["metadata"]["headings"][2], ["Heading 1"])
+        self.assertEqual(len(expected["links"]), 3)
+
+    def test_page_parallel_matches_serial(self):
+        serial = self.extractor.extract_all()
+        parallel = PDFDataExtractor(self.pdf_doc, "generated.pdf", workers=2, chunk_size=1)
+        self.assertEqual(parallel.extract_all(), serial)
+        self.assertEqual(parallel.extract_text(), serial["text"])
+
+    def test_shared_image_is_stored_once(self):
+        images = self.extractor.extract_images()
+        self.assertEqual([img["page_number"] for img in images], [1, 2, 3])
+        self.assertEqual(len({img["image_path"] for img in images}), 1)
+        self.assertTrue(os.path.isfile(images[0]["image_path"]))
+        self.assertEqual(len(os.listdir(os.path.join("output", "generated", "images"))), 1)
+
+    def test_iter_pages_yields_one_record_per_page(self):
+        records = list(self.extractor.iter_pages())
+        self.assertEqual([r["page_number"] for r in records], [1, 2, 3])
+        self.assertEqual(merge_page_records(records), self.extractor.extract_all())
+
+
+class TestPDFTables(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "No tables here")
+        page = doc.new_page()
+        # Two ruled 2x2 tables on one page
+        for top in (100, 400):
+            for r in range(3):
+                page.draw_line((72, top + r * 30), (312, top + r * 30))
+            for c in range(3):
+                page.draw_line((72 + c * 120, top), (72 + c * 120, top + 60))
+            for r in range(2):
+                for c in range(2):
+                    page.insert_text((80 + c * 120, top + 20 + r * 30), f"r{r}c{c}")
+        doc.save("tables.pdf")
+        doc.close()
+        self.pdf_doc = PDFLoader("tables.pdf").load_file()
+
+    def tearDown(self):
+        self.pdf_doc.close()
+
+    def test_prefilter_skips_pages_without_rulings(self):
+        self.assertFalse(PDFDataExtractor._has_ruling_lines(self.pdf_doc[0]))
+        self.assertTrue(PDFDataExtractor._has_ruling_lines(self.pdf_doc[1]))
+
+        auto = PDFDataExtractor(self.pdf_doc, "tables.pdf").extract_tables()
+        every = PDFDataExtractor(self.pdf_doc, "tables.pdf", table_detection="all").extract_tables()
+        self.assertEqual(auto, every)
+        self.assertEqual(len(auto), 1)
+        self.assertEqual(auto[0]["table_data"], [["r0c0", "r0c1"], ["r1c0", "r1c1"]])
+
+    def test_all_tables_on_a_page(self):
+        for mode in ("auto", "fitz"):
+            extractor = PDFDataExtractor(self.pdf_doc, "tables.pdf", table_detection=mode,
+                                         all_tables=True)
+            tables = extractor.extract_tables()
+            self.assertEqual([t["table_index"] for t in tables], [0, 1])
+            self.assertTrue(all(t["page_number"] == 2 for t in tables))
+            self.assertTrue(os.path.isfile(tables[1]["table_path"]))
+
+
+class TestPPTImages(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        jpeg = io.BytesIO()
+        Image.new("RGB", (8, 8), (0, 0, 200)).save(jpeg, "JPEG")
+        prs = Presentation()
+        for _ in range(2):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            slide.shapes.add_picture(io.BytesIO(jpeg.getvalue()), Inches(1), Inches(1))
+        prs.save("deck.pptx")
+        self.ppt_doc = PPTLoader("deck.pptx").load_file()
+
+    def test_reencodes_to_png_once(self):
+        images = PPTDataExtractor(self.ppt_doc, "deck.pptx").extract_images()
+        self.assertEqual(len(images), 2)
+        self.assertEqual(images[0]["image_path"], images[1]["image_path"])
+        self.assertTrue(images[0]["image_path"].endswith(".png"))
+        self.assertTrue(os.path.isfile(images[0]["image_path"]))
+
+    def test_keep_original_encoding(self):
+        extractor = PPTDataExtractor(self.ppt_doc, "deck.pptx", keep_original_encoding=True)
+        images = extractor.extract_images()
+        self.assertTrue(images[0]["image_path"].endswith((".jpg", ".jpeg")))
+        self.assertEqual(len(os.listdir(os.path.join("output", "deck", "images"))), 1)
+
+    def test_images_that_fail_to_write_are_dropped(self):
+        # PNG cannot hold CMYK, so the background re-encode fails
+        cmyk = io.BytesIO()
+        Image.new("CMYK", (8, 8), (0, 0, 200, 0)).save(cmyk, "JPEG")
+        prs = Presentation()
+        for _ in range(2):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            slide.shapes.add_picture(io.BytesIO(cmyk.getvalue()), Inches(1), Inches(1))
+        prs.save("cmyk.pptx")
+        ppt_doc = PPTLoader("cmyk.pptx").load_file()
+
+        records = list(PPTDataExtractor(ppt_doc, "cmyk.pptx").iter_pages())
+        self.assertEqual([record["images"] for record in records], [[], []])
+        self.assertEqual(PPTDataExtractor(ppt_doc, "cmyk.pptx").extract_all()["images"], [])
+
+
+class TestPPTSlideWalker(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        png = io.BytesIO()
+        Image.new("RGB", (8, 8), (0, 200, 0)).save(png, "PNG")
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = "Roadmap"
+        box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(4), Inches(1))
+        box.click_action.hyperlink.address = "https://example.com/box"
+        run = box.text_frame.paragraphs[0].add_run()
+        run.text = "Details"
+        run.hyperlink.address = "https://example.com/run"
+        # A group holding a picture, a table and a nested group with text
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_picture(io.BytesIO(png.getvalue()), Inches(5), Inches(1))
+        frame = slide.shapes.add_table(1, 2, Inches(5), Inches(3), Inches(2), Inches(1))
+        frame.table.cell(0, 0).text, frame.table.cell(0, 1).text = "Q1", "Q2"
+        group._element.append(frame._element)   # GroupShapes has no add_table()
+        inner = group.shapes.add_group_shape()
+        inner.shapes.add_textbox(Inches(1), Inches(5), Inches(2), Inches(1)).text_frame.text = "Grouped note"
+        second = prs.slides.add_slide(prs.slide_layouts[6])
+        second.shapes.add_table(1, 1, Inches(1), Inches(1), Inches(1), Inches(1)).table.cell(0, 0).text = "x"
+        prs.save("deck.pptx")
+        self.extractor = PPTDataExtractor(PPTLoader("deck.pptx").load_file(), "deck.pptx")
+
+    def test_one_visit_collects_grouped_shapes(self):
+        data = self.extractor.extract_all()
+        self.assertEqual(data["text"]["text"][1], ["Roadmap", "Roadmap", "Details", "Grouped note"])
+        self.assertEqual(data["text"]["metadata"]["headings"], {1: ["Roadmap"]})
+        self.assertEqual([(link["url"], link["text"]) for link in data["links"]],
+                         [("https://example.com/box", "Details"), ("https://example.com/run", "Details")])
+        self.assertEqual(len(data["images"]), 1)
+        self.assertEqual([t["table_data"] for t in data["tables"]], [[["Q1", "Q2"]], [["x"]]])
+        self.assertEqual(data["tables"][1]["table_path"], os.path.join("output/tables/deck", "slide_2_table_1.csv"))
+
+    def test_skipped_slides_keep_table_numbers(self):
+        records = list(self.extractor.iter_pages(page_numbers=[2]))
+        self.assertEqual([r["page_number"] for r in records], [2])
+        self.assertTrue(records[0]["tables"][0]["table_path"].endswith("slide_2_table_1.csv"))
+        self.assertEqual(merge_page_records(records)["tables"], records[0]["tables"])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import unittest
+import pickle
+from src.extractors.font_styles import FontStyleColumns, font_style_runs
+
+
+class TestFontStyleColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.dicts = [
+            {"page_number": 1, "text": "Title", "font": "Arial-Bold", "size": 18.0},
+            {"page_number": 1, "text": "Body", "font": "Arial", "size": 11.0},
+            {"page_number": 1, "text": "more", "font": "Arial", "size": 11.0},
+            {"page_number": 2, "text": "Next", "font": "Arial", "size": 11.0}
+        ]
+
+    def test_behaves_like_list_of_dicts(self):
+        columns = FontStyleColumns(self.dicts)
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns, self.dicts)
+        self.assertEqual(columns[1]["font"], "Arial")
+        self.assertEqual([fs.get("text") for fs in columns], ["Title", "Body", "more", "Next"])
+        # Font names are stored once
+        self.assertEqual(columns.fonts, ["Arial-Bold", "Arial"])
+
+    def test_extend_remaps_font_ids(self):
+        first = FontStyleColumns(self.dicts[1:2])
+        second = FontStyleColumns(self.dicts[:1])
+        first.extend(second)
+        self.assertEqual(first, [self.dicts[1], self.dicts[0]])
+
+    def test_runs(self):
+        runs = list(font_style_runs(self.dicts))
+        self.assertEqual(runs, [
+            (1, "Arial-Bold", 18.0, 1, 5),
+            (1, "Arial", 11.0, 2, 8),
+            (2, "Arial", 11.0, 1, 4)
+        ])
+
+    def test_pickle_round_trip(self):
+        columns = pickle.loads(pickle.dumps(FontStyleColumns(self.dicts)))
+        self.assertEqual(columns, self.dicts)
+        columns.append(3, "x", "Arial", 11.0)
+        self.assertEqual(columns.fonts, ["Arial-Bold", "Arial"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import sys
+import json
+import subprocess
+from src.formats.registry import DocumentFormat, get_format, is_supported, supported_extensions
+
+
+class TestFormatRegistry(unittest.TestCase):
+
+    def test_lookup_by_extension(self):
+        self.assertEqual(get_format("report.PDF").name, "pdf")
+        self.assertEqual(get_format("notes.docx").name, "docx")
+        self.assertEqual(get_format("deck.pptx").name, "pptx")
+        self.assertEqual(set(supported_extensions()), {".pdf", ".docx", ".pptx"})
+        self.assertFalse(is_supported("notes.txt"))
+        with self.assertRaises(ValueError):
+            get_format("notes.txt")
+
+    def test_only_declared_options_reach_the_extractor(self):
+        fmt = DocumentFormat("fake", [".fake"], loader="collections:OrderedDict",
+                             extractor="collections:namedtuple",
+                             options={"keep_image_encoding": "rename"})
+        captured = {}
+        fmt.extractor_class = lambda: (lambda doc, path, **kwargs: captured.update(kwargs))
+
+        fmt.create_extractor(None, "a.fake", keep_image_encoding=True, page_workers=4,
+                             metrics=None)
+        self.assertEqual(captured, {"rename": True})
+
+    def test_cli_import_does_not_load_format_backends(self):
+        code = ("import sys, json, main; "
+                "print(json.dumps([m for m in ('fitz', 'pdfplumber', 'docx', 'pptx', 'PIL', 'numpy') "
+                "if m in sys.modules]))")
+        output = subprocess.run([sys.executable, "-c", code], check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(json.loads(output.strip().splitlines()[-1]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
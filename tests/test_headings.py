@@ -0,0 +1,122 @@
+import unittest
+import sqlite3
+import fitz
+from docx import Document
+from docx.shared import Pt
+from main import run_extraction
+from src.extractors.data_extractor import PDFDataExtractor
+from src.extractors.font_styles import FontStyleColumns
+from src.extractors.headings import HeadingClassifier, is_bold_font
+from helpers import TempDirTestCase
+
+
+def _columns(spans):
+    columns = FontStyleColumns()
+    for page, text, font, size in spans:
+        columns.append(page, text, font, size)
+    return columns
+
+
+class TestHeadingClassifier(unittest.TestCase):
+
+    def test_levels_follow_relative_size_and_boldness(self):
+        body = "Body text that carries most of the characters on the page. " * 3
+        columns = _columns([
+            (1, "Report", "Helvetica", 16.0),           # 2x body -> H1
+            (1, "Overview", "Helvetica", 11.0),         # 1.375x  -> H2
+            (1, "Details", "Helvetica-Bold", 8.0),      # bold at body size -> H3
+            (1, body, "Helvetica", 8.0),
+            (1, "emphasis", "Helvetica", 8.0),
+        ])
+        headings, levels = HeadingClassifier(prior_chars=0).headings(columns)
+        self.assertEqual(list(zip(headings, levels)),
+                         [("Report", 1), ("Overview", 2), ("Details", 3)])
+
+    def test_statistics_carry_across_pages(self):
+        classifier = HeadingClassifier()
+        # A title page alone is judged against the prior body size
+        self.assertEqual(classifier.headings(_columns([(1, "Annual Report", "Times", 28.0)])),
+                         (["Annual Report"], [1]))
+        classifier.headings(_columns([(2, "x" * 2000, "Times", 14.0)]))
+        self.assertEqual(classifier.body_size, 14.0)
+        # 16pt is no longer a heading once the body turns out to be 14pt
+        self.assertEqual(classifier.headings(_columns([(3, "Aside", "Times", 16.0)])), ([], []))
+
+    def test_bold_font_names(self):
+        self.assertTrue(is_bold_font("Arial,Bold"))
+        self.assertTrue(is_bold_font("Roboto-SemiBold"))
+        self.assertFalse(is_bold_font("Helvetica-Oblique"))
+
+
+class TestHeadingExtraction(TempDirTestCase):
+
+    def _headings(self):
+        with sqlite3.connect("extracted_data.db") as conn:
+            return conn.execute("SELECT heading, level FROM document_headings ORDER BY id;").fetchall()
+
+    def test_small_print_pdf(self):
+        # Body at 7pt: the old fixed 14pt threshold found no headings here
+        pdf = fitz.open()
+        page = pdf.new_page()
+        page.insert_text((72, 72), "Terms", fontsize=12)
+        page.insert_text((72, 100), "Scope", fontsize=7, fontname="hebo")
+        for i in range(20):
+            page.insert_text((72, 120 + 9 * i), "The parties agree to the following terms.", fontsize=7)
+        pdf.save("terms.pdf")
+        pdf.close()
+
+        run_extraction("terms.pdf", sinks=("sql",))
+        self.assertEqual(self._headings(), [("Terms", 1), ("Scope", 3)])
+
+    def test_pdf_headings_use_whole_document_statistics(self):
+        # 14pt body: judged against an 11pt prior, page 1's body lines looked like headings
+        pdf = fitz.open()
+        for page_num in range(1, 4):
+            page = pdf.new_page()
+            page.insert_text((72, 60), f"Part {page_num}", fontsize=24)
+            for i in range(6):
+                page.insert_text((72, 100 + 20 * i), f"Body line {i} of the agreement text.",
+                                 fontsize=14)
+        page.insert_text((72, 300), "Short eleven point line", fontsize=11)
+        pdf.save("report.pdf")
+        pdf.close()
+
+        full = PDFDataExtractor(fitz.open("report.pdf"), "report.pdf").extract_text()
+        self.assertEqual(full["metadata"]["headings"],
+                         {1: ["Part 1"], 2: ["Part 2"], 3: ["Part 3"]})
+        # A page extracted on its own (incremental runs) gets the same headings
+        record, = PDFDataExtractor(fitz.open("report.pdf"), "report.pdf").iter_pages(
+            sections={"text"}, page_numbers=[3])
+        self.assertEqual(record["headings"], ["Part 3"])
+
+    def test_docx_headings_use_whole_document_statistics(self):
+        # 14pt body: page 1 alone, judged against an 11pt prior, looked like headings
+        doc = Document()
+        doc.styles["Normal"].font.size = Pt(14)
+        for i in range(6):
+            doc.add_paragraph(f"Opening paragraph {i} of the agreement.")
+        doc.add_page_break()
+        for i in range(40):
+            doc.add_paragraph(f"Paragraph {i} of the terms and conditions.")
+        doc.save("large_print.docx")
+
+        run_extraction("large_print.docx", sinks=("sql",))
+        self.assertEqual(self._headings(), [])
+
+    def test_docx_styles_and_formatting(self):
+        doc = Document()
+        doc.add_heading("Contract", level=0)
+        doc.add_heading("Parties", level=2)
+        doc.add_paragraph().add_run("Payment").bold = True
+        big = doc.add_paragraph().add_run("Schedule A")
+        big.font.size = Pt(20)
+        doc.add_paragraph("Ordinary paragraph text that is long enough to be body copy.")
+        doc.save("contract.docx")
+
+        run_extraction("contract.docx", sinks=("sql",))
+        self.assertEqual(self._headings(),
+                         [("Contract", 1), ("Parties", 2), ("Payment", 3), ("Schedule A", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import sqlite3
+import fitz
+from docx import Document
+from pptx import Presentation
+from pptx.util import Inches
+from main import run_extraction
+from src.extractors.data_extractor import _page_runs
+from helpers import TempDirTestCase
+
+
+def _make_deck(path: str, titles):
+    prs = Presentation()
+    for title in titles:
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = title
+        slide.shapes.add_table(2, 2, Inches(1), Inches(3), Inches(2), Inches(1))
+    prs.save(path)
+
+
+def _make_pdf(path: str, lines):
+    pdf = fitz.open()
+    for line in lines:
+        pdf.new_page().insert_text((72, 72), line, fontsize=12)
+    pdf.save(path)
+    pdf.close()
+
+
+def _make_docx(path: str, pages):
+    doc = Document()
+    for i, line in enumerate(pages):
+        if i:
+            doc.add_page_break()
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+class TestIncrementalExtraction(TempDirTestCase):
+
+    def _pages(self):
+        with sqlite3.connect("extracted_data.db") as conn:
+            return conn.execute(
+                "SELECT document_id, page_number, content FROM document_text_content "
+                "ORDER BY document_id, page_number;"
+            ).fetchall()
+
+    def test_changed_and_removed_slides(self):
+        _make_deck("deck.pptx", ["One", "Two", "Three"])
+        plan = run_extraction("deck.pptx", incremental=True)
+        self.assertEqual(plan["changed"], [1, 2, 3])
+
+        plan = run_extraction("deck.pptx", incremental=True)
+        self.assertEqual((plan["changed"], plan["removed"]), ([], []))
+
+        _make_deck("deck.pptx", ["One", "Two edited"])
+        plan = run_extraction("deck.pptx", incremental=True)
+        self.assertEqual((plan["changed"], plan["removed"]), ([2], [3]))
+
+        pages = self._pages()
+        self.assertEqual([(doc, page) for doc, page, _ in pages], [(1, 1), (1, 2)])
+        self.assertIn("Two edited", pages[1][2])
+        with sqlite3.connect("extracted_data.db") as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM documents;").fetchone()[0], 1)
+            tables = conn.execute(
+                "SELECT page_number, table_path FROM document_tables ORDER BY page_number;"
+            ).fetchall()
+        # Table file names match what a full run would produce
+        self.assertEqual([os.path.basename(path) for _, path in tables],
+                         ["slide_1_table_0.csv", "slide_2_table_1.csv"])
+
+    def test_changed_pdf_page(self):
+        _make_pdf("doc.pdf", ["First", "Second", "Third"])
+        run_extraction("doc.pdf", incremental=True)
+
+        _make_pdf("doc.pdf", ["First", "Second", "Third edited"])
+        plan = run_extraction("doc.pdf", incremental=True)
+        self.assertEqual((plan["changed"], plan["removed"]), ([3], []))
+        self.assertEqual([content for _, _, content in self._pages()],
+                         ["First", "Second", "Third edited"])
+
+    def test_pdf_form_and_font_edits(self):
+        def make(inner_text):
+            source = fitz.open()
+            source.new_page().insert_text((72, 72), inner_text, fontsize=12)
+            pdf = fitz.open()
+            # Page 1 only draws a form ("q /fzFrm0 Do Q"); page 2 has its own text
+            pdf.new_page().show_pdf_page(fitz.Rect(0, 0, 595, 842), source, 0)
+            pdf.new_page().insert_text((72, 72), "Plain", fontsize=12)
+            return pdf
+
+        make("Inner").save("doc.pdf")
+        run_extraction("doc.pdf", incremental=True)
+
+        make("Inner edited").save("doc.pdf")
+        plan = run_extraction("doc.pdf", incremental=True)
+        self.assertEqual(plan["changed"], [1])
+        self.assertEqual([content for _, _, content in self._pages()], ["Inner edited", "Plain"])
+
+        # Swap page 2's font without touching its content stream
+        pdf = make("Inner edited")
+        font_xref = pdf[1].get_fonts()[0][0]
+        pdf.xref_set_key(font_xref, "BaseFont", "/Courier")
+        pdf.save("doc.pdf")
+        plan = run_extraction("doc.pdf", incremental=True)
+        self.assertEqual(plan["changed"], [2])
+
+    def test_changed_docx_page(self):
+        _make_docx("memo.docx", ["First", "Second", "Third"])
+        plan = run_extraction("memo.docx", incremental=True)
+        self.assertEqual(plan["changed"], [1, 2, 3])
+
+        _make_docx("memo.docx", ["First", "Second edited", "Third"])
+        plan = run_extraction("memo.docx", incremental=True)
+        self.assertEqual((plan["changed"], plan["removed"]), ([2], []))
+        self.assertEqual([content for _, _, content in self._pages()],
+                         ["First", "Second edited", "Third"])
+
+    def test_full_and_incremental_runs_share_the_document(self):
+        def documents():
+            with sqlite3.connect("extracted_data.db") as conn:
+                return conn.execute(
+                    "SELECT id, source_path, content_hash IS NOT NULL FROM documents;").fetchall()
+
+        _make_deck("deck.pptx", ["One", "Two"])
+        run_extraction("deck.pptx", incremental=True)
+        run_extraction("deck.pptx", sinks=("sql",))
+        self.assertEqual(documents(), [(1, os.path.abspath("deck.pptx"), 1)])
+        self.assertEqual([(doc, page) for doc, page, _ in self._pages()], [(1, 1), (1, 2)])
+
+        # A full run keeps no fingerprints: the next incremental run redoes every slide
+        _make_deck("deck.pptx", ["One", "Two edited", "Three"])
+        plan = run_extraction("deck.pptx", incremental=True)
+        self.assertEqual(plan["changed"], [1, 2, 3])
+        _make_deck("deck.pptx", ["One"])
+        plan = run_extraction("deck.pptx", incremental=True)
+        self.assertEqual((plan["changed"], plan["removed"]), ([], [2, 3]))
+
+        # An edited file from the same path replaces it in full runs too
+        _make_deck("deck.pptx", ["One edited"])
+        run_extraction("deck.pptx", sinks=("sql",), stream=True)
+        self.assertEqual(documents(), [(1, os.path.abspath("deck.pptx"), 1)])
+        pages = self._pages()
+        self.assertEqual([(doc, page) for doc, page, _ in pages], [(1, 1)])
+        self.assertIn("One edited", pages[0][2])
+
+    def test_page_runs(self):
+        self.assertEqual(_page_runs([5, 1, 2, 3, 9], 8), [(0, 3), (4, 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import json
+import fitz
+from src.metrics.metrics import DocumentMetrics, MetricsReporter, timed, to_prometheus
+from main import run_extraction
+from helpers import TempDirTestCase
+
+
+class TestDocumentMetrics(unittest.TestCase):
+
+    def test_stages_accumulate_and_merge(self):
+        metrics = DocumentMetrics("doc.pdf")
+        with metrics.stage("extract_text"):
+            pass
+        with metrics.stage("extract_text"):
+            pass
+        metrics.count("pages", 2)
+        metrics.merge({"timings": {"extract_text": 1.0}, "counts": {"pages": 3}})
+
+        snapshot = metrics.snapshot()
+        self.assertGreaterEqual(snapshot["timings"]["extract_text"], 1.0)
+        self.assertEqual(snapshot["counts"]["pages"], 5)
+
+    def test_timed_without_metrics_is_a_no_op(self):
+        with timed(None, "extract_text"):
+            pass
+
+    def test_prometheus_output(self):
+        text = to_prometheus({"document": "a.pdf", "timings": {"load": 0.5},
+                              "counts": {"pages": 3}, "total_seconds": 1.0,
+                              "peak_rss_bytes": 10, "status": "ok"})
+        self.assertIn('extraction_stage_seconds{document="a.pdf",stage="load"} 0.500000', text)
+        self.assertIn('extraction_pages_total{document="a.pdf"} 3', text)
+        self.assertIn('extraction_document_success{document="a.pdf"} 1', text)
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            MetricsReporter("xml")
+
+
+class TestRunExtractionMetrics(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.pdf_path = os.path.join(self.tmp_dir, "metrics.pdf")
+        pdf = fitz.open()
+        for i in range(2):
+            page = pdf.new_page()
+            page.insert_text((72, 72), f"Page {i}", fontsize=20)
+            page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 60, 200, 80),
+                              "uri": "https://example.com"})
+        pdf.save(self.pdf_path)
+        pdf.close()
+
+    def test_reports_stages_and_counts(self):
+        metrics_file = os.path.join(self.tmp_dir, "metrics.jsonl")
+        reporter = MetricsReporter("json", output=metrics_file,
+                                   profile_dir=os.path.join(self.tmp_dir, "profiles"))
+        run_extraction(self.pdf_path, reporter=reporter)
+
+        with open(metrics_file, encoding="utf-8") as f:
+            snapshot = json.loads(f.readline())
+        self.assertEqual(snapshot["status"], "ok")
+        for stage in ("load", "extract_text", "extract_links", "file_save", "sql_save"):
+            self.assertIn(stage, snapshot["timings"])
+        self.assertEqual(snapshot["counts"]["pages"], 2)
+        self.assertEqual(snapshot["counts"]["links"], 2)
+        self.assertGreater(snapshot["counts"]["sql_rows"], 0)
+        self.assertGreater(snapshot["counts"]["bytes_written"], 0)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "profiles", "metrics.pdf.prof")))
+
+    def test_failed_document_is_reported(self):
+        metrics_file = os.path.join(self.tmp_dir, "metrics.jsonl")
+        with self.assertRaises(ValueError):
+            run_extraction("notes.txt", reporter=MetricsReporter("json", output=metrics_file))
+
+        with open(metrics_file, encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import fitz
+from docx import Document
+from pptx import Presentation
+from pptx.util import Inches
+from main import run_extraction
+from src.cache.extraction_cache import ExtractionCache
+from src.extractors.data_extractor import (
+    DOCXDataExtractor,
+    PDFDataExtractor,
+    PPTDataExtractor
+)
+from src.loaders.docx_loader import DOCXPackageLoader
+from src.loaders.ppt_loader import PPTLoader
+from helpers import TempDirTestCase
+
+
+def _unordered_pdf(path: str):
+    pdf = fitz.open()
+    page = pdf.new_page()
+    # Written bottom first, so stored order differs from reading order
+    page.insert_text((72, 400), "Footnote", fontsize=11)
+    page.insert_text((72, 100), "Title", fontsize=11)
+    page.insert_text((72, 200), "Body", fontsize=11)
+    page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 90, 120, 105),
+                      "uri": "https://example.com"})
+    pdf.save(path)
+    pdf.close()
+
+
+class TestExtractionProfiles(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        _unordered_pdf("columns.pdf")
+
+    def _pdf(self, profile):
+        return PDFDataExtractor(fitz.open("columns.pdf"), "columns.pdf", profile=profile).extract_all()
+
+    def test_pdf_profiles(self):
+        full, text, layout = self._pdf("full"), self._pdf("text"), self._pdf("layout")
+
+        self.assertEqual(full["text"]["text"][1], ["Footnote", "Title", "Body"])
+        self.assertEqual(len(full["links"]), 1)
+        # Plain text only: no span font styles, headings or other sections
+        self.assertEqual(sorted(text["text"]["text"][1]), sorted(full["text"]["text"][1]))
+        self.assertEqual(len(text["text"]["metadata"]["font_styles"]), 0)
+        self.assertEqual((text["links"], text["images"], text["tables"]), ([], [], []))
+        self.assertEqual(layout["text"]["text"][1], ["Title", "Body", "Footnote"])
+        self.assertEqual(len(layout["links"]), 1)
+
+        with self.assertRaises(ValueError):
+            PDFDataExtractor(fitz.open("columns.pdf"), "columns.pdf", profile="fast")
+
+    def test_docx_and_pptx_profiles(self):
+        doc = Document()
+        doc.add_heading("Summary", level=1)
+        doc.add_paragraph("Body")
+        doc.save("memo.docx")
+        text = DOCXDataExtractor(DOCXPackageLoader("memo.docx").load_file(), "memo.docx",
+                                 profile="text").extract_all()
+        self.assertEqual(text["text"]["text"], {1: ["Summary", "Body"]})
+        self.assertEqual((text["text"]["metadata"]["headings"], len(text["text"]["metadata"]["font_styles"])),
+                         ({}, 0))
+
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_textbox(Inches(1), Inches(4), Inches(3), Inches(1)).text_frame.text = "Lower"
+        slide.shapes.add_textbox(Inches(1), Inches(1), Inches(3), Inches(1)).text_frame.text = "Upper"
+        prs.save("deck.pptx")
+        ppt_doc = PPTLoader("deck.pptx").load_file()
+        self.assertEqual(PPTDataExtractor(ppt_doc, "deck.pptx").extract_text()["text"][1],
+                         ["Lower", "Upper"])
+        layout = PPTDataExtractor(ppt_doc, "deck.pptx", profile="layout").extract_all()
+        self.assertEqual(layout["text"]["text"][1], ["Upper", "Lower"])
+        text = PPTDataExtractor(ppt_doc, "deck.pptx", profile="text").extract_all()
+        self.assertEqual(len(text["text"]["metadata"]["font_styles"]), 0)
+
+    def test_profiles_are_cached_apart(self):
+        cache = ExtractionCache("cache", version="test")
+        text = run_extraction("columns.pdf", cache=cache, profile="text", sinks=("sql",))
+        full = run_extraction("columns.pdf", cache=cache, sinks=("sql",))
+        self.assertEqual(text["links"], [])
+        self.assertEqual(len(full["links"]), 1)
+        self.assertEqual(run_extraction("columns.pdf", cache=cache, profile="text", sinks=("sql",)), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import shutil
+import tempfile
+from src.storage.sql_storage import SQLStorage
+from src.storage.sql_query import SQLQuery
+
+
+class TestSQLQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "query.db")
+        data = {
+            "text": {
+                "text": {
+                    1: ["Quarterly revenue grew", "in every region"],
+                    2: ["Appendix with raw numbers"]
+                },
+                "metadata": {
+                    "headings": {1: ["Revenue Summary"], 2: ["Appendix"]},
+                    "font_styles": [
+                        {"page_number": 1, "text": "Quarterly revenue grew", "font": "Arial", "size": 18},
+                        {"page_number": 2, "text": "Appendix with raw numbers", "font": "Arial", "size": 11}
+                    ]
+                }
+            },
+            "links": [
+                {"page_number": 1, "url": "https://example.com/report", "text": "Report"},
+                {"page_number": 2, "url": "https://docs.example.com/a", "text": "Docs"},
+                {"page_number": 2, "url": "mailto:someone@example.com", "text": "Mail"}
+            ],
+            "images": [{"page_number": 2, "image_path": "img/p2.png"}],
+            "tables": [{"page_number": 2, "table_data": [["a", "b"]], "table_path": "t.csv"}]
+        }
+        with SQLStorage(db_path=self.db_path) as storage:
+            storage.save(data, "report")
+        self.query = SQLQuery(self.db_path)
+        self.doc_id = self.query.get_document("report")["id"]
+
+    def tearDown(self):
+        self.query.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_document_pages_and_images(self):
+        self.assertIsNone(self.query.get_document("missing"))
+        pages = self.query.get_pages(self.doc_id)
+        self.assertEqual([p["page_number"] for p in pages], [1, 2])
+        self.assertEqual(pages[0]["content"], "Quarterly revenue grew\nin every region")
+        self.assertEqual(len(self.query.find_images(self.doc_id, 2)), 1)
+        self.assertEqual(self.query.find_images(self.doc_id, 1), [])
+        self.assertEqual(self.query.get_tables(self.doc_id)[0]["table_data"], [["a", "b"]])
+
+    def test_links_for_domain(self):
+        self.assertEqual(len(self.query.get_links_for_domain("example.com")), 1)
+        self.assertEqual(len(self.query.get_links_for_domain("Example.com", include_subdomains=True)), 2)
+
+    def test_stream_font_styles(self):
+        styles = list(self.query.iter_font_styles(self.doc_id, batch_size=1))
+        self.assertEqual([s["size"] for s in styles], [18, 11])
+        self.assertEqual(styles[0]["font"], "Arial")
+
+    def test_full_text_search(self):
+        hits = self.query.search_text("revenue")
+        self.assertEqual([(h["file_name"], h["page_number"]) for h in hits], [("report", 1)])
+        self.assertEqual(self.query.search_headings("appendix")[0]["page_number"], 2)
+
+    def test_indexes_exist(self):
+        names = {row[0] for row in self.query.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_documents_file_name", names)
+        self.assertIn("idx_document_text_document_page", names)
+        self.assertIn("idx_document_links_domain", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
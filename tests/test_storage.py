@@ -1,36 +1,45 @@
 import unittest
 import os
 import shutil
+import sqlite3
 from src.storage.file_storage import FileStorage
-from src.storage.sql_storage import SQLStorage
+from src.storage.sql_query import SQLQuery
+from src.storage.sql_storage import SQLStorage, SQLStreamWriter
+from src.extractors.font_styles import FontStyleColumns
+from helpers import TempDirTestCase
 
-class TestStorage(unittest.TestCase):
 
-    def setUp(self):
-        # Prepare some fake data that mimics extractor output
-        self.sample_data = {
+def _sample_data():
+    # Fake data that mimics extractor output
+    return {
+        "text": {
             "text": {
-                "text": {
-                    1: ["Hello world!", "Sample line."],
-                    2: ["Another page text"]
-                },
-                "metadata": {
-                    "headings": {1: ["Heading 1"]},
-                    "font_styles": [
-                        {"page_number": 1, "text": "Hello world!", "font": "Arial", "size": 12}
-                    ]
-                }
+                1: ["Hello world!", "Sample line."],
+                2: ["Another page text"]
             },
-            "links": [
-                {"page_number": 1, "url": "http://example.com", "text": "Example"}
-            ],
-            "images": [
-                {"page_number": 1, "image_path": "some/path/image.png"}
-            ],
-            "tables": [
-                {"page_number": 1, "table_data": [["Cell1","Cell2"]], "table_path": "some/path/table1.csv"}
-            ]
-        }
+            "metadata": {
+                "headings": {1: ["Heading 1"]},
+                "font_styles": [
+                    {"page_number": 1, "text": "Hello world!", "font": "Arial", "size": 12}
+                ]
+            }
+        },
+        "links": [
+            {"page_number": 1, "url": "http://example.com", "text": "Example"}
+        ],
+        "images": [
+            {"page_number": 1, "image_path": "some/path/image.png"}
+        ],
+        "tables": [
+            {"page_number": 1, "table_data": [["Cell1","Cell2"]], "table_path": "some/path/table1.csv"}
+        ]
+    }
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.sample_data = _sample_data()
         self.file_name = "test_doc"
 
         # Clean up output folders before each run
@@ -56,5 +65,159 @@ class TestStorage(unittest.TestCase):
         # Check that db file exists
         self.assertTrue(os.path.isfile("test_data.db"))
 
+
+class TestStorageBackends(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.sample_data = _sample_data()
+        self.file_name = "test_doc"
+
+    def test_sql_storage_save_many(self):
+        with SQLStorage(db_path="test_data.db", synchronous="OFF") as storage:
+            storage.save_many([(self.sample_data, "doc_a"), (self.sample_data, "doc_b")])
+
+        conn = sqlite3.connect("test_data.db")
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0], 2)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM document_text").fetchone()[0], 4)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM document_font_styles").fetchone()[0], 2)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        conn.close()
+
+    def test_stream_matches_save(self):
+        records = [
+            {"page_number": 1, "text": ["Hello world!", "Sample line."], "headings": ["Heading 1"],
+             "font_styles": self.sample_data["text"]["metadata"]["font_styles"],
+             "links": self.sample_data["links"], "images": self.sample_data["images"],
+             "tables": self.sample_data["tables"]},
+            {"page_number": 2, "text": ["Another page text"], "headings": [], "font_styles": [],
+             "links": [], "images": [], "tables": []}
+        ]
+
+        FileStorage().save(self.sample_data, "saved_doc")
+        FileStorage().save_stream(iter(records), "streamed_doc")
+        for name in ("extracted_text.txt", "headings.txt", "extracted_links.csv", "font_styles.csv"):
+            with open(os.path.join("output", "saved_doc", name)) as a, \
+                    open(os.path.join("output", "streamed_doc", name)) as b:
+                self.assertEqual(a.read(), b.read())
+
+        with SQLStorage(db_path="test_data.db") as storage:
+            storage.save(self.sample_data, "saved_doc")
+            storage.save_stream(iter(records), "streamed_doc")
+            rows = storage.conn.execute('''
+                SELECT d.file_name, COUNT(*) FROM document_text t
+                JOIN documents d ON d.id = t.document_id GROUP BY d.file_name ORDER BY 1
+            ''').fetchall()
+        self.assertEqual(rows, [("saved_doc", 2), ("streamed_doc", 2)])
+
+    def test_sql_stream_rolls_back_on_error(self):
+        with SQLStorage(db_path="test_data.db") as storage:
+            with self.assertRaises(RuntimeError):
+                with storage.open_stream("failed_doc") as writer:
+                    writer.write_page({"page_number": 1, "text": ["x"], "headings": [],
+                                       "font_styles": [], "links": [], "images": [], "tables": []})
+                    raise RuntimeError("extraction failed")
+            count = storage.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_sql_stream_commits_in_batches(self):
+        page = {"page_number": 1, "text": ["x"], "headings": [], "font_styles": [],
+                "links": [], "images": [], "tables": []}
+        with SQLStorage(db_path="test_data.db") as storage:
+            storage.save(self.sample_data, "report", content_hash="abc")
+            writer = storage.open_stream("report_v2", content_hash="abc")
+            for page_number in range(1, SQLStreamWriter.BATCH_PAGES + 1):
+                writer.write_page(dict(page, page_number=page_number))
+            # Another writer (a parallel --stream worker) is not locked out
+            with SQLStorage(db_path="test_data.db", timeout=0) as other:
+                other.save(self.sample_data, "other")
+            writer.abort()
+            # The earlier version survives a failed re-ingest
+            rows = storage.conn.execute('''
+                SELECT d.file_name, COUNT(t.id) FROM documents d
+                LEFT JOIN document_text t ON t.document_id = d.id GROUP BY d.id ORDER BY d.id
+            ''').fetchall()
+        self.assertEqual(rows, [("report_v2", 2), ("other", 2)])
+
+    def test_storages_accept_font_style_columns(self):
+        self.sample_data["text"]["metadata"]["font_styles"] = FontStyleColumns([
+            {"page_number": 1, "text": "Hello", "font": "Arial", "size": 12},
+            {"page_number": 1, "text": "world!", "font": "Arial", "size": 12}
+        ])
+        FileStorage(font_style_mode="runs").save(self.sample_data, self.file_name)
+        with open(os.path.join("output", self.file_name, "font_runs.csv")) as f:
+            self.assertEqual(f.read().splitlines()[1], "1,Arial,12.0,2,11")
+
+        with SQLStorage(db_path="test_data.db", font_style_mode="runs") as storage:
+            storage.save(self.sample_data, self.file_name)
+            runs = storage.conn.execute(
+                "SELECT page_number, font_name, span_count FROM document_font_runs").fetchall()
+            spans = storage.conn.execute("SELECT COUNT(*) FROM document_font_styles").fetchone()[0]
+        self.assertEqual(runs, [(1, "Arial", 2)])
+        self.assertEqual(spans, 0)
+
+    def test_sql_storage_deduplicates_content(self):
+        records = [{"page_number": 1, "text": ["Streamed"], "headings": [], "font_styles": [],
+                    "links": [], "images": [], "tables": []}]
+        with SQLStorage(db_path="test_data.db") as storage:
+            storage.save(self.sample_data, "report", content_hash="abc")
+            first_id = storage.conn.execute("SELECT id FROM documents").fetchone()[0]
+            # Same source content under another name: replaced, not added
+            storage.save(self.sample_data, "report_copy", content_hash="abc")
+            # Different source, identical pages: pages and table share the blobs
+            storage.save(self.sample_data, "other")
+            documents = storage.conn.execute(
+                "SELECT id, file_name FROM documents ORDER BY id").fetchall()
+            blobs = storage.conn.execute("SELECT COUNT(*) FROM content_blobs").fetchone()[0]
+
+            # A streamed re-ingest replaces the document too
+            storage.save_stream(iter(records), "report_v2", content_hash="abc")
+            storage.save(self.sample_data, "report", content_hash="def")
+            with SQLQuery("test_data.db") as query:
+                pages = query.get_pages(first_id)
+                tables = query.get_tables(first_id)
+                hits = [hit["file_name"] for hit in query.search_text("another")]
+            counts = storage.conn.execute('''
+                SELECT (SELECT COUNT(*) FROM documents), (SELECT COUNT(*) FROM content_blobs)
+            ''').fetchone()
+            with self.assertRaises(sqlite3.IntegrityError):
+                storage.conn.execute("UPDATE documents SET content_hash = 'abc' WHERE id = ?",
+                                     (documents[1][0],))
+
+        self.assertEqual(documents[0], (first_id, "report_copy"))
+        self.assertEqual([name for _, name in documents], ["report_copy", "other"])
+        self.assertEqual(blobs, 3)      # two page texts, one table
+        self.assertEqual(pages, [{"page_number": 1, "content": "Streamed"}])
+        self.assertEqual(tables, [])
+        self.assertEqual(sorted(hits), ["other", "report"])
+        self.assertEqual(counts, (3, 4))
+
+    def test_sql_storage_reads_databases_without_blobs(self):
+        conn = sqlite3.connect("test_data.db")
+        conn.executescript('''
+            CREATE TABLE documents (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                    file_name TEXT NOT NULL,
+                                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE document_text (id INTEGER PRIMARY KEY AUTOINCREMENT, document_id INTEGER,
+                                        page_number INTEGER, content TEXT);
+            CREATE VIRTUAL TABLE document_text_fts
+                USING fts5(content, content='document_text', content_rowid='id');
+            INSERT INTO documents (file_name) VALUES ('legacy');
+            INSERT INTO document_text (document_id, page_number, content) VALUES (1, 1, 'Old page');
+        ''')
+        conn.close()
+
+        with SQLStorage(db_path="test_data.db") as storage:
+            storage.save(self.sample_data, "new", content_hash="abc")
+        with SQLQuery("test_data.db") as query:
+            self.assertEqual(query.get_pages(1), [{"page_number": 1, "content": "Old page"}])
+            self.assertEqual([hit["file_name"] for hit in query.search_text("old OR another")],
+                             ["legacy", "new"])
+
+    def test_sql_storage_rejects_unknown_pragma(self):
+        with self.assertRaises(ValueError):
+            SQLStorage(db_path="test_data.db", journal_mode="FAST")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import os
+import sqlite3
+import threading
+from unittest import mock
+import fitz
+from main import main, run_extraction
+from src.cache.extraction_cache import ExtractionCache
+from src.storage.storage import Storage
+from src.storage.pipeline import SinkError, StoragePipeline, parse_sinks
+from src.storage.sql_storage import SQLStorage
+from helpers import TempDirTestCase
+
+
+class RecordingStorage(Storage):
+    """Keeps what it was given; fails every save while `fail` is set."""
+
+    def __init__(self, fail=False):
+        self.saved = {}
+        self.threads = set()
+        self.fail = fail
+
+    def save(self, data, file_name, content_hash=None, source_path=None):
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("disk full")
+        self.saved[file_name] = data
+
+
+class FailingPageStorage(RecordingStorage):
+    """Streams normally but fails when `fail_on_page` arrives."""
+
+    def __init__(self, fail_on_page):
+        super().__init__()
+        self.fail_on_page = fail_on_page
+
+    def open_stream(self, file_name, content_hash=None, source_path=None):
+        writer = super().open_stream(file_name, content_hash, source_path)
+        write_page = writer.write_page
+
+        def failing_write(record):
+            if record["page_number"] == self.fail_on_page:
+                raise RuntimeError("disk full")
+            write_page(record)
+        writer.write_page = failing_write
+        return writer
+
+
+def _record(page):
+    return {"page_number": page, "text": [f"Page {page}"], "headings": [], "links": [],
+            "images": [], "tables": [], "font_styles": []}
+
+
+class TestStoragePipeline(unittest.TestCase):
+
+    def test_save_runs_each_sink_on_its_own_thread(self):
+        first, second = RecordingStorage(), RecordingStorage()
+        with StoragePipeline({"first": first, "second": second}) as pipeline:
+            pipeline.save({"text": {}}, "doc")
+        self.assertEqual(first.saved, {"doc": {"text": {}}})
+        self.assertEqual(second.saved, {"doc": {"text": {}}})
+        self.assertEqual(first.threads, {"storage-first"})
+
+    def test_failing_sink_does_not_stop_the_others(self):
+        good, bad = RecordingStorage(), RecordingStorage(fail=True)
+        with StoragePipeline({"good": good, "bad": bad}) as pipeline:
+            with self.assertRaises(SinkError) as ctx:
+                pipeline.save({"text": {}}, "doc")
+            self.assertEqual(list(ctx.exception.errors), ["bad"])
+            self.assertIn("doc", good.saved)
+
+            # Errors are per document: the next one is tried again
+            bad.fail = False
+            pipeline.save({"text": {}}, "next")
+        self.assertIn("next", bad.saved)
+
+    def test_stream_failure_aborts_only_that_sink(self):
+        good, bad = RecordingStorage(), FailingPageStorage(fail_on_page=2)
+        # queue_size=1 makes the producer wait on the slowest sink
+        with StoragePipeline({"good": good, "bad": bad}, queue_size=1) as pipeline:
+            with self.assertRaises(SinkError):
+                with pipeline.open_stream("doc") as writer:
+                    for page in range(1, 6):
+                        writer.write_page(_record(page))
+        self.assertEqual(sorted(good.saved["doc"]["text"]["text"]), [1, 2, 3, 4, 5])
+        self.assertNotIn("doc", bad.saved)
+
+    def test_parse_sinks(self):
+        self.assertEqual(parse_sinks("sql, columnar,sql"), ("sql", "columnar"))
+        with self.assertRaises(ValueError):
+            parse_sinks("file,s3")
+        with self.assertRaises(ValueError):
+            parse_sinks(",")
+
+
+class TestRunExtractionSinks(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        pdf = fitz.open()
+        for line in ("First", "Second"):
+            pdf.new_page().insert_text((72, 72), line, fontsize=12)
+        pdf.save("doc.pdf")
+        pdf.close()
+
+    def test_sql_only_skips_text_files(self):
+        for stream in (False, True):
+            run_extraction("doc.pdf", sinks=("sql",), stream=stream)
+        self.assertFalse(os.path.exists(os.path.join("output", "doc", "extracted_text.txt")))
+        with sqlite3.connect("extracted_data.db") as conn:
+            rows = conn.execute("SELECT content FROM document_text_content ORDER BY id;").fetchall()
+            documents = conn.execute("SELECT COUNT(*) FROM documents;").fetchone()[0]
+        # The streamed run of the same file replaced the first run's document
+        self.assertEqual([r[0] for r in rows], ["First", "Second"])
+        self.assertEqual(documents, 1)
+
+    def test_failed_sql_save_is_reported_and_not_cached(self):
+        cache = ExtractionCache("cache")
+        with mock.patch.object(SQLStorage, "_insert_rows", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(SinkError):
+                run_extraction("doc.pdf", cache=cache, sinks=("sql",))
+        self.assertIsNone(cache.get("doc.pdf"))
+        with sqlite3.connect("extracted_data.db") as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM documents;").fetchone()[0], 0)
+
+        # The next run extracts and stores it
+        run_extraction("doc.pdf", cache=cache, sinks=("sql",))
+        with sqlite3.connect("extracted_data.db") as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM documents;").fetchone()[0], 1)
+
+    def test_cli_options_reach_the_extraction(self):
+        main(["doc.pdf", "--sinks", "sql", "--profile", "text", "--no-cache"])
+        with sqlite3.connect("extracted_data.db") as conn:
+            pages = conn.execute("SELECT COUNT(*) FROM document_text;").fetchone()[0]
+            spans = conn.execute("SELECT COUNT(*) FROM document_font_styles;").fetchone()[0]
+        # No file sink and no span font styles (the full profile stores one per line)
+        self.assertFalse(os.path.exists("output"))
+        self.assertEqual((pages, spans), (2, 0))
+
+    def test_incremental_needs_sql_sink(self):
+        with self.assertRaises(ValueError):
+            run_extraction("doc.pdf", sinks=("file",), incremental=True)
+
+
+if __name__ == "__main__":
+    unittest.main()